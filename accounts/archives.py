@@ -0,0 +1,95 @@
+import os
+import zipfile
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils.text import get_valid_filename
+
+from .uploads import open_stored_file
+
+
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+class _ZipOutput:
+    """Write-only sink for ZipFile that hands out what was written since the last drain.
+
+    It can't seek, so zipfile writes each entry's sizes in a trailing data
+    descriptor and the archive never has to be held in memory or on disk.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _safe_name(value, fallback):
+    try:
+        return get_valid_filename(value or '') or fallback
+    except SuspiciousFileOperation:
+        return fallback
+
+
+def _unique_name(arcname, used):
+    stem, extension = os.path.splitext(arcname)
+    candidate, counter = arcname, 2
+    while candidate in used:
+        candidate = f'{stem}_{counter}{extension}'
+        counter += 1
+    used.add(candidate)
+    return candidate
+
+
+def application_zip_entries(app):
+    """(archive path, storage name) pairs for an application's own and profile documents.
+
+    Expects app.student, app.documents and app.student.documents to be loaded.
+    """
+    folder = _safe_name(f'{app.app_id}_{app.student.last_name}_{app.student.first_name}', str(app.app_id))
+    for index, doc in enumerate(app.documents.all(), start=1):
+        if doc.file:
+            yield f'{folder}/application/document_{index}{os.path.splitext(doc.file.name)[1]}', doc.file.name
+    for doc in app.student.documents.all():
+        if doc.file:
+            name = _safe_name(doc.document_name, f'document_{doc.pk}')
+            yield f'{folder}/profile/{name}{os.path.splitext(doc.file.name)[1]}', doc.file.name
+
+
+def stream_zip(entries):
+    """Yield a ZIP archive of (archive path, storage name) entries as it is built.
+
+    Files are copied in ZIP_CHUNK_SIZE pieces. Files that can't be opened are
+    listed in missing_files.txt, since the response has already started by then.
+    """
+    output = _ZipOutput()
+    used = set()
+    missing = []
+    # Level 1 deflate: scans and PDFs barely compress, but unlike stored entries with
+    # data descriptors it is read by every unzip tool
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for arcname, name in entries:
+            arcname = _unique_name(arcname, used)
+            try:
+                source = open_stored_file(name)
+            except Exception:
+                missing.append(arcname)
+                continue
+            with source, archive.open(arcname, 'w') as target:
+                for chunk in iter(lambda: source.read(ZIP_CHUNK_SIZE), b''):
+                    target.write(chunk)
+                    data = output.drain()
+                    if data:
+                        yield data
+        if missing:
+            archive.writestr('missing_files.txt', '\n'.join(missing) + '\n')
+    yield output.drain()
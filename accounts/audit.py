@@ -0,0 +1,136 @@
+import atexit
+import gzip
+import io
+import json
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Admin, AdminLog
+
+
+logger = logging.getLogger(__name__)
+
+# Flush once this many entries are waiting...
+AUDIT_LOG_FLUSH_SIZE = 50
+# ...or when the oldest has waited this long (seconds). Requests also flush when they finish.
+AUDIT_LOG_FLUSH_INTERVAL = 5.0
+
+# archive_admin_logs moves rows older than this out of the table
+AUDIT_LOG_RETENTION_DAYS = 180
+AUDIT_LOG_ARCHIVE_DIR = 'admin_log_archive'
+
+
+class AuditLogBuffer:
+    """Collects AdminLog rows in memory and writes them with one bulk_create.
+
+    Shared by all threads of a process. Entries keep the time they were logged,
+    so a late flush doesn't reorder the audit trail.
+    """
+
+    def __init__(self, flush_size=AUDIT_LOG_FLUSH_SIZE, flush_interval=AUDIT_LOG_FLUSH_INTERVAL):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._entries = []
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def add(self, admin_id, action):
+        with self._lock:
+            self._entries.append(AdminLog(admin_id=admin_id, action=action[:255], timestamp=timezone.now()))
+            full = len(self._entries) >= self.flush_size
+            self._start_flusher()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write out everything buffered so far and return how many rows were saved"""
+        with self._lock:
+            entries, self._entries = self._entries, []
+        if not entries:
+            return 0
+        # An admin deleted since logging would otherwise fail the whole batch (FK checks run at commit)
+        known = set(Admin.objects.filter(pk__in={e.admin_id for e in entries}).values_list('pk', flat=True))
+        entries = [e for e in entries if e.admin_id in known]
+        AdminLog.objects.bulk_create(entries)
+        return len(entries)
+
+    def _start_flusher(self):
+        # Covers entries logged outside a request (management commands, shells), which no request_finished will flush
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_periodically, name='audit-log-flusher', daemon=True)
+            self._flusher.start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not flush admin audit log')
+            finally:
+                # This thread's connection would otherwise stay open until the process exits
+                connection.close()
+
+
+_buffer = AuditLogBuffer()
+atexit.register(_buffer.flush)
+
+
+def log_admin_action(admin_id, action):
+    """Record an admin action in the audit log; written in bulk after the request, not inline"""
+    _buffer.add(admin_id, action)
+
+
+def flush_admin_logs():
+    return _buffer.flush()
+
+
+def _archive_row(log):
+    return {
+        'id': log['id'],
+        'admin_id': log['admin_id'],
+        'admin_name': log['admin__admin_name'],
+        'action': log['action'],
+        'timestamp': log['timestamp'].isoformat(),
+    }
+
+
+def archive_admin_log_chunk(cutoff, batch_size):
+    """Move the oldest batch_size AdminLog rows older than cutoff into gzipped JSONL archives.
+
+    Archives are split by month (admin_log_archive/<YYYY-MM>/<first id>-<last id>.jsonl.gz)
+    and saved before the rows are deleted. Returns the number of rows moved; 0 means done.
+    """
+    rows = list(
+        AdminLog.objects.filter(timestamp__lt=cutoff).order_by('timestamp', 'id')
+        .values('id', 'admin_id', 'admin__admin_name', 'action', 'timestamp')[:batch_size]
+    )
+    if not rows:
+        return 0
+
+    months = {}
+    for row in rows:
+        months.setdefault(row['timestamp'].strftime('%Y-%m'), []).append(row)
+
+    for month, month_rows in months.items():
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode='wb') as archive:
+            for row in month_rows:
+                archive.write((json.dumps(_archive_row(row)) + '\n').encode('utf-8'))
+        name = f"{AUDIT_LOG_ARCHIVE_DIR}/{month}/{month_rows[0]['id']}-{month_rows[-1]['id']}.jsonl.gz"
+        default_storage.save(name, ContentFile(buffer.getvalue()))
+
+    with transaction.atomic():
+        AdminLog.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+    return len(rows)
+
+
+def get_audit_log_cutoff(days=AUDIT_LOG_RETENTION_DAYS):
+    return timezone.now() - timedelta(days=days)
@@ -0,0 +1,112 @@
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+
+from home.models import Program
+from .models import Student, StudentDocument, StudentDocumentStatus
+
+
+# Standard student dashboard checklist; program-specific requirements are added after these
+STANDARD_REQUIRED_DOCUMENTS = [
+    "School ID (Current Semester)",
+    "Valid ID",
+    "TOR",
+    "Voter's Certificate",
+    "Certificate of Indigency",
+    "Letter of Application"
+]
+
+# Programs invalidate this on every write (see accounts.signals); the TTL only bounds
+# how long other worker processes can serve a stale copy
+REQUIRED_DOCUMENTS_CACHE_TTL = 300  # seconds
+REQUIRED_DOCUMENTS_CACHE_KEY = 'documents:required'
+
+# Students handled per INSERT when a required document is added to the catalog
+DOCUMENT_STATUS_BATCH_SIZE = 1000
+
+
+def _build_required_documents():
+    required = list(STANDARD_REQUIRED_DOCUMENTS)
+    seen = set(required)
+    for requirements in Program.objects.order_by('program_id').values_list('document_requirements', flat=True):
+        for req in (requirements or []):
+            if req and req not in seen:
+                seen.add(req)
+                required.append(req)
+    return required
+
+
+def get_required_documents():
+    """Union of the standard checklist and every program's document_requirements, in first-seen order"""
+    required = cache.get(REQUIRED_DOCUMENTS_CACHE_KEY)
+    if required is None:
+        required = _build_required_documents()
+        cache.set(REQUIRED_DOCUMENTS_CACHE_KEY, required, REQUIRED_DOCUMENTS_CACHE_TTL)
+    return required
+
+
+def invalidate_required_documents():
+    cache.delete(REQUIRED_DOCUMENTS_CACHE_KEY)
+
+
+def get_missing_documents(student_id, uploaded_names=None):
+    """Required document names the student has not uploaded.
+
+    Pass uploaded_names if they are already loaded; otherwise this costs one query.
+    """
+    if uploaded_names is None:
+        uploaded_names = set(
+            StudentDocument.objects.filter(student_id=student_id).values_list('document_name', flat=True)
+        )
+    return [name for name in get_required_documents() if name not in uploaded_names]
+
+
+def refresh_student_document_status(student_id):
+    """Bring one student's StudentDocumentStatus rows in line with their uploads and the catalog"""
+    # Rows are written from this, so read the catalog itself: another process's
+    # cached copy could be missing a requirement that was just added
+    required = _build_required_documents()
+    StudentDocumentStatus.objects.bulk_create(
+        [StudentDocumentStatus(student_id=student_id, document_name=name) for name in required],
+        ignore_conflicts=True,
+    )
+    uploaded = set(StudentDocument.objects.filter(student_id=student_id).values_list('document_name', flat=True))
+    statuses = StudentDocumentStatus.objects.filter(student_id=student_id)
+    statuses.exclude(document_name__in=required).delete()
+    statuses.filter(document_name__in=uploaded, is_uploaded=False).update(is_uploaded=True)
+    statuses.exclude(document_name__in=uploaded).filter(is_uploaded=True).update(is_uploaded=False)
+
+
+def sync_document_status_catalog(rebuild=False):
+    """Add and drop StudentDocumentStatus rows after the catalog changes.
+
+    Only names that entered the catalog are filled in, set-based, so a program
+    edit costs a few statements rather than one per student. rebuild=True
+    recomputes every name, for after bulk imports. Returns the names filled in.
+    """
+    required = _build_required_documents()
+    StudentDocumentStatus.objects.exclude(document_name__in=required).delete()
+    if rebuild:
+        added = list(required)
+    else:
+        existing = set(StudentDocumentStatus.objects.values_list('document_name', flat=True).distinct())
+        added = [name for name in required if name not in existing]
+
+    for name in added:
+        student_ids = Student.objects.order_by('pk').values_list('pk', flat=True)
+        batch = []
+        for student_id in student_ids.iterator(chunk_size=DOCUMENT_STATUS_BATCH_SIZE):
+            batch.append(StudentDocumentStatus(student_id=student_id, document_name=name))
+            if len(batch) >= DOCUMENT_STATUS_BATCH_SIZE:
+                StudentDocumentStatus.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        StudentDocumentStatus.objects.bulk_create(batch, ignore_conflicts=True)
+        StudentDocumentStatus.objects.filter(document_name=name).update(is_uploaded=Exists(
+            StudentDocument.objects.filter(student_id=OuterRef('student_id'), document_name=name)
+        ))
+    return added
+
+
+def students_missing_document(document_name, students=None):
+    """Narrow students (all of them by default) to those who haven't uploaded document_name"""
+    students = Student.objects.all() if students is None else students
+    return students.filter(document_statuses__document_name=document_name, document_statuses__is_uploaded=False)
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import models, transaction
+from django.utils import timezone
+
+from .models import NotificationEvent
+
+
+# How often an open SSE stream checks for new events
+EVENT_POLL_INTERVAL = 2.0
+# SSE streams end after this long; EventSource reconnects with Last-Event-ID on its own
+STREAM_MAX_DURATION = 300.0
+STREAM_HEARTBEAT_INTERVAL = 15.0
+EVENT_RETENTION = timedelta(days=1)
+
+
+def publish_event(kind, audience, student_ids=None):
+    """Record an event once the current transaction commits.
+
+    student_ids limits a 'student' event to those students; leave it out to
+    reach the whole audience.
+    """
+    if student_ids is None:
+        events = [NotificationEvent(kind=kind, audience=audience)]
+    else:
+        events = [NotificationEvent(kind=kind, audience=audience, student_id=pk) for pk in student_ids]
+    transaction.on_commit(lambda: NotificationEvent.objects.bulk_create(events, batch_size=1000))
+
+
+def latest_event_id():
+    return NotificationEvent.objects.aggregate(last=models.Max('id'))['last'] or 0
+
+
+def get_events(user_role, user_id, after_id):
+    """Events after after_id addressed to the given user, oldest first"""
+    events = NotificationEvent.objects.filter(id__gt=after_id)
+    if user_role == 'admin':
+        events = events.filter(audience='admin')
+    else:
+        events = events.filter(audience='student').filter(
+            models.Q(student_id__isnull=True) | models.Q(student_id=user_id)
+        )
+    return list(events.order_by('id').values('id', 'kind'))
+
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: {event['kind']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream_events(user_role, user_id, after_id):
+    """Async SSE body: yields events as they arrive, with comment heartbeats to keep proxies from closing the stream"""
+    fetch = sync_to_async(get_events)
+    started = last_sent = time.monotonic()
+    yield f"retry: {int(EVENT_POLL_INTERVAL * 1000)}\n\n"
+
+    while time.monotonic() - started < STREAM_MAX_DURATION:
+        events = await fetch(user_role, user_id, after_id)
+        for event in events:
+            after_id = event['id']
+            yield format_sse(event)
+        if events:
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= STREAM_HEARTBEAT_INTERVAL:
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(EVENT_POLL_INTERVAL)
+
+
+def prune_events(now=None):
+    """Drop events past EVENT_RETENTION and return how many were removed"""
+    deleted, _ = NotificationEvent.objects.filter(
+        created_at__lt=(now or timezone.now()) - EVENT_RETENTION
+    ).delete()
+    return deleted
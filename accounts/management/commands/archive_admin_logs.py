@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.audit import AUDIT_LOG_RETENTION_DAYS, archive_admin_log_chunk, get_audit_log_cutoff
+from accounts.models import AdminLog
+
+
+class Command(BaseCommand):
+    help = 'Moves AdminLog rows past the retention period into gzipped JSONL archives in media storage (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=AUDIT_LOG_RETENTION_DAYS, help='Keep this many days of logs in the table')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows to archive and delete per chunk')
+        parser.add_argument('--dry-run', action='store_true', help='Report how many rows would be archived without touching them')
+
+    def handle(self, *args, **options):
+        cutoff = get_audit_log_cutoff(options['days'])
+
+        if options['dry_run']:
+            count = AdminLog.objects.filter(timestamp__lt=cutoff).count()
+            self.stdout.write(f'Dry run: would archive {count} admin log entries older than {cutoff:%Y-%m-%d}.')
+            return
+
+        started = time.monotonic()
+        total = 0
+        while True:
+            moved = archive_admin_log_chunk(cutoff, options['batch_size'])
+            if not moved:
+                break
+            total += moved
+            self.stdout.write(f'Archived {total} entries so far')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {total} admin log entries older than {cutoff:%Y-%m-%d} in {time.monotonic() - started:.2f}s.'
+        ))
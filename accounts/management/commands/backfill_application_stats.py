@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.stats import rebuild_daily_application_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the DailyApplicationStat rollup used by the application trend charts'
+
+    def handle(self, *args, **kwargs):
+        buckets = rebuild_daily_application_stats()
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt application stats: {buckets} daily buckets.'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import ApplicationDocument, StudentDocument
+from accounts.uploads import get_content_hash
+
+
+class Command(BaseCommand):
+    help = 'Hashes documents uploaded before content hashing so new uploads can reuse their files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Rows to hash per query')
+
+    def handle(self, *args, **options):
+        for model in (StudentDocument, ApplicationDocument):
+            hashed = missing = 0
+            last_id = 0
+            while True:
+                docs = list(
+                    model.objects.filter(content_hash='', pk__gt=last_id).exclude(file='')
+                    .order_by('pk')[:options['batch_size']]
+                )
+                if not docs:
+                    break
+                last_id = docs[-1].pk
+                for doc in docs:
+                    try:
+                        with doc.file.open('rb') as file:
+                            doc.content_hash = get_content_hash(file)
+                    except (FileNotFoundError, OSError):
+                        missing += 1
+                        continue
+                    hashed += 1
+                model.objects.bulk_update([doc for doc in docs if doc.content_hash], ['content_hash'])
+            self.stdout.write(f'{model.__name__}: hashed {hashed}, {missing} files missing')
+        self.stdout.write(self.style.SUCCESS('Successfully backfilled document hashes.'))
@@ -0,0 +1,129 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from accounts.models import Admin, Student
+
+
+PROFILES = ['off', 'on']
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures concurrent register_view and send_message throughput on SQLite with '
+        'SQLITE_TUNING off and on. Each profile runs against its own throwaway database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent clients')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per client, alternating registrations and messages')
+        # Internal: run one profile against the database this process was started with
+        parser.add_argument('--run', action='store_true', help='Run a single profile (used by the comparison)')
+
+    def handle(self, *args, **options):
+        if options['run']:
+            self.run_profile(options['threads'], options['requests'])
+            return
+
+        results = {}
+        for profile in PROFILES:
+            results[profile] = self.spawn_profile(profile, options['threads'], options['requests'])
+            result = results[profile]
+            self.stdout.write(
+                f"SQLITE_TUNING={profile}: {result['requests']} requests in {result['seconds']:.2f}s "
+                f"= {result['per_second']:.1f} req/s, {result['errors']} errors"
+            )
+
+        baseline = results['off']['per_second']
+        speedup = results['on']['per_second'] / baseline if baseline else float('inf')
+        self.stdout.write(self.style.SUCCESS(f'Tuned profile throughput: {speedup:.2f}x the stock pragmas.'))
+
+    def spawn_profile(self, profile, threads, requests):
+        workdir = tempfile.mkdtemp(prefix='sqlite_bench_')
+        try:
+            env = dict(
+                os.environ,
+                DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.sqlite3')}",
+                SQLITE_TUNING=profile,
+            )
+            completed = subprocess.run(
+                [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'benchmark_sqlite_writes', '--run',
+                 '--threads', str(threads), '--requests', str(requests)],
+                env=env, capture_output=True, text=True,
+            )
+            if completed.returncode != 0:
+                raise CommandError(f'Benchmark run with SQLITE_TUNING={profile} failed:\n{completed.stderr}')
+            return json.loads(completed.stdout.strip().splitlines()[-1])
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def run_profile(self, threads, requests):
+        name = str(settings.DATABASES['default']['NAME'])
+        if not name.startswith(tempfile.gettempdir()):
+            raise CommandError('--run writes test rows; it only runs against a database in the temp directory.')
+
+        call_command('migrate', verbosity=0)
+        admin = Admin.objects.create(admin_name='bench-admin', password='bench')
+        student = Student.objects.create(
+            username='bench-student', first_name='Bench', last_name='Student', bday='2004-01-01',
+            address='Subic, Zambales', contact_num='09123456789', email='bench-student@example.com',
+            password='Password1', status='active',
+        )
+        connection.close()
+
+        errors = []
+        barrier = threading.Barrier(threads + 1, timeout=60)
+
+        def client_thread(index):
+            try:
+                # Count failed requests ("database is locked" surfaces as a 500) instead of raising them
+                client = Client(raise_request_exception=False)
+                session = client.session
+                session['user_role'] = 'admin'
+                session['user_id'] = admin.pk
+                session.save()
+                barrier.wait()
+                for n in range(requests):
+                    if n % 2:
+                        response = client.post('/api/messages/send/', json.dumps({
+                            'student_id': student.pk, 'subject': 'Benchmark', 'body': f'Message {index}-{n}',
+                        }), content_type='application/json')
+                        ok = response.status_code == 200
+                    else:
+                        username = f'bench{index}x{n}'
+                        response = client.post('/register/', {
+                            'username': username, 'password': 'Password1', 'confirm_password': 'Password1',
+                            'first_name': 'Bench', 'last_name': username, 'email': f'{username}@example.com',
+                            'bday': '2004-01-01', 'address': 'Subic, Zambales', 'barangay': 'Cawag',
+                            'student_type': 'Undergraduate', 'contact_num': '09123456789', 'sex': 'Male',
+                        })
+                        ok = response.status_code == 302
+                    if not ok:
+                        errors.append(response.status_code)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=client_thread, args=(index,)) for index in range(threads)]
+        for worker in workers:
+            worker.start()
+        barrier.wait()
+        started = time.monotonic()
+        for worker in workers:
+            worker.join()
+        seconds = time.monotonic() - started
+
+        total = threads * requests
+        self.stdout.write(json.dumps({
+            'requests': total, 'errors': len(errors), 'seconds': seconds, 'per_second': total / seconds,
+        }))
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.thumbnails import THUMBNAIL_BATCH_SIZE, claim_thumbnail_batch, generate_thumbnail, release_stale_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Generates WebP thumbnails and previews for uploaded documents and program images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=THUMBNAIL_BATCH_SIZE, help='Jobs to claim at a time')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new uploads instead of exiting when the queue is empty')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to wait between polls in --loop mode')
+
+    def handle(self, *args, **options):
+        totals = {}
+
+        while True:
+            close_old_connections()
+            released = release_stale_thumbnails()
+            if released:
+                self.stdout.write(f"Re-queued {released} thumbnails left behind by a stopped worker")
+
+            batch = claim_thumbnail_batch(options['batch_size'])
+            if not batch:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+                continue
+
+            started = time.monotonic()
+            for job in batch:
+                status = generate_thumbnail(job)
+                totals[status] = totals.get(status, 0) + 1
+            self.stdout.write(f"Processed {len(batch)} thumbnails in {time.monotonic() - started:.1f}s")
+
+        summary = ', '.join(f'{count} {status}' for status, count in sorted(totals.items())) or 'nothing to do'
+        self.stdout.write(self.style.SUCCESS(f'Thumbnail queue drained: {summary}.'))
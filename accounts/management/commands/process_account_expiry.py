@@ -1,71 +1,110 @@
+import time
+from datetime import timedelta
+
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
-from accounts.models import Student, Popup
-from datetime import timedelta
-from django.core.mail import send_mail
-from django.conf import settings
+
+from accounts.models import OutboundEmail, Popup, Student
+from accounts.outbox import build_email
+from accounts.stats import defer_dashboard_counters, invalidate_student_chart_data, schedule_dashboard_counter_refresh
+
+
+WARNING_SUBJECT = 'Account Expiration Warning'
+WARNING_EMAIL = (
+    'Dear {first_name},\n\nYour account has been active for 4 months. As per our archiving policy, '
+    'your account will be disabled in 1 month (at 5 months) and deleted in 2 months (at 6 months). '
+    'Please contact the administration if you need to renew your account.\n\nThank you.'
+)
+WARNING_POPUP = (
+    'Your account will expire soon according to our 6-month archiving policy. It will be disabled '
+    'next month and deleted the month after. Please contact admin to renew.'
+)
+
 
 class Command(BaseCommand):
     help = 'Processes student account expiries (warns at 4 months, inactive at 5 months, deletes at 6 months)'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Students to update or delete per statement')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without touching the database')
+
+    def handle(self, *args, **options):
         now = timezone.now()
-        
-        # We need to find students who were approved
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
         # A 4 month warning is 120 days
         # A 5 month deactivation is 150 days
         # A 6 month deletion is 180 days
-        
         warning_threshold = now - timedelta(days=120)
         inactive_threshold = now - timedelta(days=150)
         delete_threshold = now - timedelta(days=180)
 
-        students = Student.objects.filter(approved_at__isnull=False)
-        
-        warnings_sent = 0
-        accounts_deactivated = 0
-        accounts_deleted = 0
-
-        for student in students:
-            # 6 MONTHS: Delete
-            if student.approved_at <= delete_threshold:
-                self.stdout.write(f"Deleting student {student.username} (Approved: {student.approved_at})")
-                student.delete()
-                accounts_deleted += 1
-                continue
-                
-            # 5 MONTHS: Disable account
-            if student.approved_at <= inactive_threshold and student.status == 'active':
-                self.stdout.write(f"Deactivating student {student.username} (Approved: {student.approved_at})")
-                student.status = 'inactive'
-                student.save()
-                accounts_deactivated += 1
-                continue
-                
-            # 4 MONTHS: Warn via Email and System Popup
-            if student.approved_at <= warning_threshold and student.warning_sent_at is None and student.status == 'active':
-                self.stdout.write(f"Sending warning to student {student.username} (Approved: {student.approved_at})")
-                
-                # Send Email
-                subject = 'Account Expiration Warning'
-                message = f'Dear {student.first_name},\n\nYour account has been active for 4 months. As per our archiving policy, your account will be disabled in 1 month (at 5 months) and deleted in 2 months (at 6 months). Please contact the administration if you need to renew your account.\n\nThank you.'
-                try:
-                    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [student.email], fail_silently=True)
-                except Exception as e:
-                    self.stderr.write(f"Failed to send email to {student.email}: {e}")
-
-                # Create Popup Notification
+        # The phases run oldest first, so each queryset only matches rows the earlier phases left alone
+        to_delete = Student.objects.filter(approved_at__lte=delete_threshold)
+        to_deactivate = Student.objects.filter(
+            approved_at__lte=inactive_threshold, approved_at__gt=delete_threshold, status='active'
+        )
+        to_warn = Student.objects.filter(
+            approved_at__lte=warning_threshold, approved_at__gt=inactive_threshold,
+            warning_sent_at__isnull=True, status='active',
+        )
+
+        if dry_run:
+            self.stdout.write(
+                f'Dry run: would warn {to_warn.count()}, deactivate {to_deactivate.count()}, delete {to_delete.count()}.'
+            )
+            return
+
+        with defer_dashboard_counters():
+            accounts_deleted = self.run_phase('Deleted', to_delete, batch_size, self.delete_chunk)
+            accounts_deactivated = self.run_phase(
+                'Deactivated', to_deactivate, batch_size,
+                lambda ids: Student.objects.filter(pk__in=ids).update(status='inactive'),
+            )
+            # update() sends no signals, so the Student counters have to be queued by hand
+            if accounts_deactivated:
+                schedule_dashboard_counter_refresh(Student)
+            popup = None
+            if to_warn.exists():
                 popup = Popup.objects.create(
-                    title='Account Expiration Warning',
-                    message='Your account will expire soon according to our 6-month archiving policy. It will be disabled next month and deleted the month after. Please contact admin to renew.',
-                    popup_type='warning',
-                    is_active=True,
+                    title=WARNING_SUBJECT, message=WARNING_POPUP, popup_type='warning', is_active=True,
                 )
-                popup.seen_by.add(student)
-                
-                # Update warning sent timestamp
-                student.warning_sent_at = now
-                student.save()
-                warnings_sent += 1
+            warnings_sent = self.run_phase(
+                'Warned', to_warn, batch_size, lambda ids: self.warn_chunk(ids, popup, now),
+            )
+        invalidate_student_chart_data()
 
         self.stdout.write(self.style.SUCCESS(f'Successfully processed accounts: {warnings_sent} warned, {accounts_deactivated} deactivated, {accounts_deleted} deleted.'))
+
+    def run_phase(self, label, queryset, batch_size, process_chunk):
+        """Apply process_chunk to the matching students batch_size ids at a time.
+
+        process_chunk must take the rows out of queryset, otherwise the loop never ends.
+        """
+        started = time.monotonic()
+        total = 0
+        while True:
+            ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                process_chunk(ids)
+            total += len(ids)
+        self.stdout.write(f'{label} {total} students in {time.monotonic() - started:.2f}s')
+        return total
+
+    def delete_chunk(self, ids):
+        Student.objects.filter(pk__in=ids).delete()
+
+    def warn_chunk(self, ids, popup, now):
+        students = Student.objects.filter(pk__in=ids).values_list('pk', 'email', 'first_name')
+        OutboundEmail.objects.bulk_create([
+            build_email(email, WARNING_SUBJECT, WARNING_EMAIL.format(first_name=first_name))
+            for pk, email, first_name in students if email
+        ])
+        Popup.seen_by.through.objects.bulk_create(
+            [Popup.seen_by.through(popup_id=popup.pk, student_id=pk) for pk in ids], ignore_conflicts=True,
+        )
+        Student.objects.filter(pk__in=ids).update(warning_sent_at=now)
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.reports import claim_next_report_job, release_stale_report_jobs, run_report_job
+
+
+class Command(BaseCommand):
+    help = 'Renders queued report exports (ReportJob) into media storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new jobs instead of exiting when the queue is empty')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to wait between polls in --loop mode')
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            released = release_stale_report_jobs()
+            if released:
+                self.stdout.write(f"Re-queued {released} report jobs left behind by a stopped worker")
+
+            job = claim_next_report_job()
+
+            if job is None:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+                continue
+
+            self.stdout.write(f"Rendering report job {job.pk} ({job.report_type}, {job.export_format})")
+            started = time.monotonic()
+            run_report_job(job)
+            elapsed = time.monotonic() - started
+
+            if job.status == 'done':
+                self.stdout.write(self.style.SUCCESS(f"Report job {job.pk} finished: {job.row_count} rows in {elapsed:.1f}s"))
+            else:
+                self.stderr.write(f"Report job {job.pk} failed: {job.error}")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from accounts.events import EVENT_RETENTION, prune_events
+from accounts.sync import SYNC_TOMBSTONE_RETENTION, prune_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        f'Deletes ?since= sync tombstones older than {SYNC_TOMBSTONE_RETENTION.days} days and '
+        f'dashboard push events older than {EVENT_RETENTION.days} day (run nightly)'
+    )
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        events_deleted = prune_events()
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} sync tombstones and {events_deleted} push events.'))
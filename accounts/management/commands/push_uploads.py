@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.uploads import (
+    PUSH_BATCH_SIZE, PUSH_MAX_ATTEMPTS, claim_upload_batch, push_upload, release_stale_uploads,
+)
+
+
+class Command(BaseCommand):
+    help = 'Copies spooled document uploads (PendingUpload) to remote media storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PUSH_BATCH_SIZE, help='Uploads to claim at a time')
+        parser.add_argument('--max-attempts', type=int, default=PUSH_MAX_ATTEMPTS, help='Give up on an upload after this many failed attempts')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new uploads instead of exiting when the spool is empty')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to wait between polls in --loop mode')
+
+    def handle(self, *args, **options):
+        total_pushed = total_failed = 0
+
+        while True:
+            close_old_connections()
+            released = release_stale_uploads()
+            if released:
+                self.stdout.write(f"Re-queued {released} uploads left behind by a stopped worker")
+
+            batch = claim_upload_batch(options['batch_size'])
+            if not batch:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+                continue
+
+            started = time.monotonic()
+            pushed = sum(push_upload(job, options['max_attempts']) for job in batch)
+            total_pushed += pushed
+            total_failed += len(batch) - pushed
+            self.stdout.write(f"Pushed {pushed} of {len(batch)} uploads in {time.monotonic() - started:.1f}s")
+
+        self.stdout.write(self.style.SUCCESS(f'Upload spool drained: {total_pushed} pushed, {total_failed} failed.'))
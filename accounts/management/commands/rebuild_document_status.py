@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.documents import sync_document_status_catalog
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the StudentDocumentStatus table behind the missing-document filters'
+
+    def handle(self, *args, **kwargs):
+        names = sync_document_status_catalog(rebuild=True)
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt document status for {len(names)} required documents.'))
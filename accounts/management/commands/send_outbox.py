@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.outbox import (
+    OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS, claim_email_batch, release_stale_emails, send_email_batch,
+)
+
+
+class Command(BaseCommand):
+    help = 'Delivers queued emails (OutboundEmail) in batches over one SMTP connection per batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=OUTBOX_BATCH_SIZE, help='Emails to send per SMTP connection')
+        parser.add_argument('--max-attempts', type=int, default=OUTBOX_MAX_ATTEMPTS, help='Give up on an email after this many failed attempts')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new emails instead of exiting when the outbox is empty')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to wait between polls in --loop mode')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+
+        while True:
+            close_old_connections()
+            released = release_stale_emails()
+            if released:
+                self.stdout.write(f"Re-queued {released} emails left behind by a stopped worker")
+
+            batch = claim_email_batch(options['batch_size'])
+            if not batch:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+                continue
+
+            started = time.monotonic()
+            sent, failed = send_email_batch(batch, options['max_attempts'])
+            total_sent += sent
+            total_failed += failed
+            self.stdout.write(f"Sent {sent} of {len(batch)} emails in {time.monotonic() - started:.1f}s ({failed} failed)")
+
+        self.stdout.write(self.style.SUCCESS(f'Outbox drained: {total_sent} sent, {total_failed} failed.'))
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_stats(apps, schema_editor):
+    Application = apps.get_model('home', 'Application')
+    DailyApplicationStat = apps.get_model('accounts', 'DailyApplicationStat')
+    buckets = Application.objects.filter(created_at__isnull=False).annotate(
+        day=TruncDate('created_at')
+    ).values('day', 'program_id', 'requirement_status').annotate(total=Count('app_id')).order_by()
+    DailyApplicationStat.objects.bulk_create([
+        DailyApplicationStat(day=b['day'], program_id=b['program_id'], status=b['requirement_status'], count=b['total'])
+        for b in buckets
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0019_reportjob'),
+        ('home', '0010_student_achievements_student_college_school_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyApplicationStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='home.program')),
+            ],
+            options={
+                'unique_together': {('day', 'program', 'status')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0020_dailyapplicationstat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_students', models.IntegerField(default=0)),
+                ('pending_student_registrations', models.IntegerField(default=0)),
+                ('pending_program_applications', models.IntegerField(default=0)),
+                ('active_popups', models.IntegerField(default=0)),
+                ('total_programs', models.IntegerField(default=0)),
+                ('unread_messages', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0026_alter_adminlog_timestamp'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='adminlog',
+            index=models.Index(fields=['timestamp', 'id'], name='adminlog_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminlog',
+            index=models.Index(fields=['admin', 'timestamp'], name='adminlog_admin_timestamp_idx'),
+        ),
+    ]
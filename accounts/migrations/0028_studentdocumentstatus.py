@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Copy of accounts.documents.STANDARD_REQUIRED_DOCUMENTS as of this migration
+STANDARD_REQUIRED_DOCUMENTS = [
+    "School ID (Current Semester)",
+    "Valid ID",
+    "TOR",
+    "Voter's Certificate",
+    "Certificate of Indigency",
+    "Letter of Application"
+]
+
+
+def backfill_document_statuses(apps, schema_editor):
+    Program = apps.get_model('home', 'Program')
+    Student = apps.get_model('accounts', 'Student')
+    StudentDocument = apps.get_model('accounts', 'StudentDocument')
+    StudentDocumentStatus = apps.get_model('accounts', 'StudentDocumentStatus')
+
+    required = list(STANDARD_REQUIRED_DOCUMENTS)
+    for requirements in Program.objects.order_by('program_id').values_list('document_requirements', flat=True):
+        required.extend(req for req in (requirements or []) if req and req not in required)
+
+    uploaded = set(StudentDocument.objects.values_list('student_id', 'document_name'))
+    statuses = [
+        StudentDocumentStatus(student_id=student_id, document_name=name, is_uploaded=(student_id, name) in uploaded)
+        for student_id in Student.objects.values_list('pk', flat=True)
+        for name in required
+    ]
+    StudentDocumentStatus.objects.bulk_create(statuses, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0027_adminlog_indexes'),
+        ('home', '0012_application_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentDocumentStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_name', models.CharField(max_length=255)),
+                ('is_uploaded', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_statuses', to='accounts.student')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('is_uploaded', False)), fields=['document_name', 'student'], name='docstatus_missing_idx')],
+                'unique_together': {('student', 'document_name')},
+            },
+        ),
+        migrations.RunPython(backfill_document_statuses, migrations.RunPython.noop),
+    ]
@@ -15,7 +15,15 @@ class Admin(models.Model):
 class AdminLog(models.Model):
     admin = models.ForeignKey(Admin, on_delete=models.CASCADE, related_name='logs')
     action = models.CharField(max_length=255)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the action is logged; entries are written later in bulk by accounts.audit
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # Audit log viewer: newest first, optionally for one admin
+        indexes = [
+            models.Index(fields=['timestamp', 'id'], name='adminlog_timestamp_idx'),
+            models.Index(fields=['admin', 'timestamp'], name='adminlog_admin_timestamp_idx'),
+        ]
 
     def __str__(self):
         return f"{self.admin.admin_name} - {self.action} at {self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
@@ -94,6 +102,15 @@ class Student(models.Model):
     approved_at = models.DateTimeField(null=True, blank=True)
     warning_sent_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        # Matched to the admin student list, reports, dashboard counts and the expiry command
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='student_status_created_idx'),
+            models.Index(fields=['barangay', 'status'], name='student_barangay_status_idx'),
+            models.Index(fields=['created_at'], name='student_created_idx'),
+            models.Index(fields=['approved_at'], name='student_approved_idx'),
+        ]
+
     def __str__(self):
         return self.username
 
@@ -102,12 +119,35 @@ class StudentDocument(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='documents')
     document_name = models.CharField(max_length=255, blank=True, null=True)
     file = models.FileField(upload_to='documents/')
+    # SHA-256 of the file; rows with the same hash share one stored blob (see accounts.uploads)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"Document for {self.student.username} - {self.document_name}"
 
 
+class StudentDocumentStatus(models.Model):
+    """One row per student and required document, kept current by signals in accounts.signals.
+
+    Lets admin filters ask "which students are missing X" with one indexed join
+    instead of comparing every student's uploads against the catalog.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='document_statuses')
+    document_name = models.CharField(max_length=255)
+    is_uploaded = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('student', 'document_name')
+        indexes = [
+            models.Index(fields=['document_name', 'student'], condition=models.Q(is_uploaded=False), name='docstatus_missing_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} - {self.document_name}: {'uploaded' if self.is_uploaded else 'missing'}"
+
+
 class Popup(models.Model):
     POPUP_TYPES = [
         ('info', 'Information'),
@@ -124,7 +164,11 @@ class Popup(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     expires_at = models.DateTimeField(blank=True, null=True)
     seen_by = models.ManyToManyField(Student, blank=True, related_name='seen_popups')
-    
+
+    class Meta:
+        # Partial index: boolean filters render as bare column tests that a plain index can't serve on SQLite
+        indexes = [models.Index(fields=['expires_at'], condition=models.Q(is_active=True), name='popup_active_expires_idx')]
+
     def __str__(self):
         return self.title
 
@@ -164,6 +208,7 @@ class Application(models.Model):
 class ApplicationDocument(models.Model):
     application = models.ForeignKey('home.Application', on_delete=models.CASCADE, related_name='documents')
     file = models.FileField(upload_to='application_docs/')
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -184,6 +229,196 @@ class Message(models.Model):
     body = models.TextField()
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped on every save so pollers can ask for rows changed ?since= their last sync
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # A student's inbox, newest first
+            models.Index(fields=['student', 'created_at'], name='message_student_created_idx'),
+            models.Index(fields=['student', 'sender_type'], condition=models.Q(is_read=False), name='message_student_unread_idx'),
+            # Admin inbox and the unread-from-students counter
+            models.Index(fields=['created_at'], name='message_created_idx'),
+            models.Index(fields=['sender_type'], condition=models.Q(is_read=False), name='message_sender_unread_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sender_type.capitalize()} Message: {self.subject} ({self.created_at.strftime('%Y-%m-%d')})"
+
+
+class ReportJob(models.Model):
+    EXPORT_FORMATS = [
+        ('csv', 'CSV'),
+        ('word', 'Word'),
+    ]
+    STATUSES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    admin = models.ForeignKey(Admin, on_delete=models.SET_NULL, null=True, blank=True, related_name='report_jobs')
+    report_type = models.CharField(max_length=50)
+    export_format = models.CharField(max_length=10, choices=EXPORT_FORMATS, default='csv')
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default='pending')
+    file = models.FileField(upload_to='reports/', blank=True, null=True)
+    row_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.report_type} report ({self.export_format}) - {self.status}"
+
+
+class DailyApplicationStat(models.Model):
+    """Per-day application counts by program and status, kept current by signals in accounts.signals"""
+    day = models.DateField()
+    program = models.ForeignKey('home.Program', on_delete=models.CASCADE, related_name='daily_stats')
+    status = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('day', 'program', 'status')
+
+    def __str__(self):
+        return f"{self.day} - {self.program_id} - {self.status}: {self.count}"
+
+
+class DashboardCounters(models.Model):
+    """Single-row counter cache behind the admin stats endpoint, refreshed by signals in accounts.signals"""
+    total_students = models.IntegerField(default=0)
+    pending_student_registrations = models.IntegerField(default=0)
+    pending_program_applications = models.IntegerField(default=0)
+    active_popups = models.IntegerField(default=0)
+    total_programs = models.IntegerField(default=0)
+    unread_messages = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Dashboard counters (updated {self.updated_at})"
+
+
+class OutboundEmail(models.Model):
+    """Email waiting in the outbox; delivered by the send_outbox management command"""
+    STATUSES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    to_email = models.EmailField()
+    from_email = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    body_text = models.TextField()
+    body_html = models.TextField(blank=True)
+    attachment = models.FileField(upload_to='email_attachments/', blank=True, null=True)
+    attachment_name = models.CharField(max_length=255, blank=True)
+    attachment_type = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f"Email to {self.to_email}: {self.subject} ({self.status})"
+
+
+class SyncTombstone(models.Model):
+    """Records a deleted row so ?since= pollers can drop it from their copy"""
+    KINDS = [
+        ('message', 'Message'),
+        ('popup', 'Popup'),
+        ('application', 'Application'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KINDS)
+    object_id = models.PositiveIntegerField()
+    # Owner of the deleted row, so students only see their own tombstones; no FK as the student may be gone too
+    student_id = models.IntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['kind', 'deleted_at'])]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted {self.deleted_at}"
+
+
+class NotificationEvent(models.Model):
+    """A 'something changed' hint pushed to dashboards over /api/events/; clients re-sync with ?since="""
+    AUDIENCES = [
+        ('admin', 'Admins'),
+        ('student', 'Students'),
+    ]
+
+    kind = models.CharField(max_length=20)
+    audience = models.CharField(max_length=10, choices=AUDIENCES)
+    # Null means every member of the audience
+    student_id = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind} event for {self.audience} {self.student_id or 'all'}"
+
+
+class Thumbnail(models.Model):
+    """Resized WebP copies of an uploaded image, made by the generate_thumbnails worker.
+
+    Keyed by the original's storage name, so documents sharing a blob share its thumbnails.
+    """
+    STATUSES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('skipped', 'Skipped'),
+        ('failed', 'Failed'),
+    ]
+
+    source = models.CharField(max_length=255, unique=True)
+    thumbnail = models.FileField(upload_to='thumbnails/', blank=True, null=True)
+    preview = models.FileField(upload_to='thumbnails/', blank=True, null=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default='pending')
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f"Thumbnail for {self.source} ({self.status})"
+
+
+class PendingUpload(models.Model):
+    """A document spooled to local disk, waiting for the push_uploads worker to copy it to remote storage"""
+    STATUSES = [
+        ('pending', 'Pending'),
+        ('pushing', 'Pushing'),
+        ('failed', 'Failed'),
+    ]
+
+    # Storage name the document rows already point at; also the file's path in the spool
+    name = models.CharField(max_length=255, unique=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f"Upload of {self.name} ({self.status})"
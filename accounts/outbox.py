@@ -0,0 +1,151 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import OutboundEmail
+
+
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BASE_SECONDS = 60
+# A batch still marked 'sending' after this long belongs to a worker that died mid-batch
+OUTBOX_STALE_AFTER = timedelta(minutes=15)
+
+
+def default_from_email():
+    return settings.EMAIL_HOST_USER if getattr(settings, 'EMAIL_HOST_USER', None) else 'admin@scholarsync.com'
+
+
+def store_attachment(attachment):
+    """Save an uploaded attachment once so every queued copy of an email can point at it"""
+    if not attachment:
+        return None
+    return {
+        'path': default_storage.save(f'email_attachments/{attachment.name}', attachment),
+        'name': attachment.name,
+        'type': attachment.content_type or '',
+    }
+
+
+def build_email(to_email, subject, body_text, body_html='', from_email=None, attachment=None):
+    """Return an unsaved OutboundEmail; attachment is the dict returned by store_attachment()"""
+    return OutboundEmail(
+        to_email=to_email,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        subject=subject,
+        body_text=body_text,
+        body_html=body_html or '',
+        attachment=attachment['path'] if attachment else None,
+        attachment_name=attachment['name'] if attachment else '',
+        attachment_type=attachment['type'] if attachment else '',
+    )
+
+
+def queue_emails(recipients, subject, body_text, body_html='', from_email=None, attachment=None):
+    """Add one outbox row per recipient and return how many were queued.
+
+    Empty recipient addresses are skipped.
+    """
+    emails = [
+        build_email(recipient, subject, body_text, body_html, from_email, attachment)
+        for recipient in recipients if recipient
+    ]
+    OutboundEmail.objects.bulk_create(emails, batch_size=500)
+    return len(emails)
+
+
+def queue_html_email(recipients, subject, body_html, from_email=None, attachment=None):
+    """Queue an HTML email with a plain-text alternative generated from it"""
+    return queue_emails(recipients, subject, strip_tags(body_html), body_html, from_email, attachment)
+
+
+def release_stale_emails():
+    """Put emails claimed by a crashed worker back in the queue"""
+    return OutboundEmail.objects.filter(
+        status='sending', claimed_at__lt=timezone.now() - OUTBOX_STALE_AFTER
+    ).update(status='pending', claimed_at=None)
+
+
+def claim_email_batch(batch_size=OUTBOX_BATCH_SIZE):
+    """Mark up to batch_size due emails as 'sending' and return them.
+
+    Rows locked by another worker are skipped on databases that support it.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if batch:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(status='sending', claimed_at=now)
+    return batch
+
+
+def send_email_batch(batch, max_attempts=OUTBOX_MAX_ATTEMPTS):
+    """Send a claimed batch over a single SMTP connection and record each outcome.
+
+    Failed emails are retried with exponential backoff until max_attempts is reached.
+    Returns a (sent, failed) tuple.
+    """
+    attachments = {}
+    sent = failed = 0
+    connection = get_connection()
+
+    try:
+        connection.open()
+    except Exception as e:
+        # SMTP is unreachable: leave the whole batch for a later run without spending an attempt
+        retry_at = timezone.now() + timedelta(seconds=OUTBOX_RETRY_BASE_SECONDS)
+        for email in batch:
+            email.status = 'pending'
+            email.last_error = f"Could not connect: {e}"
+            email.next_attempt_at = retry_at
+            email.claimed_at = None
+        OutboundEmail.objects.bulk_update(batch, ['status', 'last_error', 'next_attempt_at', 'claimed_at'])
+        return 0, len(batch)
+
+    try:
+        for email in batch:
+            email.attempts += 1
+            try:
+                msg = EmailMultiAlternatives(email.subject, email.body_text, email.from_email, [email.to_email], connection=connection)
+                if email.body_html:
+                    msg.attach_alternative(email.body_html, "text/html")
+                if email.attachment:
+                    # Queued copies of a batch message share one stored file; read it once
+                    if email.attachment.name not in attachments:
+                        with email.attachment.open('rb') as fh:
+                            attachments[email.attachment.name] = fh.read()
+                    name = email.attachment_name or os.path.basename(email.attachment.name)
+                    msg.attach(name, attachments[email.attachment.name], email.attachment_type or None)
+                msg.send()
+
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                sent += 1
+            except Exception as e:
+                email.last_error = str(e)
+                if email.attempts >= max_attempts:
+                    email.status = 'failed'
+                else:
+                    email.status = 'pending'
+                    email.next_attempt_at = timezone.now() + timedelta(seconds=OUTBOX_RETRY_BASE_SECONDS * 2 ** (email.attempts - 1))
+                failed += 1
+    finally:
+        connection.close()
+        for email in batch:
+            email.claimed_at = None
+        OutboundEmail.objects.bulk_update(
+            batch, ['status', 'attempts', 'last_error', 'next_attempt_at', 'claimed_at', 'sent_at']
+        )
+
+    return sent, failed
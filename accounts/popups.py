@@ -0,0 +1,76 @@
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import Popup
+
+
+# The cache is per process; every read checks it against get_popups_version, so a
+# popup saved or deleted through another worker is seen at once and the TTL only
+# bounds how long an unused list is kept
+ACTIVE_POPUPS_CACHE_TTL = 30  # seconds
+ACTIVE_POPUPS_CACHE_KEY = 'popups:active'
+
+
+def serialize_popup(popup):
+    return {
+        'id': popup.id,
+        'title': popup.title,
+        'message': popup.message,
+        'popup_type': popup.popup_type,
+        'created_at': popup.created_at.isoformat()
+    }
+
+
+def get_popups_version():
+    """Latest updated_at and row count of the popup table, shared by every worker.
+
+    A save bumps updated_at and a delete changes the count, so the pair changes
+    with every save() or delete(); QuerySet.update() would have to set updated_at.
+    """
+    version = Popup.objects.aggregate(latest=Max('updated_at'), count=Count('id'))
+    return version['latest'], version['count']
+
+
+def get_active_popups():
+    """Active, not yet expired popups, newest first, as (expires_at, data) pairs.
+
+    Costs one aggregate query to check the cached list is current. Expiry is
+    re-checked by the caller against the current time, so a cached list never
+    shows a popup past its expires_at.
+    """
+    version = get_popups_version()
+    cached = cache.get(ACTIVE_POPUPS_CACHE_KEY)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    popups = [
+        (popup.expires_at, serialize_popup(popup))
+        for popup in Popup.objects.filter(is_active=True).filter(
+            Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
+        ).order_by('-created_at')
+    ]
+    cache.set(ACTIVE_POPUPS_CACHE_KEY, (version, popups), ACTIVE_POPUPS_CACHE_TTL)
+    return popups
+
+
+def invalidate_active_popups():
+    cache.delete(ACTIVE_POPUPS_CACHE_KEY)
+
+
+def get_seen_popup_ids(student_id):
+    """Ids of the popups a student has dismissed.
+
+    Read from the database on every call: a dismissal has to hold on every
+    worker at once, which a per-process cache can't promise.
+    """
+    return set(Popup.seen_by.through.objects.filter(student_id=student_id).values_list('popup_id', flat=True))
+
+
+def get_unseen_popups(student_id, now=None):
+    """Popups a student should see: the cached active list minus the student's seen set"""
+    now = now or timezone.now()
+    seen = get_seen_popup_ids(student_id)
+    return [
+        data for expires_at, data in get_active_popups()
+        if data['id'] not in seen and (expires_at is None or expires_at > now)
+    ]
@@ -0,0 +1,388 @@
+import csv
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+from docx import Document
+from docx.shared import Inches, Pt, RGBColor
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import qn
+from docx.oxml import OxmlElement
+
+from home.models import Application
+from .models import Student, ReportJob
+
+
+REPORT_CHUNK_SIZE = 2000
+# A job still 'running' after this long belongs to a worker that died mid-render;
+# kept well above the slowest full export so a live job is never claimed twice
+REPORT_JOB_STALE_AFTER = timedelta(hours=1)
+DEFAULT_REPORT_FIELDS = ['id', 'username', 'name', 'email', 'program', 'status', 'date', 'barangay', 'school']
+
+# Export columns per report type, in output order: (field key, header, value lookups).
+# A column with several lookups joins their values with a space.
+REPORT_COLUMNS = {
+    'students': [
+        ('id', 'Student ID', ('student_id',)),
+        ('username', 'Username', ('username',)),
+        ('name', 'First Name', ('first_name',)),
+        ('name', 'Last Name', ('last_name',)),
+        ('email', 'Email', ('email',)),
+        ('program', 'Program', ('program_and_yr',)),
+        ('barangay', 'Barangay', ('barangay',)),
+        ('school', 'School', ('current_school',)),
+        ('status', 'Status', ('status',)),
+        ('date', 'Date Joined', ('created_at',)),
+    ],
+    'applications': [
+        ('id', 'App ID', ('app_id',)),
+        ('name', 'Student', ('student__first_name', 'student__last_name')),
+        ('program', 'Program', ('program__program_name',)),
+        ('barangay', 'Barangay', ('student__barangay',)),
+        ('school', 'School', ('student__current_school',)),
+        ('status', 'Status', ('requirement_status',)),
+        ('date', 'Date Submitted', ('created_at',)),
+    ],
+}
+
+REPORT_TITLE_ROWS = [
+    ['Municipality of Subic'],
+    ['Baraca-Camachile, National Highway, Subic, 2209 Zambales'],
+    ['Applicants List'],
+    [],
+]
+
+
+def get_report_queryset(report_type, params):
+    """Build the filtered report queryset from request-style params, or None for an unknown type"""
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    status = params.get('status')
+    barangay = params.get('barangay')
+    school = params.get('school')
+
+    if report_type == 'students':
+        query = Student.objects.all().order_by('-created_at')
+        if status and status != 'all':
+            query = query.filter(status=status)
+        if barangay and barangay != 'all':
+            query = query.filter(barangay__iexact=barangay)
+        if school:
+            query = query.filter(current_school__icontains=school)
+
+    elif report_type == 'applications':
+        query = Application.objects.select_related('student', 'program').all().order_by('-created_at')
+        if status and status != 'all':
+            query = query.filter(requirement_status=status)
+        program_id = params.get('program')
+        if program_id and program_id != 'all':
+            query = query.filter(program_id=program_id)
+        if barangay and barangay != 'all':
+            query = query.filter(student__barangay__iexact=barangay)
+        if school:
+            query = query.filter(student__current_school__icontains=school)
+
+    else:
+        return None
+
+    if start_date:
+        query = query.filter(created_at__date__gte=start_date)
+    if end_date:
+        query = query.filter(created_at__date__lte=end_date)
+    return query
+
+
+def get_report_columns(report_type, fields_param):
+    """Return the (header, lookups) pairs for the comma-separated ?fields= selection"""
+    selected_fields = fields_param.split(',') if fields_param else DEFAULT_REPORT_FIELDS
+    return [
+        (header, lookups)
+        for key, header, lookups in REPORT_COLUMNS[report_type]
+        if key in selected_fields
+    ]
+
+
+def iter_report_rows(query, columns, chunk_size=REPORT_CHUNK_SIZE):
+    """Yield formatted export rows, reading only the selected columns in chunks"""
+    lookups = [lookup for _, column_lookups in columns for lookup in column_lookups]
+    if not lookups:
+        return
+
+    for values in query.values_list(*lookups).iterator(chunk_size=chunk_size):
+        values = iter(values)
+        row = []
+        for _, column_lookups in columns:
+            parts = [next(values) for _ in column_lookups]
+            if column_lookups == ('created_at',):
+                row.append(parts[0].strftime('%Y-%m-%d') if parts[0] else 'N/A')
+            elif len(parts) > 1:
+                row.append(' '.join(str(part) for part in parts if part is not None))
+            else:
+                row.append(parts[0])
+        yield row
+
+
+class Echo:
+    """File-like object whose write() hands the line back, so csv.writer can feed a generator"""
+
+    def write(self, value):
+        return value
+
+
+def stream_report_csv(query, columns):
+    writer = csv.writer(Echo())
+    for title_row in REPORT_TITLE_ROWS:
+        yield writer.writerow(title_row)
+    yield writer.writerow([header for header, _ in columns])
+    for row in iter_report_rows(query, columns):
+        yield writer.writerow(row)
+
+
+def _set_cell_background(cell, color_hex):
+    tcPr = cell._tc.get_or_add_tcPr()
+    shd = OxmlElement('w:shd')
+    shd.set(qn('w:val'), 'clear')
+    shd.set(qn('w:color'), 'auto')
+    shd.set(qn('w:fill'), color_hex)
+    tcPr.append(shd)
+
+
+def _add_field(run, instruction):
+    """Append a Word field (e.g. PAGE, NUMPAGES) to a run"""
+    fldChar1 = OxmlElement('w:fldChar')
+    fldChar1.set(qn('w:fldCharType'), 'begin')
+    instrText1 = OxmlElement('w:instrText')
+    instrText1.set(qn('xml:space'), 'preserve')
+    instrText1.text = instruction
+    fldChar2 = OxmlElement('w:fldChar')
+    fldChar2.set(qn('w:fldCharType'), 'separate')
+    fldChar3 = OxmlElement('w:fldChar')
+    fldChar3.set(qn('w:fldCharType'), 'end')
+    run._r.append(fldChar1)
+    run._r.append(instrText1)
+    run._r.append(fldChar2)
+    run._r.append(fldChar3)
+
+
+def write_report_docx(rows, columns, target, start_date=None, end_date=None):
+    """Render report rows as the Word "Applicants List" document and save it to target"""
+    document = Document()
+
+    # Set Font to Calibri
+    style = document.styles['Normal']
+    font = style.font
+    font.name = 'Calibri'
+    font.size = Pt(11)
+
+    # Adjust Margins
+    section = document.sections[0]
+    section.top_margin = Inches(0.5)
+    section.left_margin = Inches(0.5)
+    section.right_margin = Inches(0.5)
+    section.bottom_margin = Inches(0.5)
+
+    # Header Setup
+    header_section = section.header
+    header_section.is_linked_to_previous = False
+
+    # 3 columns: Left padding/Logo, Center Title, Right Padding
+    htable = header_section.add_table(1, 3, width=Inches(7.5))
+    htable.autofit = False
+    htable.columns[0].width = Inches(2.0)
+    htable.columns[1].width = Inches(3.5)
+    htable.columns[2].width = Inches(2.0)
+
+    # Cell 0: Logo
+    cell0 = htable.cell(0, 0)
+    p0 = cell0.paragraphs[0]
+    p0.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+
+    logo_path = os.path.join(settings.BASE_DIR, 'accounts', 'static', 'accounts', 'subic_seal.png')
+    if os.path.exists(logo_path):
+        run0 = p0.add_run()
+        run0.add_picture(logo_path, height=Inches(0.8))
+
+    # Cell 1: Title and Address
+    cell1 = htable.cell(0, 1)
+    p1 = cell1.paragraphs[0]
+    p1.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run1 = p1.add_run('Municipality of Subic\n')
+    run1.bold = True
+    run1.font.size = Pt(22)
+
+    run_address = p1.add_run('Baraca-Camachile, National Highway, Subic, 2209 Zambales\n')
+    run_address.font.size = Pt(10)
+
+    run_title = p1.add_run('Applicants List')
+    run_title.bold = True
+    run_title.font.size = Pt(14)
+
+    # Remove the default empty paragraph in the header if it causes spacing issues
+    if len(header_section.paragraphs) > 0:
+        header_section.paragraphs[0]._element.getparent().remove(header_section.paragraphs[0]._element)
+
+    # Add a paragraph for the separator line
+    border_paragraph = header_section.add_paragraph()
+    border_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    border_paragraph.paragraph_format.space_after = Pt(6)
+
+    # Apply bottom border to this paragraph using OXML
+    p = border_paragraph._p
+    pPr = p.get_or_add_pPr()
+    pBdr = OxmlElement('w:pBdr')
+    bottom = OxmlElement('w:bottom')
+    bottom.set(qn('w:val'), 'single')
+    bottom.set(qn('w:sz'), '6')  # 1/8 pt, so 6 is 3/4 pt. Thin line.
+    bottom.set(qn('w:space'), '1')
+    bottom.set(qn('w:color'), 'CCCCCC') # Gray color
+    pBdr.append(bottom)
+    pPr.append(pBdr)
+
+    # Table
+    word_header = [header for header, _ in columns]
+    table = document.add_table(rows=1, cols=len(word_header))
+    table.style = 'Table Grid'
+
+    # Table Header
+    hdr_cells = table.rows[0].cells
+    for i, col_name in enumerate(word_header):
+        cell = hdr_cells[i]
+        _set_cell_background(cell, '2E8B57') # Sea Green
+        run = cell.paragraphs[0].add_run(col_name)
+        run.bold = True
+        run.font.color.rgb = RGBColor(255, 255, 255) # White text
+        cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    # Table Data Content
+    row_count = 0
+    for index, row_content in enumerate(rows):
+        row_cells = table.add_row().cells
+        is_even = (index % 2 == 0)
+
+        for cell, value in zip(row_cells, row_content):
+            cell.text = '' if value is None else str(value)
+            if is_even:
+                _set_cell_background(cell, 'E8F5E9') # Light Green
+        row_count += 1
+
+    # Footer Setup (Metadata, Page Number, Approved By)
+    footer = section.footer
+    footer.is_linked_to_previous = False
+
+    ftable = footer.add_table(1, 3, width=Inches(7.5))
+    ftable.autofit = False
+    ftable.columns[0].width = Inches(2.5)
+    ftable.columns[1].width = Inches(2.5)
+    ftable.columns[2].width = Inches(2.5)
+
+    # Left Footer: Generated On
+    fcell0 = ftable.cell(0, 0)
+    fp0 = fcell0.paragraphs[0]
+    fp0.alignment = WD_ALIGN_PARAGRAPH.LEFT
+    fr0 = fp0.add_run(f'Generated on: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+    fr0.font.color.rgb = RGBColor(128, 128, 128)
+    fr0.font.size = Pt(9)
+    if start_date or end_date:
+        sd = start_date if start_date else 'Any'
+        ed = end_date if end_date else 'Any'
+        fr_dates = fp0.add_run(f'\nPeriod: {sd} to {ed}')
+        fr_dates.font.color.rgb = RGBColor(128, 128, 128)
+        fr_dates.font.size = Pt(9)
+
+    # Middle Footer: Page Numbers
+    fcell1 = ftable.cell(0, 1)
+    fp1 = fcell1.paragraphs[0]
+    fp1.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    fr1 = fp1.add_run('')
+    fr1.font.color.rgb = RGBColor(128, 128, 128)
+    fr1.font.size = Pt(9)
+
+    _add_field(fp1.add_run(), "PAGE")
+
+    fr_of = fp1.add_run(' out of ')
+    fr_of.font.color.rgb = RGBColor(128, 128, 128)
+    fr_of.font.size = Pt(9)
+
+    _add_field(fp1.add_run(), "NUMPAGES")
+
+    # Right Footer: Approved By
+    fcell2 = ftable.cell(0, 2)
+    fp2 = fcell2.paragraphs[0]
+    fp2.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    fr2 = fp2.add_run('Approved by: ____________________')
+    fr2.font.color.rgb = RGBColor(0, 0, 0)
+    fr2.font.size = Pt(11)
+
+    document.save(target)
+    return row_count
+
+
+def write_report_csv(rows, columns, target):
+    """Write report rows as CSV to a text file object and return the row count"""
+    writer = csv.writer(target)
+    writer.writerows(REPORT_TITLE_ROWS)
+    writer.writerow([header for header, _ in columns])
+    row_count = 0
+    for row in rows:
+        writer.writerow(row)
+        row_count += 1
+    return row_count
+
+
+def release_stale_report_jobs():
+    """Put jobs claimed by a crashed worker back in the queue"""
+    return ReportJob.objects.filter(
+        status='running', started_at__lt=timezone.now() - REPORT_JOB_STALE_AFTER
+    ).update(status='pending', started_at=None)
+
+
+def claim_next_report_job():
+    """Move the oldest pending ReportJob to running and return it, or None if there is nothing to do.
+
+    The conditional UPDATE makes claiming safe when several workers poll the same table.
+    """
+    pending_ids = ReportJob.objects.filter(status='pending').order_by('created_at').values_list('pk', flat=True)[:10]
+    for job_id in pending_ids:
+        if ReportJob.objects.filter(pk=job_id, status='pending').update(status='running', started_at=timezone.now()):
+            return ReportJob.objects.get(pk=job_id)
+    return None
+
+
+def run_report_job(job):
+    """Render a claimed ReportJob into media storage and record the outcome on the job"""
+    params = job.params or {}
+
+    try:
+        query = get_report_queryset(job.report_type, params)
+        if query is None:
+            raise ValueError(f"Invalid report type: {job.report_type}")
+        columns = get_report_columns(job.report_type, params.get('fields'))
+        rows = iter_report_rows(query, columns)
+
+        extension = 'docx' if job.export_format == 'word' else 'csv'
+        filename = f"report_{job.report_type}_{job.created_at.strftime('%Y%m%d')}_{job.pk}.{extension}"
+
+        # Render to a local temp file first, then hand it to whatever storage backend is configured
+        with tempfile.TemporaryFile() as tmp:
+            if job.export_format == 'word':
+                row_count = write_report_docx(rows, columns, tmp, params.get('start_date'), params.get('end_date'))
+            else:
+                with open(tmp.fileno(), 'w', newline='', encoding='utf-8', closefd=False) as text_file:
+                    row_count = write_report_csv(rows, columns, text_file)
+            tmp.seek(0)
+            job.file.save(filename, File(tmp), save=False)
+
+        job.row_count = row_count
+        job.status = 'done'
+        job.error = ''
+    except Exception as e:
+        job.status = 'failed'
+        job.error = str(e)
+
+    job.finished_at = timezone.now()
+    job.save()
+    return job
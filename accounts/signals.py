@@ -0,0 +1,148 @@
+from django.core.signals import request_finished
+from django.db import connections
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from home.models import Application, Program
+from .models import ApplicationDocument, Message, Popup, Student, StudentDocument
+from .stats import (
+    application_stat_key, bump_daily_application_stat,
+    invalidate_student_chart_data, schedule_dashboard_counter_refresh,
+)
+from .audit import flush_admin_logs
+from .documents import invalidate_required_documents, refresh_student_document_status, sync_document_status_catalog
+from .popups import invalidate_active_popups
+from .sync import record_tombstone
+from .thumbnails import queue_thumbnails
+
+
+# Keep DailyApplicationStat in step with Application rows. Queryset.update() and
+# bulk_create() skip these signals; run backfill_application_stats after using them.
+
+@receiver(pre_save, sender=Application)
+def remember_application_stat_key(sender, instance, **kwargs):
+    instance._old_stat_key = None
+    if not instance._state.adding and instance.pk:
+        old = Application.objects.filter(pk=instance.pk).only('created_at', 'program', 'requirement_status').first()
+        if old is not None:
+            instance._old_stat_key = application_stat_key(old)
+
+
+@receiver(post_save, sender=Application)
+def update_application_stats_on_save(sender, instance, created, **kwargs):
+    old_key = getattr(instance, '_old_stat_key', None)
+    new_key = application_stat_key(instance)
+    if new_key != old_key:
+        bump_daily_application_stat(old_key, -1)
+        bump_daily_application_stat(new_key, 1)
+
+
+@receiver(post_delete, sender=Application)
+def update_application_stats_on_delete(sender, instance, **kwargs):
+    bump_daily_application_stat(application_stat_key(instance), -1)
+
+
+# Student chart data is cached briefly; drop it whenever a student row changes so
+# status changes show up on the next dashboard load.
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_student_stats(sender, **kwargs):
+    invalidate_student_chart_data()
+
+
+# Recount the dashboard counters fed by a model whenever one of its rows changes.
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+@receiver(post_save, sender=Popup)
+@receiver(post_delete, sender=Popup)
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def refresh_dashboard_counters_on_change(sender, **kwargs):
+    schedule_dashboard_counter_refresh(sender)
+
+
+# Leave a tombstone for deleted rows that dashboards sync with ?since=.
+
+@receiver(post_delete, sender=Message)
+def record_message_tombstone(sender, instance, **kwargs):
+    record_tombstone('message', instance.pk, instance.student_id)
+
+
+@receiver(post_delete, sender=Application)
+def record_application_tombstone(sender, instance, **kwargs):
+    record_tombstone('application', instance.pk, instance.student_id)
+
+
+@receiver(post_delete, sender=Popup)
+def record_popup_tombstone(sender, instance, **kwargs):
+    record_tombstone('popup', instance.pk)
+
+
+# get_student_popups serves the active popup list from the cache; drop this
+# process's copy as soon as a popup is saved or deleted.
+
+@receiver(post_save, sender=Popup)
+@receiver(post_delete, sender=Popup)
+def invalidate_popup_cache(sender, **kwargs):
+    invalidate_active_popups()
+
+
+# Admin audit log entries are buffered in accounts.audit; write them once the
+# response has gone out so they never cost the request a round trip.
+
+@receiver(request_finished)
+def flush_admin_logs_after_request(sender, **kwargs):
+    flush_admin_logs()
+    # Django's own close_old_connections receiver may already have run for this
+    # request, so release the connection the flush used the same way: back to the
+    # pool, or closed once past CONN_MAX_AGE. Tests run requests inside a transaction,
+    # which must stay open.
+    for conn in connections.all(initialized_only=True):
+        if not conn.in_atomic_block:
+            conn.close_if_unusable_or_obsolete()
+
+
+# The required-documents catalog is built from every program's document_requirements.
+
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+def invalidate_required_documents_cache(sender, **kwargs):
+    invalidate_required_documents()
+    sync_document_status_catalog()
+
+
+# StudentDocumentStatus mirrors each student's uploads against that catalog.
+
+@receiver(post_save, sender=Student)
+def create_document_statuses(sender, instance, created, **kwargs):
+    if created:
+        refresh_student_document_status(instance.pk)
+
+
+@receiver(post_save, sender=StudentDocument)
+@receiver(post_delete, sender=StudentDocument)
+def refresh_document_statuses(sender, instance, origin=None, **kwargs):
+    # Deleting a student cascades to its documents; its status rows go with it
+    if getattr(origin, 'model', type(origin)) is Student:
+        return
+    refresh_student_document_status(instance.student_id)
+
+
+# Uploaded images get WebP thumbnails from the generate_thumbnails worker.
+
+@receiver(post_save, sender=StudentDocument)
+@receiver(post_save, sender=ApplicationDocument)
+def queue_document_thumbnail(sender, instance, **kwargs):
+    queue_thumbnails(instance.file.name)
+
+
+@receiver(post_save, sender=Program)
+def queue_program_image_thumbnail(sender, instance, **kwargs):
+    if instance.program_image:
+        queue_thumbnails(instance.program_image.name)
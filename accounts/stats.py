@@ -0,0 +1,246 @@
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from home.models import Application, Program
+from .models import DailyApplicationStat, DashboardCounters, Message, Popup, Student
+
+
+def application_stat_key(application):
+    """Return the (day, program_id, status) rollup bucket an application counts towards, or None"""
+    if application.created_at is None or application.program_id is None:
+        return None
+    day = timezone.localtime(application.created_at).date() if timezone.is_aware(application.created_at) else application.created_at.date()
+    return (day, application.program_id, application.requirement_status)
+
+
+def bump_daily_application_stat(key, delta):
+    """Add delta to the DailyApplicationStat bucket for key, creating the row on first use"""
+    if key is None or delta == 0:
+        return
+    day, program_id, status = key
+    bucket = DailyApplicationStat.objects.filter(day=day, program_id=program_id, status=status)
+    if bucket.update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            DailyApplicationStat.objects.create(day=day, program_id=program_id, status=status, count=delta)
+    except IntegrityError:
+        # Another request created the bucket between our UPDATE and INSERT
+        bucket.update(count=F('count') + delta)
+
+
+@transaction.atomic
+def rebuild_daily_application_stats():
+    """Recompute the whole DailyApplicationStat table from Application rows and return the bucket count"""
+    DailyApplicationStat.objects.all().delete()
+    buckets = Application.objects.filter(created_at__isnull=False).annotate(
+        day=TruncDate('created_at')
+    ).values('day', 'program_id', 'requirement_status').annotate(total=Count('app_id')).order_by()
+
+    stats = [
+        DailyApplicationStat(day=b['day'], program_id=b['program_id'], status=b['requirement_status'], count=b['total'])
+        for b in buckets
+    ]
+    DailyApplicationStat.objects.bulk_create(stats, batch_size=1000)
+    return len(stats)
+
+
+# -------------------------------------------------------------
+# Student statistics charts
+# -------------------------------------------------------------
+
+STUDENT_CHART_TYPES = ('status', 'program', 'monthly')
+STUDENT_STATS_CACHE_TTL = 60  # seconds
+STUDENT_STATS_CACHE_KEY = 'student_stats:{}'
+
+STATUS_COLORS = {
+    'active': 'rgba(102, 126, 234, 0.8)',
+    'pending': 'rgba(243, 156, 18, 0.8)',
+    'rejected': 'rgba(231, 76, 60, 0.8)'
+}
+
+PROGRAM_COLORS = [
+    'rgba(102, 126, 234, 0.8)',
+    'rgba(118, 75, 162, 0.8)',
+    'rgba(39, 174, 96, 0.8)',
+    'rgba(243, 156, 18, 0.8)',
+    'rgba(231, 76, 60, 0.8)',
+    'rgba(52, 152, 219, 0.8)',
+    'rgba(155, 89, 182, 0.8)',
+    'rgba(46, 204, 113, 0.8)',
+    'rgba(230, 126, 34, 0.8)',
+    'rgba(231, 76, 60, 0.8)'
+]
+
+
+def _build_student_chart_data(chart_type):
+    labels = []
+    data = []
+    colors = None
+
+    if chart_type == 'status':
+        # Get students by status
+        colors = []
+        for item in Student.objects.values('status').annotate(count=Count('student_id')).order_by('status'):
+            labels.append(item['status'].title())
+            data.append(item['count'])
+            colors.append(STATUS_COLORS.get(item['status'], 'rgba(102, 126, 234, 0.8)'))
+
+    elif chart_type == 'program':
+        # Get students by program (top 10)
+        program_data = Student.objects.values('program_and_yr').annotate(count=Count('student_id')).order_by('-count')[:10]
+        for item in program_data:
+            labels.append(item['program_and_yr'])
+            data.append(item['count'])
+        colors = PROGRAM_COLORS[:len(labels)]
+
+    elif chart_type == 'monthly':
+        # Get monthly registrations for the last 6 months
+        start_date = timezone.now().date() - timedelta(days=180)
+        monthly_data = Student.objects.filter(
+            created_at__date__gte=start_date
+        ).annotate(
+            month=TruncMonth('created_at')
+        ).values('month').annotate(count=Count('student_id')).order_by('month')
+
+        for item in monthly_data:
+            labels.append(item['month'].strftime('%b'))
+            data.append(item['count'])
+
+    return {'labels': labels, 'data': data, 'colors': colors}
+
+
+def get_student_chart_data(chart_type):
+    """Return chart data for the student statistics charts, cached for STUDENT_STATS_CACHE_TTL seconds"""
+    key = STUDENT_STATS_CACHE_KEY.format(chart_type)
+    chart_data = cache.get(key)
+    if chart_data is None:
+        chart_data = _build_student_chart_data(chart_type)
+        cache.set(key, chart_data, STUDENT_STATS_CACHE_TTL)
+    return chart_data
+
+
+def invalidate_student_chart_data():
+    cache.delete_many([STUDENT_STATS_CACHE_KEY.format(chart_type) for chart_type in STUDENT_CHART_TYPES])
+
+
+# -------------------------------------------------------------
+# Admin dashboard counters
+# -------------------------------------------------------------
+
+DASHBOARD_COUNTERS_PK = 1
+
+
+def _count_students():
+    return Student.objects.aggregate(
+        total_students=Count('student_id', filter=Q(status='active')),
+        pending_student_registrations=Count('student_id', filter=Q(status='pending')),
+    )
+
+
+def _count_applications():
+    return Application.objects.aggregate(
+        pending_program_applications=Count('app_id', filter=Q(requirement_status='submitted')),
+    )
+
+
+def _count_popups():
+    return Popup.objects.aggregate(active_popups=Count('id', filter=Q(is_active=True)))
+
+
+def _count_programs():
+    return Program.objects.aggregate(total_programs=Count('program_id'))
+
+
+def _count_messages():
+    return Message.objects.aggregate(
+        unread_messages=Count('id', filter=Q(is_read=False, sender_type='student')),
+    )
+
+
+# Which counters each model feeds, so a write only recounts its own table
+DASHBOARD_COUNTER_SOURCES = {
+    Student: _count_students,
+    Application: _count_applications,
+    Popup: _count_popups,
+    Program: _count_programs,
+    Message: _count_messages,
+}
+
+_counter_state = threading.local()
+
+
+def compute_dashboard_counts():
+    """Count every dashboard statistic with one conditional aggregate per table"""
+    counts = {}
+    for count in DASHBOARD_COUNTER_SOURCES.values():
+        counts.update(count())
+    return counts
+
+
+def refresh_dashboard_counters(*models):
+    """Recount the counters fed by the given models (all of them if none given) into the cache row.
+
+    The row stays locked from before the recount until the write, so concurrent
+    refreshes run one after another and the last one to write also counted last.
+    """
+    sources = [DASHBOARD_COUNTER_SOURCES[model] for model in models] if models else DASHBOARD_COUNTER_SOURCES.values()
+    with transaction.atomic():
+        locked = DashboardCounters.objects.select_for_update().filter(pk=DASHBOARD_COUNTERS_PK).values_list('pk', flat=True)
+        if not list(locked):
+            DashboardCounters.objects.update_or_create(pk=DASHBOARD_COUNTERS_PK, defaults=compute_dashboard_counts())
+            return
+        counts = {}
+        for count in sources:
+            counts.update(count())
+        DashboardCounters.objects.filter(pk=DASHBOARD_COUNTERS_PK).update(updated_at=timezone.now(), **counts)
+
+
+def schedule_dashboard_counter_refresh(model):
+    """Refresh the counters fed by model once the current transaction commits"""
+    if not settings.DASHBOARD_COUNTER_CACHE:
+        return
+    deferred = getattr(_counter_state, 'deferred', None)
+    if deferred is not None:
+        deferred.add(model)
+        return
+    transaction.on_commit(lambda: refresh_dashboard_counters(model))
+
+
+@contextmanager
+def defer_dashboard_counters():
+    """Collect counter refreshes during bulk work and run each affected recount once at the end"""
+    outer = getattr(_counter_state, 'deferred', None) is None
+    if outer:
+        _counter_state.deferred = set()
+    try:
+        yield
+    finally:
+        if outer:
+            models = _counter_state.deferred
+            _counter_state.deferred = None
+            if models and settings.DASHBOARD_COUNTER_CACHE:
+                transaction.on_commit(lambda: refresh_dashboard_counters(*models))
+
+
+def get_dashboard_counts():
+    """Return the admin dashboard statistics, from the counter cache row when it is enabled"""
+    if not settings.DASHBOARD_COUNTER_CACHE:
+        return compute_dashboard_counts()
+
+    counts = DashboardCounters.objects.filter(pk=DASHBOARD_COUNTERS_PK).values(
+        'total_students', 'pending_student_registrations', 'pending_program_applications',
+        'active_popups', 'total_programs', 'unread_messages',
+    ).first()
+    if counts is None:
+        counts = compute_dashboard_counts()
+        DashboardCounters.objects.update_or_create(pk=DASHBOARD_COUNTERS_PK, defaults=counts)
+    return counts
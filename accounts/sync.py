@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import SyncTombstone
+
+
+# Tombstones older than this are pruned; a client whose ?since= is older must do a full sync
+SYNC_TOMBSTONE_RETENTION = timedelta(days=30)
+# A row saved in a transaction that commits just after a poll can carry an updated_at
+# slightly older than the token handed out; re-send that window rather than miss it
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def parse_since(value):
+    """Parse a ?since= sync token (an ISO timestamp) into an aware datetime.
+
+    Returns None when no token was given and raises ValueError for a malformed one.
+    """
+    if not value:
+        return None
+    since = parse_datetime(value.replace(' ', '+'))
+    if since is None:
+        raise ValueError(f'Invalid since: {value}')
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def needs_full_sync(since, now=None):
+    """True when since predates the tombstones we still keep, so deletions could have been missed"""
+    return since < (now or timezone.now()) - SYNC_TOMBSTONE_RETENTION
+
+
+def changed_since(since):
+    """Lower bound for updated_at lookups, widened by SYNC_OVERLAP"""
+    return since - SYNC_OVERLAP
+
+
+def record_tombstone(kind, object_id, student_id=None):
+    SyncTombstone.objects.create(kind=kind, object_id=object_id, student_id=student_id)
+
+
+def get_deleted_ids(kind, since, student_id=None):
+    """Ids of kind rows deleted since the token; student_id limits them to that student's rows"""
+    tombstones = SyncTombstone.objects.filter(kind=kind, deleted_at__gte=changed_since(since))
+    if student_id is not None:
+        tombstones = tombstones.filter(student_id=student_id)
+    return list(tombstones.values_list('object_id', flat=True).distinct())
+
+
+def prune_tombstones(now=None):
+    """Drop tombstones past SYNC_TOMBSTONE_RETENTION and return how many were removed"""
+    deleted, _ = SyncTombstone.objects.filter(
+        deleted_at__lt=(now or timezone.now()) - SYNC_TOMBSTONE_RETENTION
+    ).delete()
+    return deleted
@@ -1,3 +1,1087 @@
-from django.test import TestCase
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from PIL import Image
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.test import AsyncClient, TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from home.models import Program, Application
+from .models import (
+    Admin, AdminLog, Student, StudentDocument, ApplicationDocument, DailyApplicationStat, DashboardCounters, Message,
+    NotificationEvent, OutboundEmail, PendingUpload, Popup, ReportJob, StudentDocumentStatus, Thumbnail,
+)
+from .audit import AuditLogBuffer, log_admin_action
+from .documents import get_required_documents, students_missing_document
+from .outbox import queue_emails
+from .signals import flush_admin_logs_after_request
+from .stats import defer_dashboard_counters, get_dashboard_counts, refresh_dashboard_counters
+
+
+def make_student(index, **kwargs):
+    fields = {
+        'username': f'student{index}',
+        'first_name': 'Test',
+        'last_name': f'Student {index}',
+        'bday': date(2004, 1, 1),
+        'address': 'Subic, Zambales',
+        'contact_num': '09123456789',
+        'email': f'student{index}@example.com',
+        'password': 'Password1',
+    }
+    fields.update(kwargs)
+    return Student.objects.create(**fields)
+
+
+TEST_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class AdminAPITestCase(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEST_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.admin = Admin.objects.create(admin_name='admin', password='admin')
+        self.client = Client()
+        session = self.client.session
+        session['user_role'] = 'admin'
+        session['user_id'] = self.admin.admin_id
+        session.save()
+
+
+class ProgramApplicationsAPITest(AdminAPITestCase):
+    url = '/api/admin/program-applications/'
+
+    def setUp(self):
+        super().setUp()
+        self.program = Program.objects.create(program_name='Scholarship A')
+        self.other_program = Program.objects.create(program_name='Scholarship B')
+        self.next_index = 0
+
+    def add_applications(self, count, program=None, status='submitted'):
+        for _ in range(count):
+            self.next_index += 1
+            student = make_student(self.next_index)
+            StudentDocument.objects.create(
+                student=student, document_name='TOR',
+                file=SimpleUploadedFile('tor.pdf', b'tor'),
+            )
+            app = Application.objects.create(
+                student=student, program=program or self.program, requirement_status=status,
+            )
+            ApplicationDocument.objects.create(application=app, file=SimpleUploadedFile('form.pdf', b'form'))
+
+    def count_queries(self, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.add_applications(3)
+        small = self.count_queries()
+        self.add_applications(30)
+        large = self.count_queries()
+        self.assertEqual(small, large)
+
+    def test_cursor_walks_every_application_once(self):
+        self.add_applications(7)
+        seen = []
+        cursor = None
+        while True:
+            params = {'page_size': 3}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(self.url, params).json()
+            seen.extend(app['app_id'] for app in data['applications'])
+            if not data['has_more']:
+                break
+            cursor = data['next_cursor']
+        expected = list(Application.objects.order_by('-app_id').values_list('app_id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_filters_by_status_and_program(self):
+        self.add_applications(2)
+        self.add_applications(2, status='approved')
+        self.add_applications(1, program=self.other_program, status='approved')
+
+        data = self.client.get(self.url, {'status': 'approved', 'program': self.program.program_id}).json()
+        self.assertEqual(len(data['applications']), 2)
+        self.assertTrue(all(app['requirement_status'] == 'approved' for app in data['applications']))
+        self.assertEqual(len(data['applications'][0]['documents']), 1)
+        self.assertEqual(len(data['applications'][0]['student']['student_documents']), 1)
+
+
+class StudentApplicationsAPITest(AdminAPITestCase):
+    url = '/api/admin/student-applications/'
+
+    def add_students(self, start, count, **kwargs):
+        for index in range(start, start + count):
+            student = make_student(index, **kwargs)
+            StudentDocument.objects.create(
+                student=student, document_name='Valid ID',
+                file=SimpleUploadedFile('id.png', b'id'),
+            )
+
+    def count_queries(self, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.add_students(0, 3)
+        small = self.count_queries()
+        self.add_students(3, 30)
+        self.assertEqual(small, self.count_queries())
+
+    def test_summary_view_leaves_out_documents(self):
+        self.add_students(0, 2)
+        data = self.client.get(self.url, {'view': 'summary'}).json()
+        self.assertEqual(len(data['applications']), 2)
+        self.assertNotIn('student_documents', data['applications'][0])
+
+        data = self.client.get(self.url).json()
+        self.assertEqual(len(data['applications'][0]['student_documents']), 1)
+
+    def test_filters_sorting_and_pages(self):
+        self.add_students(0, 3, status='active', barangay='Matain')
+        self.add_students(3, 2, status='pending', barangay='Matain')
+        self.add_students(5, 2, status='active', barangay='Cawag')
+
+        params = {'status': 'active', 'barangay': 'Matain', 'sort': 'student_id', 'page_size': 2}
+        first = self.client.get(self.url, params).json()
+        second = self.client.get(self.url, {**params, 'page': 2}).json()
+        self.assertTrue(first['has_more'])
+        self.assertFalse(second['has_more'])
+        usernames = [s['username'] for s in first['applications'] + second['applications']]
+        self.assertEqual(usernames, ['student0', 'student1', 'student2'])
+
+    def test_rejects_unknown_sort_field(self):
+        response = self.client.get(self.url, {'sort': 'password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_and_student_id_cover_every_page(self):
+        self.add_students(0, 5)
+        Student.objects.filter(username='student0').update(last_name='Dela Cruz')
+        data = self.client.get(self.url, {'search': 'dela', 'page_size': 1, 'sort': '-student_id'}).json()
+        self.assertEqual([s['username'] for s in data['applications']], ['student0'])
+
+        student = Student.objects.get(username='student1')
+        data = self.client.get(self.url, {'student_id': student.pk, 'page_size': 1}).json()
+        self.assertEqual([s['id'] for s in data['applications']], [student.pk])
+        self.assertEqual(self.client.get(self.url, {'student_id': 'x'}).status_code, 400)
+
+    def test_rejects_malformed_created_dates(self):
+        for value in ('yesterday', '2024-02-30'):
+            response = self.client.get(self.url, {'created_from': value})
+            self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.url, {'created_from': '2024-01-01', 'created_to': '2999-12-31'})
+        self.assertEqual(response.status_code, 200)
+
+
+class ReportExportTest(AdminAPITestCase):
+    url = '/api/admin/reports/'
+
+    def setUp(self):
+        super().setUp()
+        program = Program.objects.create(program_name='Scholarship A')
+        for index in range(3):
+            student = make_student(index, barangay='Matain', current_school='Subic NHS')
+            Application.objects.create(student=student, program=program, requirement_status='submitted')
+
+    def read_csv(self, params):
+        response = self.client.get(self.url, {'export': 'csv', **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_csv_streams_only_selected_fields(self):
+        rows = self.read_csv({'type': 'students', 'fields': 'username,name'})
+        self.assertEqual(rows[0], ['Municipality of Subic'])
+        self.assertEqual(rows[4], ['Username', 'First Name', 'Last Name'])
+        self.assertEqual(len(rows[5:]), 3)
+        self.assertEqual(rows[5][1:], ['Test', rows[5][2]])
+
+    def test_csv_applications_report(self):
+        rows = self.read_csv({'type': 'applications', 'fields': 'name,program,barangay,status'})
+        self.assertEqual(rows[4], ['Student', 'Program', 'Barangay', 'Status'])
+        self.assertEqual(rows[5][1:], ['Scholarship A', 'Matain', 'submitted'])
+        self.assertTrue(rows[5][0].startswith('Test Student'))
+
+
+class ReportJobTest(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        for index in range(3):
+            make_student(index, status='active')
+
+    def queue(self, **params):
+        response = self.client.post('/api/admin/reports/jobs/', json.dumps(params), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['job_id']
+
+    def test_worker_renders_queued_exports(self):
+        csv_job = self.queue(type='students', export='csv', fields='username')
+        word_job = self.queue(type='students', export='word', status='active')
+        self.assertEqual(self.client.get(f'/api/admin/reports/jobs/{csv_job}/').json()['status'], 'pending')
+        self.assertEqual(self.client.get(f'/api/admin/reports/jobs/{csv_job}/download/').status_code, 409)
+
+        call_command('process_report_jobs', stdout=io.StringIO())
+
+        for job_id in (csv_job, word_job):
+            data = self.client.get(f'/api/admin/reports/jobs/{job_id}/').json()
+            self.assertEqual(data['status'], 'done', data['error'])
+            self.assertEqual(data['row_count'], 3)
+
+        response = self.client.get(f'/api/admin/reports/jobs/{csv_job}/download/')
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[4], ['Username'])
+        self.assertEqual(len(rows[5:]), 3)
+
+    def test_rejects_unknown_report_type(self):
+        response = self.client.post('/api/admin/reports/jobs/', json.dumps({'type': 'admins'}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_jobs_left_running_by_a_stopped_worker_are_requeued(self):
+        stale = self.queue(type='students', export='csv')
+        live = self.queue(type='students', export='csv')
+        ReportJob.objects.filter(pk=stale).update(status='running', started_at=timezone.now() - timedelta(hours=2))
+        ReportJob.objects.filter(pk=live).update(status='running', started_at=timezone.now())
+
+        call_command('process_report_jobs', stdout=io.StringIO())
+        self.assertEqual(ReportJob.objects.get(pk=stale).status, 'done')
+        self.assertEqual(ReportJob.objects.get(pk=live).status, 'running')
+
+
+class ApplicationTrendsTest(AdminAPITestCase):
+    url = '/api/admin/charts/application-trends/'
+
+    def setUp(self):
+        super().setUp()
+        self.program = Program.objects.create(program_name='Scholarship A')
+        self.students = [make_student(index) for index in range(3)]
+
+    def stat_counts(self):
+        return {(s.status, s.count) for s in DailyApplicationStat.objects.all()}
+
+    def test_rollup_follows_application_changes(self):
+        apps = [
+            Application.objects.create(student=student, program=self.program, requirement_status='submitted')
+            for student in self.students
+        ]
+        self.assertEqual(self.stat_counts(), {('submitted', 3)})
+
+        apps[0].requirement_status = 'approved'
+        apps[0].save()
+        self.assertEqual(self.stat_counts(), {('submitted', 2), ('approved', 1)})
+
+        apps[1].delete()
+        self.assertEqual(self.stat_counts(), {('submitted', 1), ('approved', 1)})
+
+        data = self.client.get(self.url, {'period': 7}).json()
+        self.assertEqual(len(data['data']), 7)
+        self.assertEqual(data['data'][-1], 2)
+        self.assertEqual(self.client.get(self.url, {'period': 7, 'status': 'approved'}).json()['data'][-1], 1)
+
+    def test_backfill_rebuilds_rollup(self):
+        for student in self.students:
+            Application.objects.create(student=student, program=self.program, requirement_status='submitted')
+        Application.objects.update(requirement_status='approved')  # bypasses signals
+
+        call_command('backfill_application_stats', stdout=io.StringIO())
+        self.assertEqual(self.stat_counts(), {('approved', 3)})
+
+
+class StudentStatisticsTest(AdminAPITestCase):
+    url = '/api/admin/charts/student-statistics/'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.students = [make_student(index, status='pending', created_at=timezone.now()) for index in range(3)]
+
+    def test_charts_are_cached_until_students_change(self):
+        self.assertEqual(self.client.get(self.url, {'type': 'status'}).json()['data'], [3])
+        with self.assertNumQueries(1):  # session lookup only
+            self.client.get(self.url, {'type': 'status'})
+
+        self.students[0].status = 'active'
+        self.students[0].save()
+        data = self.client.get(self.url, {'type': 'status'}).json()
+        self.assertEqual(dict(zip(data['labels'], data['data'])), {'Active': 1, 'Pending': 2})
+
+    def test_monthly_chart(self):
+        data = self.client.get(self.url, {'type': 'monthly'}).json()
+        self.assertEqual(data['labels'], [timezone.now().strftime('%b')])
+        self.assertEqual(data['data'], [3])
+        self.assertIsNone(data['colors'])
+
+    def test_rejects_unknown_chart_type(self):
+        self.assertEqual(self.client.get(self.url, {'type': 'bogus'}).status_code, 400)
+
+
+class AdminStatsTest(AdminAPITestCase):
+    url = '/api/admin/stats/'
+
+    def test_counters_follow_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            students = [make_student(index, status='pending') for index in range(3)]
+        self.assertEqual(self.client.get(self.url).json()['pending_student_registrations'], 3)
+
+        with self.assertNumQueries(2):  # session + counter row
+            self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            students[0].status = 'active'
+            students[0].save()
+            Message.objects.create(student=students[1], sender_type='student', subject='Hi', body='Hello')
+            Popup.objects.create(title='Notice', message='Hello')
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['total_students'], 1)
+        self.assertEqual(data['pending_student_registrations'], 2)
+        self.assertEqual(data['unread_messages'], 1)
+        self.assertEqual(data['active_popups'], 1)
+
+    def test_deferred_refresh_runs_once(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with defer_dashboard_counters():
+                for index in range(5):
+                    make_student(index, status='active')
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.client.get(self.url).json()['total_students'], 5)
+
+    def test_recount_runs_between_locking_and_writing_the_row(self):
+        refresh_dashboard_counters()
+        with CaptureQueriesContext(connection) as queries:
+            refresh_dashboard_counters(Student)
+        sql = [q['sql'] for q in queries.captured_queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertTrue(sql[0].startswith('SELECT') and 'accounts_dashboardcounters' in sql[0])
+        self.assertTrue(any('accounts_student' in q for q in sql[1:-1]))
+        self.assertTrue(sql[-1].startswith('UPDATE "accounts_dashboardcounters"'))
+
+    @override_settings(DASHBOARD_COUNTER_CACHE=False)
+    def test_counts_without_counter_cache(self):
+        make_student(0, status='active')
+        self.assertEqual(self.client.get(self.url).json()['total_students'], 1)
+        self.assertFalse(DashboardCounters.objects.exists())
+
+
+class OutboxTest(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        for index in range(3):
+            make_student(index, status='active')
+
+    def test_batch_email_is_queued_and_delivered(self):
+        response = self.client.post('/api/admin/messages/send-batch/', {
+            'mode': 'email', 'status': 'active', 'subject': 'Reminder', 'body': '<p>Hello</p>',
+            'attachment': SimpleUploadedFile('memo.txt', b'memo', content_type='text/plain'),
+        })
+        self.assertEqual(response.json()['count'], 3)
+        self.assertEqual(OutboundEmail.objects.filter(status='pending').count(), 3)
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command('send_outbox', stdout=io.StringIO())
+        self.assertEqual(OutboundEmail.objects.filter(status='sent').count(), 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].body, 'Hello')
+        self.assertEqual(mail.outbox[0].attachments[0][:2], ('memo.txt', 'memo'))
+
+    @override_settings(MAX_UPLOAD_SIZE=1024)
+    def test_oversized_attachment_is_rejected_not_dropped(self):
+        response = self.client.post('/api/admin/messages/send-batch/', {
+            'mode': 'email', 'status': 'active', 'subject': 'Reminder', 'body': '<p>Hello</p>',
+            'attachment': SimpleUploadedFile('memo.txt', b'x' * 5000, content_type='text/plain'),
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('larger than', response.json()['error'])
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_failed_sends_are_retried_with_backoff(self):
+        queue_emails(['student0@example.com'], 'Subject', 'Body')
+        with mock.patch('accounts.outbox.EmailMultiAlternatives.send', side_effect=OSError('boom')):
+            call_command('send_outbox', stdout=io.StringIO())
+
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.attempts, email.last_error), ('pending', 1, 'boom'))
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        call_command('send_outbox', stdout=io.StringIO())
+        self.assertEqual(OutboundEmail.objects.get().status, 'sent')
+
+
+class AccountExpiryTest(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.fresh = make_student(0, status='active', approved_at=now - timedelta(days=30))
+        self.warn = make_student(1, status='active', approved_at=now - timedelta(days=130))
+        self.deactivate = make_student(2, status='active', approved_at=now - timedelta(days=160))
+        self.delete = make_student(3, status='inactive', approved_at=now - timedelta(days=200))
+
+    def test_dry_run_changes_nothing(self):
+        out = io.StringIO()
+        call_command('process_account_expiry', '--dry-run', stdout=out)
+        self.assertIn('would warn 1, deactivate 1, delete 1', out.getvalue())
+        self.assertEqual(Student.objects.count(), 4)
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_phases_run_in_bulk(self):
+        call_command('process_account_expiry', '--batch-size', '1', stdout=io.StringIO())
+
+        self.assertFalse(Student.objects.filter(pk=self.delete.pk).exists())
+        self.assertEqual(Student.objects.get(pk=self.deactivate.pk).status, 'inactive')
+        warned = Student.objects.get(pk=self.warn.pk)
+        self.assertIsNotNone(warned.warning_sent_at)
+        self.assertIsNone(Student.objects.get(pk=self.fresh.pk).warning_sent_at)
+        self.assertEqual(list(OutboundEmail.objects.values_list('to_email', flat=True)), [warned.email])
+        self.assertEqual(list(Popup.objects.get().seen_by.all()), [warned])
+
+        # A second run has nothing left to do
+        call_command('process_account_expiry', stdout=io.StringIO())
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+        self.assertEqual(Popup.objects.count(), 1)
+
+    def test_deactivation_refreshes_dashboard_counters(self):
+        Student.objects.exclude(pk__in=[self.fresh.pk, self.deactivate.pk]).delete()
+        refresh_dashboard_counters()
+        self.assertEqual(get_dashboard_counts()['total_students'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('process_account_expiry', stdout=io.StringIO())
+        self.assertEqual(Student.objects.get(pk=self.deactivate.pk).status, 'inactive')
+        self.assertEqual(get_dashboard_counts()['total_students'], 1)
+
+
+class QueryPlanTest(TestCase):
+    """The hot dashboard filters should be served by the indexes added for them"""
+
+    def assertUsesIndex(self, queryset, index_name):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables make a sequential scan look cheapest; ask the planner for the index path instead
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        elif connection.vendor != 'sqlite':
+            self.skipTest(f'No query plan expectations for {connection.vendor}')
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_student_filters(self):
+        self.assertUsesIndex(Student.objects.filter(status='active').order_by('-created_at'), 'student_status_created_idx')
+        self.assertUsesIndex(Student.objects.filter(barangay='Cawag', status='active'), 'student_barangay_status_idx')
+        self.assertUsesIndex(Student.objects.filter(approved_at__lte=timezone.now()), 'student_approved_idx')
+
+    def test_application_filters(self):
+        self.assertUsesIndex(
+            Application.objects.filter(requirement_status='submitted').order_by('-created_at'), 'app_status_created_idx'
+        )
+        self.assertUsesIndex(Application.objects.filter(program_id=1).order_by('-created_at'), 'app_program_created_idx')
+        self.assertUsesIndex(Application.objects.filter(student_id=1).order_by('-created_at'), 'app_student_created_idx')
+
+    def test_message_and_popup_filters(self):
+        self.assertUsesIndex(Message.objects.filter(student_id=1).order_by('-created_at'), 'message_student_created_idx')
+        self.assertUsesIndex(
+            Message.objects.filter(student_id=1, is_read=False, sender_type='admin'), 'message_student_unread_idx'
+        )
+        self.assertUsesIndex(Message.objects.filter(sender_type='student', is_read=False), 'message_sender_unread_idx')
+        active_popups = Popup.objects.filter(is_active=True).filter(
+            Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
+        ).order_by('-created_at')
+        self.assertUsesIndex(active_popups, 'popup_active_expires_idx')
+
+
+class MessageInboxAPITest(AdminAPITestCase):
+    url = '/api/messages/'
+
+    def setUp(self):
+        super().setUp()
+        self.students = [make_student(index) for index in range(3)]
+        for student in self.students:
+            Message.objects.create(student=student, sender_type='student', subject='Question', body='Hi')
+            Message.objects.create(student=student, admin=self.admin, sender_type='admin', subject='Reply', body='Hello')
+
+    def test_pages_follow_cursor_with_constant_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get(self.url, {'page_size': 4}).json()
+        self.assertLessEqual(len(queries), 3)
+        self.assertEqual(len(first['messages']), 4)
+        self.assertTrue(first['has_more'])
+
+        second = self.client.get(self.url, {'page_size': 4, 'cursor': first['next_cursor']}).json()
+        self.assertEqual(len(second['messages']), 2)
+        self.assertFalse(second['has_more'])
+        ids = [msg['id'] for msg in first['messages'] + second['messages']]
+        self.assertEqual(ids, sorted(Message.objects.values_list('id', flat=True), reverse=True))
+
+    def test_unread_filter_and_count(self):
+        Message.objects.filter(student=self.students[0]).update(is_read=True)
+        data = self.client.get(self.url, {'unread': '1'}).json()
+        self.assertEqual({msg['sender_type'] for msg in data['messages']}, {'student'})
+        self.assertEqual(len(data['messages']), 2)
+        self.assertEqual(self.client.get('/api/messages/unread-count/').json()['unread_count'], 2)
+
+        session = self.client.session
+        session['user_role'] = 'student'
+        session['user_id'] = self.students[1].pk
+        session.save()
+        self.assertEqual(self.client.get('/api/messages/unread-count/').json()['unread_count'], 1)
+        self.assertEqual(len(self.client.get(self.url).json()['messages']), 2)
+
+    def test_threads_view(self):
+        data = self.client.get(self.url, {'view': 'threads', 'page_size': 2}).json()
+        self.assertEqual([thread['student_id'] for thread in data['threads']], [self.students[2].pk, self.students[1].pk])
+        self.assertEqual(data['threads'][0]['message_count'], 2)
+        self.assertEqual(data['threads'][0]['unread_count'], 1)
+        self.assertEqual(data['threads'][0]['latest_message']['subject'], 'Reply')
+
+        rest = self.client.get(self.url, {'view': 'threads', 'cursor': data['next_cursor']}).json()
+        self.assertEqual([thread['student_id'] for thread in rest['threads']], [self.students[0].pk])
+
+
+class SinceSyncAPITest(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.student = make_student(0)
+        self.program = Program.objects.create(program_name='Scholarship A')
+        self.apps = [
+            Application.objects.create(student=self.student, program=self.program, requirement_status='submitted')
+            for _ in range(3)
+        ]
+        self.messages = [
+            Message.objects.create(student=self.student, sender_type='student', subject=f'Q{index}', body='Hi')
+            for index in range(3)
+        ]
+        # Pretend everything was synced a while ago
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        Application.objects.update(updated_at=an_hour_ago)
+        Message.objects.update(updated_at=an_hour_ago)
+        self.token = self.client.get('/api/messages/').json()['sync_token']
+
+    def test_messages_delta_returns_changes_and_tombstones(self):
+        self.messages[0].is_read = True
+        self.messages[0].save()
+        deleted_id = self.messages[1].id
+        self.messages[1].delete()
+
+        data = self.client.get('/api/messages/', {'since': self.token}).json()
+        self.assertFalse(data['full_sync'])
+        self.assertEqual([msg['id'] for msg in data['messages']], [self.messages[0].id])
+        self.assertEqual(data['deleted'], [deleted_id])
+
+    def test_program_applications_delta_reports_rows_leaving_the_filter(self):
+        self.apps[0].requirement_status = 'approved'
+        self.apps[0].save()
+        deleted_id = self.apps[1].app_id
+        self.apps[1].delete()
+
+        data = self.client.get('/api/admin/program-applications/', {'since': self.token, 'status': 'submitted'}).json()
+        self.assertEqual(data['applications'], [])
+        self.assertEqual(sorted(data['deleted']), sorted([self.apps[0].app_id, deleted_id]))
+
+        data = self.client.get('/api/admin/program-applications/', {'since': self.token}).json()
+        self.assertEqual([app['app_id'] for app in data['applications']], [self.apps[0].app_id])
+
+    def test_student_endpoints_delta(self):
+        popup = Popup.objects.create(title='Notice', message='Hello')
+        session = self.client.session
+        session['user_role'] = 'student'
+        session['user_id'] = self.student.pk
+        session.save()
+
+        data = self.client.get('/api/student/popups/', {'since': self.token}).json()
+        popup_id = popup.id
+        self.assertEqual([item['id'] for item in data['popups']], [popup_id])
+        popup.delete()
+        data = self.client.get('/api/student/popups/', {'since': data['sync_token']}).json()
+        self.assertEqual((data['popups'], data['deleted']), ([], [popup_id]))
+
+        self.apps[2].remarks = 'Looks good'
+        self.apps[2].save()
+        data = self.client.get('/api/student/applications/', {'since': self.token}).json()
+        self.assertEqual([app['app_id'] for app in data['applications']], [self.apps[2].app_id])
+        self.assertEqual(data['deleted'], [])
+
+    def test_invalid_or_stale_since(self):
+        self.assertEqual(self.client.get('/api/messages/', {'since': 'yesterday'}).status_code, 400)
+        stale = (timezone.now() - timedelta(days=90)).isoformat()
+        data = self.client.get('/api/messages/', {'since': stale}).json()
+        self.assertTrue(data['full_sync'])
+        self.assertEqual(len(data['messages']), 3)
+
+
+class EventFeedAPITest(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.student = make_student(0)
+        self.other = make_student(1)
+
+    def as_student(self, student):
+        session = self.client.session
+        session['user_role'] = 'student'
+        session['user_id'] = student.pk
+        session.save()
+
+    def test_sending_messages_and_popups_publishes_events(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/messages/send/', json.dumps({
+                'student_id': self.student.pk, 'subject': 'Hi', 'body': 'Hello',
+            }), content_type='application/json')
+            self.client.post('/api/admin/popups/create/', json.dumps({
+                'title': 'Notice', 'message': 'Hello', 'popup_type': 'info',
+            }), content_type='application/json')
+
+        self.as_student(self.student)
+        data = self.client.get('/api/events/poll/', {'after': 0}).json()
+        self.assertEqual([event['kind'] for event in data['events']], ['message', 'popup'])
+        self.assertEqual(data['last_event_id'], data['events'][-1]['id'])
+
+        # The direct message was only for self.student
+        self.as_student(self.other)
+        data = self.client.get('/api/events/poll/', {'after': 0}).json()
+        self.assertEqual([event['kind'] for event in data['events']], ['popup'])
+
+    def test_poll_without_cursor_returns_current_position(self):
+        NotificationEvent.objects.create(kind='message', audience='admin')
+        data = self.client.get('/api/events/poll/').json()
+        self.assertEqual((data['events'], data['last_event_id']), ([], NotificationEvent.objects.get().id))
+
+    def test_stream_needs_asgi(self):
+        self.assertEqual(self.client.get('/api/events/').status_code, 204)
+
+    async def test_stream_under_asgi(self):
+        client = AsyncClient()
+        client.cookies = self.client.cookies
+        response = await client.get('/api/events/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(response.is_async)
+
+
+class StudentPopupCacheTest(AdminAPITestCase):
+    url = '/api/student/popups/'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.student = make_student(0)
+        self.first = Popup.objects.create(title='First', message='Hello')
+        self.second = Popup.objects.create(title='Second', message='Hello')
+        Popup.objects.create(title='Expired', message='Hello', expires_at=timezone.now() - timedelta(days=1))
+        Popup.objects.create(title='Off', message='Hello', is_active=False)
+        self.admin_client = self.client
+        self.client = Client()
+        session = self.client.session
+        session['user_role'] = 'student'
+        session['user_id'] = self.student.pk
+        session.save()
+
+    def titles(self):
+        return [popup['title'] for popup in self.client.get(self.url).json()['popups']]
+
+    def test_warm_cache_only_checks_version_and_seen_set(self):
+        self.assertEqual(self.titles(), ['Second', 'First'])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.titles(), ['Second', 'First'])
+        popup_queries = [q['sql'] for q in queries.captured_queries if 'accounts_popup' in q['sql']]
+        self.assertEqual(len(popup_queries), 2)
+        self.assertEqual(len([sql for sql in popup_queries if 'MAX(' in sql]), 1)
+        self.assertEqual(len([sql for sql in popup_queries if 'accounts_popup_seen_by' in sql]), 1)
+
+    def test_popup_saved_by_another_worker_is_served_at_once(self):
+        self.assertEqual(self.titles(), ['Second', 'First'])
+        # bulk_create skips post_save, like a save whose invalidation ran in another process
+        Popup.objects.bulk_create([Popup(title='Third', message='Hello')])
+        self.assertEqual(self.titles(), ['Third', 'Second', 'First'])
+
+    def test_bulk_dismissal_is_seen_without_invalidation(self):
+        self.assertEqual(self.titles(), ['Second', 'First'])
+        Popup.seen_by.through.objects.bulk_create([Popup.seen_by.through(popup=self.second, student=self.student)])
+        self.assertEqual(self.titles(), ['First'])
+
+    def test_seen_and_admin_changes_invalidate(self):
+        self.assertEqual(self.titles(), ['Second', 'First'])
+        self.client.post(f'/api/student/popups/{self.first.id}/mark-viewed/')
+        self.assertEqual(self.titles(), ['Second'])
+
+        self.admin_client.post(f'/api/admin/popups/{self.second.id}/toggle/')
+        self.assertEqual(self.titles(), [])
+
+
+class BulkMarkAPITest(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.student = make_student(0)
+        self.other = make_student(1)
+        session = self.client.session
+        session['user_role'] = 'student'
+        session['user_id'] = self.student.pk
+        session.save()
+
+    def post(self, url, payload):
+        return self.client.post(url, json.dumps(payload), content_type='application/json')
+
+    def test_mark_popups_viewed(self):
+        seen, fresh = Popup.objects.create(title='A', message='x'), Popup.objects.create(title='B', message='x')
+        seen.seen_by.add(self.student)
+        self.assertEqual(len(self.client.get('/api/student/popups/').json()['popups']), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post('/api/student/popups/mark-viewed/', {'popup_ids': [seen.id, fresh.id, 999]})
+        self.assertLessEqual(len(queries), 6)
+        self.assertEqual(response.json()['results'], {
+            str(seen.id): 'already_seen', str(fresh.id): 'marked', '999': 'not_found',
+        })
+        self.assertEqual(self.client.get('/api/student/popups/').json()['popups'], [])
+
+    def test_mark_messages_read(self):
+        unread = Message.objects.create(student=self.student, sender_type='admin', subject='A', body='x')
+        read = Message.objects.create(student=self.student, sender_type='admin', subject='B', body='x', is_read=True)
+        foreign = Message.objects.create(student=self.other, sender_type='admin', subject='C', body='x')
+
+        response = self.post('/api/messages/mark-read/', {'message_ids': [unread.id, read.id, foreign.id]})
+        self.assertEqual(response.json()['results'], {
+            str(unread.id): 'marked', str(read.id): 'already_read', str(foreign.id): 'not_found',
+        })
+        self.assertEqual(list(Message.objects.filter(is_read=False)), [foreign])
+
+    def test_rejects_bad_id_lists(self):
+        self.assertEqual(self.post('/api/messages/mark-read/', {'message_ids': []}).status_code, 400)
+        self.assertEqual(self.post('/api/messages/mark-read/', {'message_ids': ['x']}).status_code, 400)
+        self.assertEqual(self.post('/api/student/popups/mark-viewed/', {'popup_ids': list(range(500))}).status_code, 400)
+
+
+class AuditLogTest(AdminAPITestCase):
+    def test_admin_actions_are_logged_after_the_response(self):
+        popup = Popup.objects.create(title='Notice', message='Hello')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/api/admin/popups/{popup.id}/toggle/')
+        self.assertEqual(response.status_code, 200)
+        # The Admin row itself is never loaded; the flush only checks the id still exists
+        self.assertFalse([q for q in queries.captured_queries if '"accounts_admin"."admin_name"' in q['sql']])
+        self.assertEqual(list(AdminLog.objects.values_list('admin_id', 'action')), [
+            (self.admin.admin_id, "Deactivated popup 'Notice'"),
+        ])
+
+    def test_buffer_flushes_in_bulk_and_skips_deleted_admins(self):
+        buffer = AuditLogBuffer(flush_size=3)
+        buffer.add(self.admin.admin_id, 'First')
+        buffer.add(999, 'Unknown admin')
+        self.assertFalse(AdminLog.objects.exists())
+
+        buffer.add(self.admin.admin_id, 'Second')
+        self.assertEqual(list(AdminLog.objects.order_by('timestamp').values_list('action', flat=True)), ['First', 'Second'])
+        self.assertEqual(buffer.flush(), 0)
+
+    def test_flush_after_request_releases_the_connection(self):
+        log_admin_action(self.admin.admin_id, 'Outside a request')
+        pooled = mock.Mock(in_atomic_block=False)
+        with mock.patch('accounts.signals.connections.all', return_value=[connection, pooled]):
+            flush_admin_logs_after_request(sender=None)
+        self.assertTrue(AdminLog.objects.filter(action='Outside a request').exists())
+        pooled.close_if_unusable_or_obsolete.assert_called_once_with()
+
+
+class AdminLogArchiveTest(AdminAPITestCase):
+    url = '/api/admin/audit-logs/'
+
+    def setUp(self):
+        super().setUp()
+        self.other = Admin.objects.create(admin_name='other', password='x')
+        now = timezone.now()
+        for days in (1, 2, 3):
+            AdminLog.objects.create(admin=self.admin, action=f'Approved student {days}', timestamp=now - timedelta(days=days))
+        AdminLog.objects.create(admin=self.other, action='Deleted popup', timestamp=now - timedelta(days=2))
+        AdminLog.objects.create(admin=self.admin, action='Signed in', timestamp=now - timedelta(days=400))
+        AdminLog.objects.create(admin=self.admin, action='Signed in', timestamp=now - timedelta(days=370))
+
+    def test_keyset_pages_and_filters(self):
+        first = self.client.get(self.url, {'page_size': 3}).json()
+        rest = self.client.get(self.url, {'page_size': 3, 'cursor': first['next_cursor']}).json()
+        self.assertTrue(first['has_more'])
+        self.assertFalse(rest['has_more'])
+        ids = [log['id'] for log in first['logs'] + rest['logs']]
+        self.assertEqual(ids, list(AdminLog.objects.order_by('-timestamp', '-id').values_list('id', flat=True)))
+
+        data = self.client.get(self.url, {'admin': self.admin.admin_id, 'action': 'Approved'}).json()
+        self.assertEqual([log['action'] for log in data['logs']], ['Approved student 1', 'Approved student 2', 'Approved student 3'])
+
+        since = (timezone.now() - timedelta(days=2)).date().isoformat()
+        data = self.client.get(self.url, {'start_date': since}).json()
+        self.assertEqual(len(data['logs']), 3)
+
+    def test_archive_moves_old_rows_to_monthly_files(self):
+        call_command('archive_admin_logs', '--batch-size', '1', stdout=io.StringIO())
+        self.assertEqual(AdminLog.objects.count(), 4)
+
+        archive_dir = os.path.join(TEST_MEDIA_ROOT, 'admin_log_archive')
+        files = [os.path.join(root, name) for root, _, names in os.walk(archive_dir) for name in names]
+        self.assertEqual(len(files), 2)
+        rows = []
+        for path in files:
+            with gzip.open(path, 'rt') as fh:
+                rows += [json.loads(line) for line in fh]
+        self.assertEqual({row['action'] for row in rows}, {'Signed in'})
+        self.assertEqual({row['admin_name'] for row in rows}, {'admin'})
+
+
+class RequiredDocumentsTest(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.student = make_student(0)
+        StudentDocument.objects.create(student=self.student, document_name='TOR', file=SimpleUploadedFile('tor.pdf', b'tor'))
+        self.program = Program.objects.create(program_name='Scholarship A', document_requirements=['Grades', 'TOR'])
+        self.url = f'/api/admin/students/{self.student.pk}/documents/'
+
+    def test_catalog_is_cached_and_missing_documents_computed(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(self.url).json()
+        self.assertEqual(len([q for q in queries.captured_queries if 'home_program' in q['sql']]), 0)
+        self.assertEqual(data['required_documents'][-1], 'Grades')
+        self.assertNotIn('TOR', data['missing_documents'])
+        self.assertIn('Grades', data['missing_documents'])
+
+    def test_program_writes_invalidate_the_catalog(self):
+        self.client.get(self.url)
+        self.client.post(f'/home/edit_program/{self.program.program_id}/', {'document_requirements': ['Essay']})
+        self.assertEqual(Program.objects.get().document_requirements, ['Essay'])
+        data = self.client.get(self.url).json()
+        self.assertIn('Essay', data['missing_documents'])
+        self.assertNotIn('Grades', data['required_documents'])
+
+
+class DocumentStatusTest(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.student = make_student(0, barangay='Calapandayan', status='active')
+        self.other = make_student(1, barangay='Calapandayan', status='active')
+        StudentDocument.objects.create(student=self.other, document_name='TOR', file=SimpleUploadedFile('tor.pdf', b'tor'))
+
+    def missing(self, name):
+        return set(students_missing_document(name).values_list('pk', flat=True))
+
+    def test_uploads_and_deletes_update_status(self):
+        self.assertEqual(self.missing('TOR'), {self.student.pk})
+        doc = StudentDocument.objects.create(student=self.student, document_name='TOR', file=SimpleUploadedFile('tor.pdf', b'tor'))
+        self.assertEqual(self.missing('TOR'), set())
+        doc.delete()
+        self.assertEqual(self.missing('TOR'), {self.student.pk})
+
+    def test_program_requirements_add_and_drop_rows(self):
+        program = Program.objects.create(program_name='Scholarship A', document_requirements=['Essay'])
+        self.assertEqual(self.missing('Essay'), {self.student.pk, self.other.pk})
+        program.document_requirements = []
+        program.save()
+        self.assertFalse(StudentDocumentStatus.objects.filter(document_name='Essay').exists())
+
+    def test_new_students_get_rows_a_stale_cache_has_not_seen(self):
+        self.assertNotIn('Essay', get_required_documents())
+        # Stands in for a program added through another worker, whose invalidation this process missed
+        Program.objects.bulk_create([Program(program_name='Scholarship A', document_requirements=['Essay'])])
+        student = make_student(2)
+        self.assertTrue(StudentDocumentStatus.objects.filter(student=student, document_name='Essay').exists())
+
+    def test_student_list_filters_by_missing_document(self):
+        response = self.client.get('/api/admin/student-applications/', {
+            'status': 'active', 'barangay': 'Calapandayan', 'missing_document': 'TOR', 'view': 'summary',
+        })
+        self.assertEqual([row['id'] for row in response.json()['applications']], [self.student.pk])
+
+    def test_deleting_a_student_with_documents(self):
+        other_id = self.other.pk
+        self.other.delete()
+        self.assertFalse(StudentDocumentStatus.objects.filter(student_id=other_id).exists())
+
+
+class DocumentDedupTest(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.student = make_student(0)
+        session = self.client.session
+        session['user_role'] = 'student'
+        session['user_id'] = self.student.pk
+        session.save()
+
+    def upload(self, name, content):
+        return self.client.post('/api/student/documents/upload/', {
+            'document_name': name, 'file': SimpleUploadedFile('scan.pdf', content),
+        }).json()
+
+    def test_identical_uploads_share_one_blob(self):
+        self.upload('TOR', b'same bytes')
+        self.upload('Valid ID', b'same bytes')
+        self.upload('Grades', b'other bytes')
+
+        tor, valid_id, grades = StudentDocument.objects.order_by('id')
+        self.assertEqual(tor.content_hash, hashlib.sha256(b'same bytes').hexdigest())
+        self.assertEqual(tor.file.name, valid_id.file.name)
+        self.assertNotEqual(tor.file.name, grades.file.name)
+        blob_dir = os.path.join(TEST_MEDIA_ROOT, 'documents', 'blobs', tor.content_hash[:2])
+        self.assertEqual(len(os.listdir(blob_dir)), 1)
+
+    def test_imported_documents_reuse_the_student_blob(self):
+        self.upload('TOR', b'transcript')
+        doc = StudentDocument.objects.get()
+        program = Program.objects.create(program_name='Scholarship A')
+        self.client.post('/api/applications/create/', {
+            'program_id': program.program_id, 'imported_docs': [doc.pk],
+            'supporting_docs': [SimpleUploadedFile('copy.pdf', b'transcript')],
+        })
+        self.assertEqual(
+            set(ApplicationDocument.objects.values_list('file', 'content_hash')), {(doc.file.name, doc.content_hash)},
+        )
+
+
+class ThumbnailTest(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.student = make_student(0)
+
+    def image_upload(self, name='scan.png', size=(2000, 1000)):
+        buffer = io.BytesIO()
+        Image.new('RGB', size, 'white').save(buffer, 'PNG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+    def test_worker_makes_webp_thumbnails_for_images(self):
+        image = StudentDocument.objects.create(student=self.student, document_name='Valid ID', file=self.image_upload())
+        StudentDocument.objects.create(student=self.student, document_name='TOR', file=SimpleUploadedFile('tor.pdf', b'%PDF-1.4'))
+        self.assertEqual(Thumbnail.objects.filter(status='pending').count(), 2)
+
+        call_command('generate_thumbnails', stdout=io.StringIO())
+
+        thumb = Thumbnail.objects.get(source=image.file.name)
+        self.assertEqual(thumb.status, 'done')
+        with Image.open(thumb.thumbnail.path) as rendered:
+            self.assertEqual((rendered.format, rendered.size), ('WEBP', (320, 160)))
+        self.assertEqual(Thumbnail.objects.exclude(pk=thumb.pk).get().status, 'skipped')
+
+        documents = self.client.get(f'/api/admin/students/{self.student.pk}/documents/').json()['documents']
+        urls = {doc['name']: doc['thumbnail_url'] for doc in documents}
+        self.assertEqual(urls, {'Valid ID': thumb.thumbnail.url, 'TOR': None})
+
+    def test_program_list_returns_image_thumbnail(self):
+        program = Program.objects.create(program_name='Scholarship A', program_image=self.image_upload('banner.png'))
+        self.assertIsNone(self.client.get('/home/programs/').json()['programs'][0]['program_image_thumbnail'])
+        call_command('generate_thumbnails', stdout=io.StringIO())
+        data = self.client.get('/home/programs/').json()['programs'][0]
+        self.assertEqual(data['program_image_thumbnail'], Thumbnail.objects.get(source=program.program_image.name).thumbnail.url)
+
+
+SPOOL_ROOT = tempfile.mkdtemp()
+
+
+class UploadPipelineTest(AdminAPITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(SPOOL_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        super().setUp()
+        self.student = make_student(0)
+        session = self.client.session
+        session['user_role'] = 'student'
+        session['user_id'] = self.student.pk
+        session.save()
+
+    def upload(self, filename, content=b'%PDF-1.4 transcript'):
+        return self.client.post('/api/student/documents/upload/', {
+            'document_name': 'TOR', 'file': SimpleUploadedFile(filename, content),
+        })
+
+    @override_settings(MAX_UPLOAD_SIZE=1024)
+    def test_oversized_and_unsupported_uploads_are_rejected(self):
+        response = self.upload('tor.pdf', b'x' * 5000)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('larger than', response.json()['error'])
+        response = self.upload('tor.exe')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('not an allowed file type', response.json()['error'])
+        self.assertFalse(StudentDocument.objects.exists())
+
+    @override_settings(UPLOAD_SPOOL_ENABLED=True, UPLOAD_SPOOL_ROOT=SPOOL_ROOT)
+    def test_spooled_upload_is_pushed_by_the_worker(self):
+        self.assertEqual(self.upload('tor.pdf').status_code, 200)
+        name = StudentDocument.objects.get().file.name
+        self.assertTrue(os.path.exists(os.path.join(SPOOL_ROOT, name)))
+        self.assertFalse(os.path.exists(os.path.join(TEST_MEDIA_ROOT, name)))
+        self.assertEqual(PendingUpload.objects.get().name, name)
+
+        call_command('push_uploads', stdout=io.StringIO())
+        self.assertTrue(os.path.exists(os.path.join(TEST_MEDIA_ROOT, name)))
+        self.assertFalse(os.path.exists(os.path.join(SPOOL_ROOT, name)))
+        self.assertFalse(PendingUpload.objects.exists())
+
+    @override_settings(UPLOAD_SPOOL_ENABLED=True, UPLOAD_SPOOL_ROOT=SPOOL_ROOT)
+    def test_rows_follow_the_name_storage_saved_under(self):
+        self.upload('tor.pdf')
+        with mock.patch.object(default_storage, 'save', return_value='documents/blobs/stored_elsewhere.pdf'):
+            call_command('push_uploads', stdout=io.StringIO())
+        self.assertEqual(StudentDocument.objects.get().file.name, 'documents/blobs/stored_elsewhere.pdf')
+        self.assertEqual(Thumbnail.objects.get().source, 'documents/blobs/stored_elsewhere.pdf')
+
+
+class DocumentZipTest(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.program = Program.objects.create(program_name='Scholarship A')
+        self.apps = []
+        for index in range(2):
+            student = make_student(index)
+            StudentDocument.objects.create(student=student, document_name='TOR', file=SimpleUploadedFile('tor.pdf', b'tor %d' % index))
+            app = Application.objects.create(student=student, program=self.program, requirement_status='submitted')
+            ApplicationDocument.objects.create(application=app, file=SimpleUploadedFile('essay.pdf', b'essay %d' % index))
+            self.apps.append(app)
+        self.apps[1].requirement_status = 'approved'
+        self.apps[1].save()
+
+    def read_zip(self, response):
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_application_zip_contains_application_and_profile_documents(self):
+        app = self.apps[0]
+        archive = self.read_zip(self.client.get(f'/api/admin/applications/{app.app_id}/documents.zip'))
+        folder = f'{app.app_id}_Student_0_Test'
+        self.assertEqual(sorted(archive.namelist()), [f'{folder}/application/document_1.pdf', f'{folder}/profile/TOR.pdf'])
+        self.assertEqual(archive.read(f'{folder}/profile/TOR.pdf'), b'tor 0')
+
+    def test_program_zip_filters_by_status_and_lists_missing_files(self):
+        archive = self.read_zip(self.client.get(f'/api/admin/programs/{self.program.program_id}/documents.zip'))
+        self.assertEqual(len(archive.namelist()), 4)
+
+        os.remove(self.apps[1].documents.get().file.path)
+        archive = self.read_zip(self.client.get(
+            f'/api/admin/programs/{self.program.program_id}/documents.zip', {'status': 'approved'},
+        ))
+        self.assertEqual(len([name for name in archive.namelist() if name.startswith(f'{self.apps[1].app_id}_')]), 1)
+        self.assertIn('application/document_1.pdf', archive.read('missing_files.txt').decode())
+
+    def test_requires_admin(self):
+        session = self.client.session
+        session['user_role'] = 'student'
+        session.save()
+        self.assertEqual(self.client.get(f'/api/admin/applications/{self.apps[0].app_id}/documents.zip').status_code, 403)
@@ -0,0 +1,94 @@
+import hashlib
+import io
+from datetime import timedelta
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Thumbnail
+from .uploads import open_stored_file
+
+
+THUMBNAIL_SIZE = (320, 320)
+PREVIEW_SIZE = (1280, 1280)
+WEBP_QUALITY = 80
+THUMBNAIL_BATCH_SIZE = 20
+# Claimed jobs older than this belonged to a worker that stopped mid-batch
+THUMBNAIL_STALE_AFTER = timedelta(minutes=10)
+
+NO_THUMBNAIL = {'thumbnail_url': None, 'preview_url': None}
+
+
+def queue_thumbnails(*names):
+    """Ask the worker for thumbnails of these stored files; files already queued are left alone"""
+    Thumbnail.objects.bulk_create([Thumbnail(source=name) for name in names if name], ignore_conflicts=True)
+
+
+def get_thumbnail_urls(names):
+    """Map each stored file name with finished thumbnails to its thumbnail_url and preview_url, in one query"""
+    names = {name for name in names if name}
+    if not names:
+        return {}
+    return {
+        thumb.source: {'thumbnail_url': thumb.thumbnail.url, 'preview_url': thumb.preview.url}
+        for thumb in Thumbnail.objects.filter(source__in=names, status='done')
+    }
+
+
+def release_stale_thumbnails():
+    """Put jobs claimed by a crashed worker back in the queue"""
+    return Thumbnail.objects.filter(
+        status='running', claimed_at__lt=timezone.now() - THUMBNAIL_STALE_AFTER
+    ).update(status='pending', claimed_at=None)
+
+
+def claim_thumbnail_batch(batch_size=THUMBNAIL_BATCH_SIZE):
+    """Mark up to batch_size pending jobs as 'running' and return them"""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            Thumbnail.objects.select_for_update(skip_locked=True)
+            .filter(status='pending').order_by('created_at', 'id')[:batch_size]
+        )
+        if batch:
+            Thumbnail.objects.filter(pk__in=[job.pk for job in batch]).update(status='running', claimed_at=now)
+    return batch
+
+
+def _render_webp(image, size):
+    image = image.copy()
+    image.thumbnail(size, Image.Resampling.LANCZOS)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    output = io.BytesIO()
+    image.save(output, 'WEBP', quality=WEBP_QUALITY, method=4)
+    return ContentFile(output.getvalue())
+
+
+def generate_thumbnail(job):
+    """Render a job's thumbnail and preview and record the outcome.
+
+    Only formats Pillow can decode get thumbnails; anything else (PDFs, Word
+    files) is marked 'skipped' and clients keep showing the original.
+    """
+    try:
+        with open_stored_file(job.source) as source:
+            with Image.open(source) as image:
+                # Lets JPEG decode at a reduced scale instead of full resolution
+                image.draft('RGB', PREVIEW_SIZE)
+                image = ImageOps.exif_transpose(image)
+                stem = hashlib.sha256(job.source.encode('utf-8')).hexdigest()[:32]
+                job.preview.save(f'{stem}_preview.webp', _render_webp(image, PREVIEW_SIZE), save=False)
+                job.thumbnail.save(f'{stem}_thumb.webp', _render_webp(image, THUMBNAIL_SIZE), save=False)
+        job.status = 'done'
+        job.error = ''
+    except UnidentifiedImageError:
+        job.status = 'skipped'
+    except Exception as e:
+        job.status = 'failed'
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['thumbnail', 'preview', 'status', 'error', 'finished_at'])
+    return job.status
@@ -0,0 +1,193 @@
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadhandler import MemoryFileUploadHandler, SkipFile, TemporaryFileUploadHandler
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ApplicationDocument, PendingUpload, Student, StudentDocument, Thumbnail
+
+
+# Document files are stored once per content hash and shared by every row that
+# uploads the same bytes, so never delete a document's file along with its row.
+DOCUMENT_BLOB_DIR = 'documents/blobs'
+
+PUSH_BATCH_SIZE = 20
+PUSH_MAX_ATTEMPTS = 5
+# Claimed pushes older than this belonged to a worker that stopped mid-batch
+PUSH_STALE_AFTER = timedelta(minutes=10)
+
+
+class UploadSizeLimitMixin:
+    """Drops a file as soon as it grows past MAX_UPLOAD_SIZE instead of spooling all of it.
+
+    The reason is kept on request.rejected_uploads for the view to report.
+    """
+
+    def receive_data_chunk(self, raw_data, start):
+        if getattr(self, 'activated', True) and start + len(raw_data) > settings.MAX_UPLOAD_SIZE:
+            self.request.__dict__.setdefault('rejected_uploads', []).append(
+                f'{self.file_name} is larger than {settings.MAX_UPLOAD_SIZE // (1024 * 1024)} MB'
+            )
+            raise SkipFile()
+        return super().receive_data_chunk(raw_data, start)
+
+
+class ContentHashMixin:
+    """Hashes an upload as its chunks arrive and sets content_hash on the finished file"""
+
+    def new_file(self, *args, **kwargs):
+        # Set up first: an activated memory handler ends new_file with StopFutureHandlers
+        self.hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # An inactive memory handler only passes chunks on to the temporary file handler
+        if getattr(self, 'activated', True):
+            self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.content_hash = self.hasher.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(UploadSizeLimitMixin, ContentHashMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(UploadSizeLimitMixin, ContentHashMixin, TemporaryFileUploadHandler):
+    pass
+
+
+def get_upload_errors(request, files=()):
+    """Reasons the request's uploads can't be accepted, empty when they all can.
+
+    Covers every file the request dropped for size while streaming, and those
+    of the given document files whose extension is not in ALLOWED_DOCUMENT_EXTENSIONS.
+    Views taking other uploads (attachments, images) call it without files.
+    """
+    errors = list(getattr(request, 'rejected_uploads', []))
+    for file in files:
+        extension = os.path.splitext(file.name or '')[1].lower()
+        if extension not in settings.ALLOWED_DOCUMENT_EXTENSIONS:
+            errors.append(f'{file.name} is not an allowed file type')
+    return errors
+
+
+def get_content_hash(file):
+    """SHA-256 of an uploaded file; reuses the hash taken during the upload when there is one"""
+    digest = getattr(file, 'content_hash', None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    for chunk in file.chunks():
+        hasher.update(chunk)
+    file.seek(0)
+    file.content_hash = hasher.hexdigest()
+    return file.content_hash
+
+
+def find_document_blob(digest):
+    """Storage name of an already stored file with this hash, or None"""
+    for model in (StudentDocument, ApplicationDocument):
+        name = model.objects.filter(content_hash=digest).exclude(file='').values_list('file', flat=True).first()
+        if name:
+            return name
+    return None
+
+
+def spool_storage():
+    return FileSystemStorage(location=settings.UPLOAD_SPOOL_ROOT)
+
+
+def open_stored_file(name):
+    """Open a stored document, from the spool while its push to remote storage is still pending"""
+    spool = spool_storage()
+    if settings.UPLOAD_SPOOL_ENABLED and spool.exists(name):
+        return spool.open(name, 'rb')
+    return default_storage.open(name, 'rb')
+
+
+def store_document(file):
+    """Store an uploaded document under its content hash and return (storage name, hash).
+
+    Assign the name to a document's FileField: the bytes are only written when
+    no earlier row or blob already holds them. With UPLOAD_SPOOL_ENABLED they go
+    to the local spool and push_uploads copies them to remote storage later.
+    """
+    digest = get_content_hash(file)
+    name = find_document_blob(digest)
+    if name:
+        return name, digest
+    extension = os.path.splitext(file.name or '')[1].lower()
+    name = f'{DOCUMENT_BLOB_DIR}/{digest[:2]}/{digest}{extension}'
+    if settings.UPLOAD_SPOOL_ENABLED:
+        spool = spool_storage()
+        if not spool.exists(name):
+            spool.save(name, file)
+        PendingUpload.objects.bulk_create([PendingUpload(name=name)], ignore_conflicts=True)
+    elif not default_storage.exists(name):
+        name = default_storage.save(name, file)
+    return name, digest
+
+
+def release_stale_uploads():
+    """Put pushes claimed by a crashed worker back in the queue"""
+    return PendingUpload.objects.filter(
+        status='pushing', claimed_at__lt=timezone.now() - PUSH_STALE_AFTER
+    ).update(status='pending', claimed_at=None)
+
+
+def claim_upload_batch(batch_size=PUSH_BATCH_SIZE):
+    """Mark up to batch_size pending uploads as 'pushing' and return them"""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            PendingUpload.objects.select_for_update(skip_locked=True)
+            .filter(status='pending').order_by('created_at', 'id')[:batch_size]
+        )
+        if batch:
+            PendingUpload.objects.filter(pk__in=[job.pk for job in batch]).update(status='pushing', claimed_at=now)
+    return batch
+
+
+def rename_stored_document(old_name, new_name):
+    """Point every row that references old_name at new_name"""
+    StudentDocument.objects.filter(file=old_name).update(file=new_name)
+    ApplicationDocument.objects.filter(file=old_name).update(file=new_name)
+    Student.objects.filter(doc_submitted=old_name).update(doc_submitted=new_name)
+    if Thumbnail.objects.filter(source=new_name).exists():
+        Thumbnail.objects.filter(source=old_name).delete()
+    else:
+        Thumbnail.objects.filter(source=old_name).update(source=new_name)
+
+
+def push_upload(job, max_attempts=PUSH_MAX_ATTEMPTS):
+    """Copy a spooled document to default storage, then drop it from the spool.
+
+    Storage backends may save under a different name than asked for; rows are
+    then moved over to the name actually stored. Returns True once pushed.
+    """
+    spool = spool_storage()
+    try:
+        with spool.open(job.name, 'rb') as file:
+            stored = job.name if default_storage.exists(job.name) else default_storage.save(job.name, file)
+        with transaction.atomic():
+            if stored != job.name:
+                rename_stored_document(job.name, stored)
+            job.delete()
+    except Exception as e:
+        job.attempts += 1
+        job.last_error = str(e)
+        job.status = 'failed' if job.attempts >= max_attempts else 'pending'
+        job.claimed_at = None
+        job.save(update_fields=['attempts', 'last_error', 'status', 'claimed_at'])
+        return False
+    spool.delete(job.name)
+    return True
@@ -15,10 +15,12 @@ urlpatterns = [
     path('api/admin/stats/', views.admin_stats, name='admin_stats'),
     path('api/admin/change-password/', views.admin_change_password, name='admin_change_password'),
     path('api/admin/create-admin/', views.create_admin, name='create_admin'),
+    path('api/admin/audit-logs/', views.get_admin_logs, name='get_admin_logs'),
     
     # Popup management endpoints
     path('api/student/popups/', views.get_student_popups, name='get_student_popups'),
     path('api/student/popups/<int:popup_id>/mark-viewed/', views.mark_popup_viewed, name='mark_popup_viewed'),
+    path('api/student/popups/mark-viewed/', views.mark_popups_viewed, name='mark_popups_viewed'),
     path('api/admin/popups/', views.get_popups, name='get_popups'),
     path('api/admin/popups/<int:popup_id>/', views.get_popup, name='get_popup'),
     path('api/admin/popups/create/', views.create_popup, name='create_popup'),
@@ -26,6 +28,9 @@ urlpatterns = [
     path('api/admin/popups/<int:popup_id>/toggle/', views.toggle_popup, name='toggle_popup'),
     path('api/admin/popups/<int:popup_id>/delete/', views.delete_popup, name='delete_popup'),
     path('api/admin/reports/', views.generate_report, name='generate_report'),
+    path('api/admin/reports/jobs/', views.queue_report_job, name='queue_report_job'),
+    path('api/admin/reports/jobs/<int:job_id>/', views.get_report_job, name='get_report_job'),
+    path('api/admin/reports/jobs/<int:job_id>/download/', views.download_report_job, name='download_report_job'),
     
     # Student application management endpoints
     path('api/admin/student-applications/', views.get_student_applications, name='get_student_applications'),
@@ -55,10 +60,16 @@ urlpatterns = [
     path('api/admin/program-applications/<int:application_id>/approve/', views.approve_program_application, name='approve_program_application'),
     path('api/admin/program-applications/<int:application_id>/reject/', views.reject_program_application, name='reject_program_application'),
     path('api/admin/programs/<int:program_id>/applicants/', views.get_program_applicants_by_program, name='get_program_applicants_by_program'),
+    path('api/admin/programs/<int:program_id>/documents.zip', views.download_program_documents, name='download_program_documents'),
+    path('api/admin/applications/<int:app_id>/documents.zip', views.download_application_documents, name='download_application_documents'),
     
     # Messaging and Ticketing API
     path('api/messages/', views.get_messages, name='get_messages'),
+    path('api/messages/unread-count/', views.get_unread_message_count, name='get_unread_message_count'),
+    path('api/events/', views.event_stream, name='event_stream'),
+    path('api/events/poll/', views.poll_events, name='poll_events'),
     path('api/messages/<int:message_id>/read/', views.mark_message_read, name='mark_message_read'),
+    path('api/messages/mark-read/', views.mark_messages_read, name='mark_messages_read'),
     path('api/messages/send/', views.send_message, name='send_message'),
     path('api/admin/messages/send-system/', views.admin_send_system_message, name='admin_send_system_message'),
     path('api/admin/messages/send-email/', views.admin_send_email, name='admin_send_email'),
@@ -1,6 +1,4 @@
 from django.shortcuts import render, redirect, get_object_or_404
-import threading
-from django.core.mail import send_mail, EmailMultiAlternatives
 from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
@@ -9,22 +7,28 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from datetime import datetime, timedelta
-from django.db.models import Count
+from django.db.models import Count, Prefetch, Q, Sum
 from django.db.models.functions import TruncDay, TruncMonth
 import json
-from .models import Admin, Student, Popup, StudentDocument, ApplicationDocument, Message, AdminLog
+from .models import Admin, Student, Popup, StudentDocument, ApplicationDocument, Message, AdminLog, ReportJob, DailyApplicationStat
 from django.db import models
 from home.models import Program, Application
-from django.http import HttpResponse
-import csv
+from django.http import HttpResponse, StreamingHttpResponse, FileResponse
+from django.core.handlers.asgi import ASGIRequest
 import os
-from django.utils.html import strip_tags
-from docx import Document
-from docx.shared import Inches, Pt, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from .stats import STUDENT_CHART_TYPES, get_student_chart_data, get_dashboard_counts, schedule_dashboard_counter_refresh
+from .outbox import default_from_email, queue_emails, queue_html_email, store_attachment
+from .archives import application_zip_entries, stream_zip
+from .audit import flush_admin_logs, log_admin_action
+from .documents import get_missing_documents, get_required_documents, students_missing_document
+from .events import get_events, latest_event_id, publish_event, stream_events
+from .popups import get_unseen_popups
+from .sync import changed_since, get_deleted_ids, needs_full_sync, parse_since
+from .thumbnails import NO_THUMBNAIL, get_thumbnail_urls
+from .uploads import get_upload_errors, store_document
+from .reports import get_report_queryset, get_report_columns, iter_report_rows, stream_report_csv, write_report_docx
 
 
 def landing_page_view(request):
@@ -50,7 +54,7 @@ def login_view(request):
             request.session['user_id'] = admin_user.admin_id
             
             # Log the login action
-            AdminLog.objects.create(admin=admin_user, action="Signed in")
+            log_admin_action(admin_user.admin_id, "Signed in")
 
             return redirect('accounts:admin_dashboard')
         # Check if user is Student
@@ -117,7 +121,14 @@ def register_view(request):
         if student_type != 'Undergraduate':
             program_and_yr = None
 
-        first_doc = documents[0] if documents else None
+        upload_errors = get_upload_errors(request, documents)
+        if upload_errors:
+            messages.error(request, ' '.join(upload_errors))
+            return render(request, 'accounts/register.html')
+
+        # doc_submitted and the first StudentDocument point at the same stored blob
+        stored_docs = [store_document(doc) for doc in documents]
+        first_doc = stored_docs[0][0] if stored_docs else None
 
         student = Student.objects.create(
             username=username,
@@ -137,8 +148,8 @@ def register_view(request):
             status='pending' 
         )
         
-        for doc in documents:
-            StudentDocument.objects.create(student=student, file=doc)
+        for name, digest in stored_docs:
+            StudentDocument.objects.create(student=student, file=name, content_hash=digest)
 
         student.save()
         
@@ -149,10 +160,8 @@ def register_view(request):
     return render(request, 'accounts/register.html')
 
 def _send_email_async(subject, message, recipient_list):
-    """Helper to send email in a separate thread."""
-    def _send():
-        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, recipient_list, fail_silently=False)
-    threading.Thread(target=_send).start()
+    """Helper to queue an email for the send_outbox worker."""
+    queue_emails(recipient_list, subject, message)
 
 def approve_student(request, student_id):
     if request.method == 'POST':
@@ -188,6 +197,8 @@ def admin_dashboard(request):
     programs = Program.objects.all()
     
     admins_list = Admin.objects.all()
+    # Show this process's not-yet-written entries too
+    flush_admin_logs()
     admin_logs = AdminLog.objects.select_related('admin').order_by('-timestamp')[:50]
 
     return render(request, 'accounts/admin_dashboard.html', {
@@ -228,8 +239,7 @@ def create_program(request):
         Program.objects.create(program_name=program_name, requirements=requirements, document_requirements=document_requirements, program_type=program_type)
         
         if admin_id:
-            current_admin = Admin.objects.get(admin_id=admin_id)
-            AdminLog.objects.create(admin=current_admin, action=f"Created program '{program_name}'")
+            log_admin_action(admin_id, f"Created program '{program_name}'")
 
         messages.success(request, f"Program '{program_name}' created successfully!")
         print("✅ Program created:", program_name)
@@ -255,6 +265,11 @@ def create_student_application(request):
         if not program_id:
             return JsonResponse({'success': False, 'error': 'Program is required'}, status=400)
 
+        documents = request.FILES.getlist('supporting_docs')
+        upload_errors = get_upload_errors(request, documents)
+        if upload_errors:
+            return JsonResponse({'success': False, 'error': ' '.join(upload_errors)}, status=400)
+
         # Get entities
         student = get_object_or_404(Student, pk=student_id)
         program = get_object_or_404(Program, program_id=program_id)
@@ -267,9 +282,9 @@ def create_student_application(request):
         )
 
         # Handle multiple supporting documents (new uploads)
-        documents = request.FILES.getlist('supporting_docs')
         for doc in documents:
-            ApplicationDocument.objects.create(application=app, file=doc)
+            name, digest = store_document(doc)
+            ApplicationDocument.objects.create(application=app, file=name, content_hash=digest)
 
         # Handle imported documents from Student's uploaded files
         imported_doc_ids = request.POST.getlist('imported_docs')
@@ -282,7 +297,8 @@ def create_student_application(request):
                         # Create an ApplicationDocument referencing the same file
                         ApplicationDocument.objects.create(
                             application=app, 
-                            file=student_doc.file
+                            file=student_doc.file,
+                            content_hash=student_doc.content_hash
                         )
                 except StudentDocument.DoesNotExist:
                     pass # Skip invalid or unauthorized document IDs
@@ -298,23 +314,16 @@ def admin_stats(request):
         return JsonResponse({'error': 'Not authenticated'}, status=401)
     
     try:
-        total_students = Student.objects.filter(status='active').count()
-        active_popups = Popup.objects.filter(is_active=True).count()
-        pending_student_registrations = Student.objects.filter(status='pending').count()
-        pending_program_applications = Application.objects.filter(requirement_status='submitted').count()
-        total_programs = Program.objects.count()
-        
-        # New: Unread student messages for inbox badge
-        unread_messages = Message.objects.filter(is_read=False, sender_type='student').count()
+        counts = get_dashboard_counts()
         
         return JsonResponse({
-            'total_students': total_students,
-            'active_popups': active_popups,
-            'pending_applications': pending_student_registrations, # Keeping for backward compatibility
-            'pending_student_registrations': pending_student_registrations,
-            'pending_program_applications': pending_program_applications,
-            'total_programs': total_programs,
-            'unread_messages': unread_messages
+            'total_students': counts['total_students'],
+            'active_popups': counts['active_popups'],
+            'pending_applications': counts['pending_student_registrations'], # Keeping for backward compatibility
+            'pending_student_registrations': counts['pending_student_registrations'],
+            'pending_program_applications': counts['pending_program_applications'],
+            'total_programs': counts['total_programs'],
+            'unread_messages': counts['unread_messages']
         })
 
     except Exception as e:
@@ -348,7 +357,7 @@ def admin_change_password(request):
         admin.save()
         
         # Log the password change action
-        AdminLog.objects.create(admin=admin, action="Changed password")
+        log_admin_action(admin.admin_id, "Changed password")
         
         return JsonResponse({'success': True, 'message': 'Password changed successfully.'})
         
@@ -386,8 +395,7 @@ def create_admin(request):
             password=new_password
         )
 
-        current_admin = Admin.objects.get(admin_id=admin_id)
-        AdminLog.objects.create(admin=current_admin, action=f"Created new admin: {new_admin.admin_name}")
+        log_admin_action(admin_id, f"Created new admin: {new_admin.admin_name}")
 
         return JsonResponse({'success': True, 'message': 'Admin created successfully.'})
 
@@ -395,6 +403,76 @@ def create_admin(request):
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 
+@require_http_methods(["GET"])
+def get_admin_logs(request):
+    """Get a page of the admin audit log, newest first.
+
+    Pages are keyed on (timestamp, id): pass the returned next_cursor back as
+    ?cursor=. Optional filters: ?admin=<admin_id>, ?action=<prefix>,
+    ?start_date= and ?end_date= (YYYY-MM-DD, inclusive).
+    """
+    admin_id = request.session.get('user_id')
+    if not admin_id or request.session.get('user_role') != 'admin':
+        return JsonResponse({'error': 'Not authenticated'}, status=401)
+
+    try:
+        page_size = _get_page_size(request)
+        logs = AdminLog.objects.select_related('admin').order_by('-timestamp', '-id')
+
+        log_admin = request.GET.get('admin')
+        if log_admin and log_admin != 'all':
+            logs = logs.filter(admin_id=log_admin)
+
+        action = request.GET.get('action')
+        if action:
+            logs = logs.filter(action__startswith=action)
+
+        try:
+            start_date = request.GET.get('start_date')
+            if start_date:
+                logs = logs.filter(timestamp__gte=timezone.make_aware(datetime.strptime(start_date, '%Y-%m-%d')))
+            end_date = request.GET.get('end_date')
+            if end_date:
+                logs = logs.filter(timestamp__lt=timezone.make_aware(datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)))
+        except ValueError:
+            return JsonResponse({'error': 'Dates must be YYYY-MM-DD'}, status=400)
+
+        cursor = request.GET.get('cursor')
+        if cursor:
+            try:
+                cursor_time, cursor_id = cursor.replace(' ', '+').rsplit('_', 1)
+                cursor_time = datetime.fromisoformat(cursor_time)
+                cursor_id = int(cursor_id)
+            except ValueError:
+                return JsonResponse({'error': 'Invalid cursor'}, status=400)
+            logs = logs.filter(
+                models.Q(timestamp__lt=cursor_time) | models.Q(timestamp=cursor_time, id__lt=cursor_id)
+            )
+
+        # Fetch one extra row to know whether another page exists
+        page = list(logs[:page_size + 1])
+        has_more = len(page) > page_size
+        page = page[:page_size]
+
+        logs_data = [
+            {
+                'id': log.id,
+                'admin_id': log.admin_id,
+                'admin_name': log.admin.full_name or log.admin.admin_name,
+                'action': log.action,
+                'timestamp': log.timestamp.isoformat(),
+            }
+            for log in page
+        ]
+        return JsonResponse({
+            'logs': logs_data,
+            'next_cursor': f"{page[-1].timestamp.isoformat()}_{page[-1].id}" if has_more else None,
+            'has_more': has_more,
+        })
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 def get_popups(request):
     """Get all popups for the admin"""
     admin_id = request.session.get('user_id')
@@ -445,35 +523,36 @@ def get_popup(request, popup_id):
 
 
 def get_student_popups(request):
-    """Get active popups for students"""
+    """Get the active popups the current student has not dismissed yet"""
     student_id = request.session.get('user_id')
     if not student_id:
         return JsonResponse({'error': 'Not authenticated'}, status=401)
     
     try:
+        try:
+            since = _get_since(request)
+        except ValueError:
+            return JsonResponse({'error': 'Invalid since'}, status=400)
+
         now = timezone.now()
-        student = get_object_or_404(Student, pk=student_id)
 
-        # Fetch active popups that haven't expired and not seen by student
-        popups = Popup.objects.filter(
-            is_active=True
-        ).filter(
-            models.Q(expires_at__isnull=True) | models.Q(expires_at__gt=now)
-        ).exclude(
-            seen_by=student
-        ).order_by('-created_at')
-        
-        popup_data = []
-        for popup in popups:
-            popup_data.append({
-                'id': popup.id,
-                'title': popup.title,
-                'message': popup.message,
-                'popup_type': popup.popup_type,
-                'created_at': popup.created_at.isoformat()
-            })
-        
-        return JsonResponse({'popups': popup_data})
+        # Active popups come from the cache; the student's seen set is one indexed query
+        popup_data = get_unseen_popups(student_id, now)
+
+        deleted = None
+        if since:
+            # Only popups edited since the last sync; ones that stopped being visible become deletions
+            changed_ids = set(Popup.objects.filter(updated_at__gte=changed_since(since)).values_list('id', flat=True))
+            expired_ids = set(Popup.objects.filter(
+                expires_at__gte=changed_since(since), expires_at__lte=now
+            ).values_list('id', flat=True))
+            popup_data = [popup for popup in popup_data if popup['id'] in changed_ids]
+            deleted = (changed_ids | expired_ids | set(get_deleted_ids('popup', since))) - {p['id'] for p in popup_data}
+
+        response = {'popups': popup_data, 'sync_token': now.isoformat(), 'full_sync': since is None}
+        if since:
+            response['deleted'] = sorted(deleted)
+        return JsonResponse(response)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -497,6 +576,40 @@ def mark_popup_viewed(request, popup_id):
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def mark_popups_viewed(request):
+    """Mark several popups as viewed by the student.
+
+    Body: {"popup_ids": [...]}. Returns a result per id: marked, already_seen or not_found.
+    """
+    student_id = request.session.get('user_id')
+    if not student_id:
+        return JsonResponse({'error': 'Not authenticated'}, status=401)
+
+    try:
+        try:
+            popup_ids = _get_id_list(json.loads(request.body), 'popup_ids')
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        student = get_object_or_404(Student, pk=student_id)
+
+        SeenBy = Popup.seen_by.through
+        existing = set(Popup.objects.filter(id__in=popup_ids).values_list('id', flat=True))
+        already_seen = set(SeenBy.objects.filter(student=student, popup_id__in=existing).values_list('popup_id', flat=True))
+        SeenBy.objects.bulk_create(
+            [SeenBy(popup_id=popup_id, student=student) for popup_id in existing - already_seen], ignore_conflicts=True,
+        )
+
+        results = {
+            popup_id: 'not_found' if popup_id not in existing else 'already_seen' if popup_id in already_seen else 'marked'
+            for popup_id in popup_ids
+        }
+        return JsonResponse({'success': True, 'results': results})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def create_popup(request):
@@ -521,8 +634,8 @@ def create_popup(request):
             expires_at=expires_at
         )
         
-        current_admin = Admin.objects.get(admin_id=admin_id)
-        AdminLog.objects.create(admin=current_admin, action=f"Created popup '{popup.title}'")
+        log_admin_action(admin_id, f"Created popup '{popup.title}'")
+        publish_event('popup', 'student')
         
         return JsonResponse({
             'success': True,
@@ -557,8 +670,7 @@ def edit_popup(request, popup_id):
         popup.expires_at = expires_at
         popup.save()
         
-        current_admin = Admin.objects.get(admin_id=admin_id)
-        AdminLog.objects.create(admin=current_admin, action=f"Edited popup '{popup.title}'")
+        log_admin_action(admin_id, f"Edited popup '{popup.title}'")
         
         return JsonResponse({
             'success': True,
@@ -582,8 +694,7 @@ def toggle_popup(request, popup_id):
         popup.save()
         
         action_word = "Activated" if popup.is_active else "Deactivated"
-        current_admin = Admin.objects.get(admin_id=admin_id)
-        AdminLog.objects.create(admin=current_admin, action=f"{action_word} popup '{popup.title}'")
+        log_admin_action(admin_id, f"{action_word} popup '{popup.title}'")
         
         return JsonResponse({
             'success': True,
@@ -607,8 +718,7 @@ def delete_popup(request, popup_id):
         popup_title = popup.title
         popup.delete()
         
-        current_admin = Admin.objects.get(admin_id=admin_id)
-        AdminLog.objects.create(admin=current_admin, action=f"Deleted popup '{popup_title}'")
+        log_admin_action(admin_id, f"Deleted popup '{popup_title}'")
         
         return JsonResponse({
             'success': True,
@@ -618,47 +728,189 @@ def delete_popup(request, popup_id):
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 
+# Pagination and sync helpers
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _get_page_size(request, default=DEFAULT_PAGE_SIZE):
+    """Read ?page_size= from the request, clamped to 1..MAX_PAGE_SIZE"""
+    try:
+        page_size = int(request.GET.get('page_size', default))
+    except (TypeError, ValueError):
+        page_size = default
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def _get_id_list(data, key):
+    """Read a list of up to MAX_PAGE_SIZE integer ids from a JSON body, dropping duplicates"""
+    ids = data.get(key)
+    if not isinstance(ids, list) or not ids:
+        raise ValueError(f'{key} must be a non-empty list')
+    if len(ids) > MAX_PAGE_SIZE:
+        raise ValueError(f'At most {MAX_PAGE_SIZE} {key} per request')
+    try:
+        return list(dict.fromkeys(int(value) for value in ids))
+    except (TypeError, ValueError):
+        raise ValueError(f'{key} must contain integer ids')
+
+
+def _get_since(request):
+    """Read the ?since= sync token; None means the caller should send a full list.
+
+    Tokens older than the tombstone retention also get a full list, flagged with
+    full_sync in the response. Raises ValueError for a malformed token.
+    """
+    since = parse_since(request.GET.get('since'))
+    if since and needs_full_sync(since):
+        return None
+    return since
+
+
 # Student Application Management Views
+STUDENT_SORT_FIELDS = ('student_id', 'created_at', 'status', 'barangay', 'student_type')
+STUDENT_SUMMARY_FIELDS = (
+    'student_id', 'username', 'first_name', 'last_name', 'email', 'contact_num',
+    'barangay', 'student_type', 'program_and_yr', 'status', 'created_at', 'approved_at',
+)
+
+
 def get_student_applications(request):
-    """Get all student applications for admin review"""
+    """Get a page of students for admin review.
+
+    Supports ?student_id=, ?status=, ?barangay=, ?student_type=, ?missing_document=,
+    ?created_from= and ?created_to= (YYYY-MM-DD) filters, ?search= over name, username
+    and email, ?sort= on one of STUDENT_SORT_FIELDS (prefix with
+    '-' for descending), ?page= / ?page_size=, and ?view=summary to leave out
+    profile details and document lists.
+    """
     admin_id = request.session.get('user_id')
     if not admin_id:
         return JsonResponse({'error': 'Not authenticated'}, status=401)
     
     try:
-        students = Student.objects.all().order_by('-student_id')
+        page_size = _get_page_size(request)
+        try:
+            page_number = max(1, int(request.GET.get('page', 1)))
+        except ValueError:
+            return JsonResponse({'error': 'Invalid page'}, status=400)
+
+        sort = request.GET.get('sort', '-student_id')
+        if sort.lstrip('-') not in STUDENT_SORT_FIELDS:
+            return JsonResponse({'error': f'Invalid sort field: {sort}'}, status=400)
+        summary = request.GET.get('view') == 'summary'
+
+        created_range = {}
+        for param in ('created_from', 'created_to'):
+            value = request.GET.get(param)
+            if not value:
+                continue
+            try:
+                created_range[param] = parse_date(value)
+            except ValueError:
+                created_range[param] = None
+            if created_range[param] is None:
+                return JsonResponse({'error': f'Invalid {param}: use YYYY-MM-DD'}, status=400)
+
+        students = Student.objects.all()
+
+        student_id = request.GET.get('student_id')
+        if student_id:
+            try:
+                students = students.filter(pk=int(student_id))
+            except ValueError:
+                return JsonResponse({'error': 'Invalid student_id'}, status=400)
+
+        search = request.GET.get('search', '').strip()
+        if search:
+            students = students.filter(
+                Q(username__icontains=search) | Q(first_name__icontains=search)
+                | Q(last_name__icontains=search) | Q(email__icontains=search)
+            )
+
+        status = request.GET.get('status')
+        if status and status != 'all':
+            students = students.filter(status=status)
+
+        barangay = request.GET.get('barangay')
+        if barangay and barangay != 'all':
+            students = students.filter(barangay=barangay)
+
+        student_type = request.GET.get('student_type')
+        if student_type and student_type != 'all':
+            students = students.filter(student_type=student_type)
+
+        missing_document = request.GET.get('missing_document')
+        if missing_document:
+            students = students_missing_document(missing_document, students)
+
+        if 'created_from' in created_range:
+            students = students.filter(created_at__date__gte=created_range['created_from'])
+        if 'created_to' in created_range:
+            students = students.filter(created_at__date__lte=created_range['created_to'])
+
+        # student_id breaks ties so pages never overlap
+        ordering = [sort] if sort.lstrip('-') == 'student_id' else [sort, '-student_id']
+        students = students.order_by(*ordering)
+
+        if summary:
+            students = students.only(*STUDENT_SUMMARY_FIELDS)
+        else:
+            students = students.prefetch_related(
+                Prefetch('documents', queryset=StudentDocument.objects.order_by('id'))
+            )
+
+        # Fetch one extra row to know whether another page exists
+        offset = (page_number - 1) * page_size
+        page = list(students[offset:offset + page_size + 1])
+        has_more = len(page) > page_size
+        page = page[:page_size]
+
+        thumbnails = {} if summary else get_thumbnail_urls(
+            d.file.name for student in page for d in student.documents.all()
+        )
+
         application_data = []
-        
-        for student in students:
-            student_docs = student.documents.all()
-            doc_list = []
-            for d in student_docs:
-                doc_list.append({
-                    'id': d.id,
-                    'name': d.document_name,
-                    'url': d.file.url if d.file else None
-                })
-                
-            application_data.append({
+        for student in page:
+            item = {
                 'id': student.pk,
                 'username': student.username,
                 'first_name': student.first_name,
                 'last_name': student.last_name,
                 'email': student.email,
-                'bday': student.bday.isoformat(),
-                'address': student.address,
+                'contact_num': student.contact_num,
                 'barangay': student.barangay,
                 'student_type': student.student_type,
-                'contact_num': student.contact_num,
                 'program_and_yr': student.program_and_yr,
                 'status': student.status,
-                'doc_submitted': student.doc_submitted.url if student.doc_submitted else None,
-                'student_documents': doc_list,
                 'created_at': student.created_at.isoformat() if student.created_at else None,
                 'approved_at': student.approved_at.isoformat() if student.approved_at else None
-            })
+            }
+
+            if not summary:
+                item.update({
+                    'bday': student.bday.isoformat(),
+                    'address': student.address,
+                    'doc_submitted': student.doc_submitted.url if student.doc_submitted else None,
+                    'student_documents': [
+                        {
+                            'id': d.id,
+                            'name': d.document_name,
+                            'url': d.file.url if d.file else None,
+                            **thumbnails.get(d.file.name, NO_THUMBNAIL),
+                        }
+                        for d in student.documents.all()
+                    ],
+                })
+
+            application_data.append(item)
         
-        return JsonResponse({'applications': application_data})
+        return JsonResponse({
+            'applications': application_data,
+            'page': page_number,
+            'page_size': page_size,
+            'has_more': has_more,
+        })
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -678,8 +930,7 @@ def approve_student(request, student_id):
         student.warning_sent_at = None
         student.save()
         
-        current_admin = Admin.objects.get(admin_id=admin_id)
-        AdminLog.objects.create(admin=current_admin, action=f"Approved student {student.username}")
+        log_admin_action(admin_id, f"Approved student {student.username}")
         
         return JsonResponse({
             'success': True,
@@ -702,8 +953,7 @@ def reject_student(request, student_id):
         student.status = 'rejected'
         student.save()
         
-        current_admin = Admin.objects.get(admin_id=admin_id)
-        AdminLog.objects.create(admin=current_admin, action=f"Rejected student {student.username}")
+        log_admin_action(admin_id, f"Rejected student {student.username}")
         
         return JsonResponse({
             'success': True,
@@ -728,8 +978,7 @@ def renew_student(request, student_id):
         student.status = 'active'
         student.save()
         
-        current_admin = Admin.objects.get(admin_id=admin_id)
-        AdminLog.objects.create(admin=current_admin, action=f"Renewed student {student.username}")
+        log_admin_action(admin_id, f"Renewed student {student.username}")
         
         return JsonResponse({
             'success': True,
@@ -766,8 +1015,7 @@ def toggle_student_status(request, student_id):
             
         student.save()
         
-        current_admin = Admin.objects.get(admin_id=admin_id)
-        AdminLog.objects.create(admin=current_admin, action=f"{log_action} student {student.username}")
+        log_admin_action(admin_id, f"{log_action} student {student.username}")
         
         return JsonResponse({
             'success': True,
@@ -830,8 +1078,7 @@ def edit_student(request, student_id):
 
         student.save()
 
-        current_admin = Admin.objects.get(admin_id=admin_id)
-        AdminLog.objects.create(admin=current_admin, action=f"Edited student details for {student.username}")
+        log_admin_action(admin_id, f"Edited student details for {student.username}")
 
         return JsonResponse({
             'success': True,
@@ -854,8 +1101,7 @@ def delete_student(request, student_id):
         username = student.username
         student.delete()
         
-        current_admin = Admin.objects.get(admin_id=admin_id)
-        AdminLog.objects.create(admin=current_admin, action=f"Deleted student {username}")
+        log_admin_action(admin_id, f"Deleted student {username}")
         
         return JsonResponse({
             'success': True,
@@ -928,78 +1174,119 @@ def update_student_profile(request):
 
 # Program Application Management Views
 def get_program_applications(request):
-    """Get all program applications for admin review"""
+    """Get a page of program applications for admin review.
+
+    Pages are keyed on app_id (newest first): pass the returned next_cursor
+    back as ?cursor= to get the next page. Optional ?status= and ?program=
+    filters are applied in the database. With ?since=<sync_token> only
+    applications changed since then are returned, unpaged, plus the ids of
+    ones deleted or moved out of the status filter.
+    """
     admin_id = request.session.get('user_id')
     if not admin_id:
         return JsonResponse({'error': 'Not authenticated'}, status=401)
     
     try:
-        # First check if we have any applications
-        total_applications = Application.objects.count()
-        print(f"Debug: Total applications found: {total_applications}")
-        
-        if total_applications == 0:
-            return JsonResponse({'applications': []})
-        
-        # Get applications with related data
-        applications = Application.objects.select_related('student', 'program').all().order_by('-app_id')
+        page_size = _get_page_size(request)
+        try:
+            since = _get_since(request)
+        except ValueError:
+            return JsonResponse({'error': 'Invalid since'}, status=400)
+        sync_token = timezone.now().isoformat()
+
+        # Related rows are fetched in bulk so a page always costs the same number of queries
+        applications = Application.objects.select_related('student', 'program').prefetch_related(
+            Prefetch('student__documents', queryset=StudentDocument.objects.order_by('id')),
+            Prefetch('documents', queryset=ApplicationDocument.objects.order_by('id')),
+        ).order_by('-app_id')
+
+        program_id = request.GET.get('program')
+        if program_id and program_id != 'all':
+            applications = applications.filter(program_id=program_id)
+
+        status = request.GET.get('status')
+        status_filtered = status and status != 'all'
+        deleted = []
+
+        if since:
+            # Changed rows that no longer match the status filter are reported as deletions
+            changed = list(applications.filter(updated_at__gte=changed_since(since)))
+            page = [app for app in changed if not status_filtered or app.requirement_status == status]
+            deleted = [app.app_id for app in changed if status_filtered and app.requirement_status != status]
+            deleted += get_deleted_ids('application', since)
+            has_more = False
+        else:
+            if status_filtered:
+                applications = applications.filter(requirement_status=status)
+
+            cursor = request.GET.get('cursor')
+            if cursor:
+                try:
+                    applications = applications.filter(app_id__lt=int(cursor))
+                except ValueError:
+                    return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+            # Fetch one extra row to know whether another page exists
+            page = list(applications[:page_size + 1])
+            has_more = len(page) > page_size
+            page = page[:page_size]
+
+        thumbnails = get_thumbnail_urls(
+            doc.file.name for app in page for doc in [*app.student.documents.all(), *app.documents.all()]
+        )
+
         application_data = []
-        
-        for app in applications:
-            try:
-                # Fetch global student documents
-                student_docs_list = []
-                for s_doc in app.student.documents.all():
-                    student_docs_list.append({
-                        'id': s_doc.id,
-                        'name': s_doc.document_name,
-                        'url': s_doc.file.url if s_doc.file else None
-                    })
-
-                # Safely access student data
-                student_data = {
-                    'username': getattr(app.student, 'username', 'Unknown'),
-                    'first_name': getattr(app.student, 'first_name', 'Unknown'),
-                    'last_name': getattr(app.student, 'last_name', 'Unknown'),
-                    'email': getattr(app.student, 'email', 'Unknown'),
-                    'doc_submitted': app.student.doc_submitted.url if app.student.doc_submitted else None,
-                    'student_documents': student_docs_list,
+        for app in page:
+            student_docs_list = [
+                {
+                    'id': s_doc.id,
+                    'name': s_doc.document_name,
+                    'url': s_doc.file.url if s_doc.file else None,
+                    **thumbnails.get(s_doc.file.name, NO_THUMBNAIL),
                 }
-                
-                # Fetch documents for this application
-                documents_list = []
-                app_docs = app.documents.all()
-                for doc in app_docs:
-                     documents_list.append({
-                        'url': doc.file.url, 
-                        'name': doc.file.name.split('/')[-1]
-                     })
-                
-                # Safely access program data
-                program_data = {
-                    'program_name': getattr(app.program, 'program_name', 'Unknown Program'),
+                for s_doc in app.student.documents.all()
+            ]
+
+            student_data = {
+                'username': app.student.username,
+                'first_name': app.student.first_name,
+                'last_name': app.student.last_name,
+                'email': app.student.email,
+                'doc_submitted': app.student.doc_submitted.url if app.student.doc_submitted else None,
+                'student_documents': student_docs_list,
+            }
+
+            documents_list = [
+                {
+                    'url': doc.file.url,
+                    'name': doc.file.name.split('/')[-1],
+                    **thumbnails.get(doc.file.name, NO_THUMBNAIL),
                 }
-                
-                application_data.append({
-                    'app_id': app.app_id,
-                    'student': student_data,
-                    'program': program_data,
-                    'documents': documents_list,
-                    'requirement_status': getattr(app, 'requirement_status', 'unknown'),
-                    'remarks': getattr(app, 'remarks', ''),
-                    'created_at': getattr(app, 'created_at', None)
-                })
-                
-            except Exception as e:
-                print(f"Debug: Error processing application {getattr(app, 'app_id', 'unknown')}: {str(e)}")
-                continue
-        
-        return JsonResponse({'applications': application_data})
+                for doc in app.documents.all()
+            ]
+
+            application_data.append({
+                'app_id': app.app_id,
+                'student': student_data,
+                'program': {'program_name': app.program.program_name},
+                'documents': documents_list,
+                'requirement_status': app.requirement_status,
+                'remarks': app.remarks or '',
+                'created_at': app.created_at
+            })
+
+        response = {
+            'applications': application_data,
+            'next_cursor': page[-1].app_id if has_more else None,
+            'has_more': has_more,
+            'sync_token': sync_token,
+            'full_sync': since is None,
+        }
+        if since:
+            response['deleted'] = deleted
+        return JsonResponse(response)
         
     except Exception as e:
-        print(f"Debug: Error in get_program_applications: {str(e)}")
-        import traceback
-        traceback.print_exc()
         return JsonResponse({'error': f'Database error: {str(e)}'}, status=500)
 
 
@@ -1020,8 +1307,7 @@ def approve_program_application(request, application_id):
         application.remarks = remarks
         application.save()
         
-        current_admin = Admin.objects.get(admin_id=admin_id)
-        AdminLog.objects.create(admin=current_admin, action=f"Approved program application {application.app_id}")
+        log_admin_action(admin_id, f"Approved program application {application.app_id}")
         
         # Send email notification
         try:
@@ -1037,18 +1323,9 @@ def approve_program_application(request, application_id):
             <p>Thank you,</p>
             <p>ScholarSync Subic Team</p>
             """
-            plain_message = strip_tags(html_message)
-            
-            send_mail(
-                subject,
-                plain_message,
-                settings.DEFAULT_FROM_EMAIL,
-                [student_email],
-                html_message=html_message,
-                fail_silently=True,
-            )
+            queue_html_email([student_email], subject, html_message, from_email=settings.DEFAULT_FROM_EMAIL)
         except Exception as e:
-            print(f"Error sending email: {str(e)}")
+            print(f"Error queueing email: {str(e)}")
         
         return JsonResponse({
             'success': True,
@@ -1075,8 +1352,7 @@ def reject_program_application(request, application_id):
         application.remarks = remarks
         application.save()
         
-        current_admin = Admin.objects.get(admin_id=admin_id)
-        AdminLog.objects.create(admin=current_admin, action=f"Rejected program application {application.app_id}")
+        log_admin_action(admin_id, f"Rejected program application {application.app_id}")
         
         # Send email notification
         try:
@@ -1092,18 +1368,9 @@ def reject_program_application(request, application_id):
             <p>Thank you,</p>
             <p>ScholarSync Subic Team</p>
             """
-            plain_message = strip_tags(html_message)
-            
-            send_mail(
-                subject,
-                plain_message,
-                settings.DEFAULT_FROM_EMAIL,
-                [student_email],
-                html_message=html_message,
-                fail_silently=True,
-            )
+            queue_html_email([student_email], subject, html_message, from_email=settings.DEFAULT_FROM_EMAIL)
         except Exception as e:
-            print(f"Error sending email: {str(e)}")
+            print(f"Error queueing email: {str(e)}")
         
         return JsonResponse({
             'success': True,
@@ -1137,6 +1404,51 @@ def get_program_applicants_by_program(request, program_id):
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
+def _applications_with_documents():
+    return Application.objects.select_related('student').prefetch_related(
+        Prefetch('documents', queryset=ApplicationDocument.objects.order_by('id')),
+        Prefetch('student__documents', queryset=StudentDocument.objects.order_by('id')),
+    )
+
+
+def _zip_response(entries, filename):
+    response = StreamingHttpResponse(stream_zip(entries), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@require_http_methods(["GET"])
+def download_application_documents(request, app_id):
+    """Stream one application's documents and the applicant's profile documents as a ZIP"""
+    if not request.session.get('user_id') or request.session.get('user_role') != 'admin':
+        return JsonResponse({'error': 'Not authorized'}, status=403)
+
+    app = get_object_or_404(_applications_with_documents(), app_id=app_id)
+    return _zip_response(application_zip_entries(app), f'application_{app.app_id}_documents.zip')
+
+
+@require_http_methods(["GET"])
+def download_program_documents(request, program_id):
+    """Stream the documents of every applicant to a program as one ZIP, one folder per application.
+
+    Optional ?status= limits it to applications with that requirement_status.
+    """
+    if not request.session.get('user_id') or request.session.get('user_role') != 'admin':
+        return JsonResponse({'error': 'Not authorized'}, status=403)
+
+    program = get_object_or_404(Program, program_id=program_id)
+    applications = _applications_with_documents().filter(program=program).order_by('app_id')
+    status = request.GET.get('status')
+    if status and status != 'all':
+        applications = applications.filter(requirement_status=status)
+
+    # Applications are loaded a chunk at a time, with their documents prefetched per chunk
+    entries = (
+        entry for app in applications.iterator(chunk_size=100) for entry in application_zip_entries(app)
+    )
+    return _zip_response(entries, f'program_{program.program_id}_documents.zip')
+
+
 # Chart Data API Views
 def get_application_trends(request):
     """Get application trends data for charts"""
@@ -1152,13 +1464,18 @@ def get_application_trends(request):
         end_date = timezone.now().date()
         start_date = end_date - timedelta(days=days-1)
         
-        # Get application data grouped by day
-        applications_by_day = Application.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date
-        ).extra(
-            select={'day': 'date(created_at)'}
-        ).values('day').annotate(count=Count('app_id')).order_by('day')
+        # Read the pre-aggregated daily rollup instead of scanning applications
+        stats = DailyApplicationStat.objects.filter(day__gte=start_date, day__lte=end_date)
+
+        program_id = request.GET.get('program')
+        if program_id and program_id != 'all':
+            stats = stats.filter(program_id=program_id)
+
+        status = request.GET.get('status')
+        if status and status != 'all':
+            stats = stats.filter(status=status)
+
+        applications_by_day = stats.values('day').annotate(count=Sum('count')).order_by('day')
         
         # Create a complete date range with counts
         date_counts = {}
@@ -1192,76 +1509,10 @@ def get_student_statistics(request):
     
     try:
         chart_type = request.GET.get('type', 'status')
-        
-        if chart_type == 'status':
-            # Get students by status
-            status_data = Student.objects.values('status').annotate(count=Count('id'))
-            
-            labels = []
-            data = []
-            colors = []
-            
-            status_colors = {
-                'active': 'rgba(102, 126, 234, 0.8)',
-                'pending': 'rgba(243, 156, 18, 0.8)',
-                'rejected': 'rgba(231, 76, 60, 0.8)'
-            }
-            
-            for item in status_data:
-                labels.append(item['status'].title())
-                data.append(item['count'])
-                colors.append(status_colors.get(item['status'], 'rgba(102, 126, 234, 0.8)'))
-            
-        elif chart_type == 'program':
-            # Get students by program
-            program_data = Student.objects.values('program_and_yr').annotate(count=Count('id')).order_by('-count')[:10]
-            
-            labels = []
-            data = []
-            colors = [
-                'rgba(102, 126, 234, 0.8)',
-                'rgba(118, 75, 162, 0.8)',
-                'rgba(39, 174, 96, 0.8)',
-                'rgba(243, 156, 18, 0.8)',
-                'rgba(231, 76, 60, 0.8)',
-                'rgba(52, 152, 219, 0.8)',
-                'rgba(155, 89, 182, 0.8)',
-                'rgba(46, 204, 113, 0.8)',
-                'rgba(230, 126, 34, 0.8)',
-                'rgba(231, 76, 60, 0.8)'
-            ]
-            
-            for i, item in enumerate(program_data):
-                labels.append(item['program_and_yr'])
-                data.append(item['count'])
-            
-            colors = colors[:len(labels)]
-            
-        elif chart_type == 'monthly':
-            # Get monthly registrations for the last 6 months
-            end_date = timezone.now().date()
-            start_date = end_date - timedelta(days=180)  # 6 months
-            
-            monthly_data = Student.objects.filter(
-                created_at__date__gte=start_date
-            ).extra(
-                select={'month': 'strftime("%Y-%m", created_at)'}
-            ).values('month').annotate(count=Count('id')).order_by('month')
-            
-            labels = []
-            data = []
-            
-            for item in monthly_data:
-                # Format month label
-                month_date = datetime.strptime(item['month'], '%Y-%m')
-                labels.append(month_date.strftime('%b'))
-                data.append(item['count'])
-        
-        return JsonResponse({
-            'labels': labels,
-            'data': data,
-            'colors': colors if chart_type in ['status', 'program'] else None
-        })
+        if chart_type not in STUDENT_CHART_TYPES:
+            return JsonResponse({'error': 'Invalid chart type'}, status=400)
+
+        return JsonResponse(get_student_chart_data(chart_type))
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -1274,8 +1525,16 @@ def get_my_applications(request):
         return JsonResponse({'error': 'Not authenticated'}, status=401)
 
     try:
+        try:
+            since = _get_since(request)
+        except ValueError:
+            return JsonResponse({'error': 'Invalid since'}, status=400)
+        sync_token = timezone.now().isoformat()
+
         student = get_object_or_404(Student, pk=student_id)
         applications = Application.objects.filter(student=student).select_related('program').order_by('-created_at')
+        if since:
+            applications = applications.filter(updated_at__gte=changed_since(since))
         
         app_list = []
         for app in applications:
@@ -1288,8 +1547,11 @@ def get_my_applications(request):
                 'is_remarks_viewed': app.is_remarks_viewed,
                 'created_at': app.created_at.isoformat() if app.created_at else None
             })
-            
-        return JsonResponse({'applications': app_list})
+
+        response = {'applications': app_list, 'sync_token': sync_token, 'full_sync': since is None}
+        if since:
+            response['deleted'] = get_deleted_ids('application', since, student.pk)
+        return JsonResponse(response)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -1383,42 +1645,36 @@ def generate_report(request):
         report_type = request.GET.get('type')
         start_date = request.GET.get('start_date')
         end_date = request.GET.get('end_date')
-        status = request.GET.get('status')
-        program_id = request.GET.get('program')
         export_csv = request.GET.get('export') == 'csv'
 
         data = []
         filename = f"report_{report_type}_{datetime.now().strftime('%Y%m%d')}"
+
+        query = get_report_queryset(report_type, request.GET)
+        if query is None:
+             return JsonResponse({'error': 'Invalid report type'}, status=400)
         
         # Log generation event if exporting
         if request.GET.get('export'):
             export_format = "Word" if request.GET.get('export') == 'word' else "CSV"
-            current_admin = Admin.objects.get(admin_id=admin_id)
-            AdminLog.objects.create(admin=current_admin, action=f"Generated {report_type} report in {export_format} format")
+            log_admin_action(admin_id, f"Generated {report_type} report in {export_format} format")
 
-        if report_type == 'students':
-            # Base query
-            query = Student.objects.all().order_by('-created_at')
+        # Handle CSV Export: stream rows straight from the database instead of building them in memory
+        if export_csv:
+            columns = get_report_columns(report_type, request.GET.get('fields'))
+            response = StreamingHttpResponse(stream_report_csv(query, columns), content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+            return response
 
-            # Filters
-            if start_date:
-                query = query.filter(created_at__date__gte=start_date)
-            if end_date:
-                query = query.filter(created_at__date__lte=end_date)
-            if status and status != 'all':
-                query = query.filter(status=status)
-            
-            barangay = request.GET.get('barangay')
-            school = request.GET.get('school')
-            
-            if barangay and barangay != 'all':
-                query = query.filter(barangay__iexact=barangay)
-            if school:
-                query = query.filter(current_school__icontains=school)
-            
-            # For data creation
-            header = ['Student ID', 'Username', 'First Name', 'Last Name', 'Email', 'Program', 'Barangay', 'School', 'Status', 'Date Joined']
-            
+        # Handle Word Export
+        if request.GET.get('export') == 'word':
+            columns = get_report_columns(report_type, request.GET.get('fields'))
+            response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+            response['Content-Disposition'] = f'attachment; filename="{filename}.docx"'
+            write_report_docx(iter_report_rows(query, columns), columns, response, start_date, end_date)
+            return response
+        
+        if report_type == 'students':
             for s in query:
                 data.append({
                     'id': s.student_id,
@@ -1432,31 +1688,7 @@ def generate_report(request):
                     'status': s.status,
                     'created_at': s.created_at.strftime('%Y-%m-%d') if s.created_at else 'N/A'
                 })
-
-        elif report_type == 'applications':
-            # Base query
-            query = Application.objects.select_related('student', 'program').all().order_by('-created_at')
-
-            # Filters
-            if start_date:
-                query = query.filter(created_at__date__gte=start_date)
-            if end_date:
-                query = query.filter(created_at__date__lte=end_date)
-            if status and status != 'all':
-                query = query.filter(requirement_status=status)
-            if program_id and program_id != 'all':
-                query = query.filter(program_id=program_id)
-                
-            barangay = request.GET.get('barangay')
-            school = request.GET.get('school')
-            
-            if barangay and barangay != 'all':
-                query = query.filter(student__barangay__iexact=barangay)
-            if school:
-                query = query.filter(student__current_school__icontains=school)
-
-            header = ['App ID', 'Student', 'Program', 'Barangay', 'School', 'Status', 'Date Submitted']
-            
+        else:
             for app in query:
                 data.append({
                     'id': app.app_id,
@@ -1468,340 +1700,126 @@ def generate_report(request):
                     'created_at': app.created_at.strftime('%Y-%m-%d') if app.created_at else 'N/A'
                 })
         
-        else:
-             return JsonResponse({'error': 'Invalid report type'}, status=400)
+        # Return JSON for table view
+        return JsonResponse({'data': data})
 
-        # Handle CSV Export
-        if export_csv:
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
 
-            fields_param = request.GET.get('fields')
-            selected_fields = fields_param.split(',') if fields_param else ['id', 'username', 'name', 'email', 'program', 'status', 'date', 'barangay', 'school']
-
-            writer = csv.writer(response)
-
-            writer.writerow(['Municipality of Subic'])
-            writer.writerow(['Baraca-Camachile, National Highway, Subic, 2209 Zambales'])
-            writer.writerow(['Applicants List'])
-            writer.writerow([])
-
-            if report_type == 'students':
-                export_header = []
-                if 'id' in selected_fields: export_header.append('Student ID')
-                if 'username' in selected_fields: export_header.append('Username')
-                if 'name' in selected_fields: export_header.extend(['First Name', 'Last Name'])
-                if 'email' in selected_fields: export_header.append('Email')
-                if 'program' in selected_fields: export_header.append('Program')
-                if 'barangay' in selected_fields: export_header.append('Barangay')
-                if 'school' in selected_fields: export_header.append('School')
-                if 'status' in selected_fields: export_header.append('Status')
-                if 'date' in selected_fields: export_header.append('Date Joined')
-                
-                writer.writerow(export_header)
-                
-                for row in data:
-                    out_row = []
-                    if 'id' in selected_fields: out_row.append(row['id'])
-                    if 'username' in selected_fields: out_row.append(row['username'])
-                    if 'name' in selected_fields: out_row.extend([row['first_name'], row['last_name']])
-                    if 'email' in selected_fields: out_row.append(row['email'])
-                    if 'program' in selected_fields: out_row.append(row['program'])
-                    if 'barangay' in selected_fields: out_row.append(row['barangay'])
-                    if 'school' in selected_fields: out_row.append(row['school'])
-                    if 'status' in selected_fields: out_row.append(row['status'])
-                    if 'date' in selected_fields: out_row.append(row['created_at'])
-                    writer.writerow(out_row)
-            else:
-                export_header = []
-                if 'id' in selected_fields: export_header.append('App ID')
-                if 'name' in selected_fields: export_header.append('Student')
-                if 'program' in selected_fields: export_header.append('Program')
-                if 'barangay' in selected_fields: export_header.append('Barangay')
-                if 'school' in selected_fields: export_header.append('School')
-                if 'status' in selected_fields: export_header.append('Status')
-                if 'date' in selected_fields: export_header.append('Date Submitted')
-                
-                writer.writerow(export_header)
-                
-                for row in data:
-                    out_row = []
-                    if 'id' in selected_fields: out_row.append(row['id'])
-                    if 'name' in selected_fields: out_row.append(row['student'])
-                    if 'program' in selected_fields: out_row.append(row['program'])
-                    if 'barangay' in selected_fields: out_row.append(row['barangay'])
-                    if 'school' in selected_fields: out_row.append(row['school'])
-                    if 'status' in selected_fields: out_row.append(row['status'])
-                    if 'date' in selected_fields: out_row.append(row['created_at'])
-                    writer.writerow(out_row)
+REPORT_JOB_PARAMS = ('start_date', 'end_date', 'status', 'program', 'barangay', 'school', 'fields')
 
-            return response
-        
-        # Handle Word Export
-        # Handle Word Export
-        if request.GET.get('export') == 'word':
-            document = Document()
-            
-            # Set Font to Calibri
-            style = document.styles['Normal']
-            font = style.font
-            font.name = 'Calibri'
-            font.size = Pt(11)
-            
-            # Adjust Margins
-            section = document.sections[0]
-            section.top_margin = Inches(0.5)
-            section.left_margin = Inches(0.5)
-            section.right_margin = Inches(0.5)
-            section.bottom_margin = Inches(0.5)
-            
-            # Header Setup
-            header_section = section.header
-            header_section.is_linked_to_previous = False
-            
-            # 3 columns: Left padding/Logo, Center Title, Right Padding
-            htable = header_section.add_table(1, 3, width=Inches(7.5))
-            htable.autofit = False
-            htable.columns[0].width = Inches(2.0)
-            htable.columns[1].width = Inches(3.5)
-            htable.columns[2].width = Inches(2.0)
-            
-            # Cell 0: Logo
-            cell0 = htable.cell(0, 0)
-            p0 = cell0.paragraphs[0]
-            p0.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-            
-            logo_path = os.path.join(settings.BASE_DIR, 'accounts', 'static', 'accounts', 'subic_seal.png')
-            if os.path.exists(logo_path):
-                run0 = p0.add_run()
-                run0.add_picture(logo_path, height=Inches(0.8))
-            
-            # Cell 1: Title and Address
-            cell1 = htable.cell(0, 1)
-            p1 = cell1.paragraphs[0]
-            p1.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            run1 = p1.add_run('Municipality of Subic\n')
-            run1.bold = True
-            run1.font.size = Pt(22) 
-            
-            run_address = p1.add_run('Baraca-Camachile, National Highway, Subic, 2209 Zambales\n')
-            run_address.font.size = Pt(10)
-            
-            run_title = p1.add_run('Applicants List')
-            run_title.bold = True
-            run_title.font.size = Pt(14)
-            
-            # Cell 2: Empty padding
-            cell2 = htable.cell(0, 2)
-            p2 = cell2.paragraphs[0]
-            
-            # Remove the default empty paragraph in the header if it causes spacing issues
-            if len(header_section.paragraphs) > 0:
-                header_section.paragraphs[0]._element.getparent().remove(header_section.paragraphs[0]._element)
-
-            # Add a paragraph for the separator line
-            border_paragraph = header_section.add_paragraph()
-            border_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            border_paragraph.paragraph_format.space_after = Pt(6)
-            
-            # Apply bottom border to this paragraph using OXML
-            p = border_paragraph._p
-            pPr = p.get_or_add_pPr()
-            pBdr = OxmlElement('w:pBdr')
-            bottom = OxmlElement('w:bottom')
-            bottom.set(qn('w:val'), 'single')
-            bottom.set(qn('w:sz'), '6')  # 1/8 pt, so 6 is 3/4 pt. Thin line.
-            bottom.set(qn('w:space'), '1')
-            bottom.set(qn('w:color'), 'CCCCCC') # Gray color
-            pBdr.append(bottom)
-            pPr.append(pBdr)
-
-            # Map fields for Word export
-            fields_param = request.GET.get('fields')
-            selected_fields = fields_param.split(',') if fields_param else ['id', 'username', 'name', 'email', 'program', 'status', 'date', 'barangay', 'school']
-
-            if report_type == 'students':
-                word_header = []
-                if 'id' in selected_fields: word_header.append('Student ID')
-                if 'username' in selected_fields: word_header.append('Username')
-                if 'name' in selected_fields: word_header.extend(['First Name', 'Last Name'])
-                if 'email' in selected_fields: word_header.append('Email')
-                if 'program' in selected_fields: word_header.append('Program')
-                if 'barangay' in selected_fields: word_header.append('Barangay')
-                if 'school' in selected_fields: word_header.append('School')
-                if 'status' in selected_fields: word_header.append('Status')
-                if 'date' in selected_fields: word_header.append('Date Joined')
-            else:
-                word_header = []
-                if 'id' in selected_fields: word_header.append('App ID')
-                if 'name' in selected_fields: word_header.append('Student')
-                if 'program' in selected_fields: word_header.append('Program')
-                if 'barangay' in selected_fields: word_header.append('Barangay')
-                if 'school' in selected_fields: word_header.append('School')
-                if 'status' in selected_fields: word_header.append('Status')
-                if 'date' in selected_fields: word_header.append('Date Submitted')
-
-            # Build data rows correspondingly
-            rows_data = []
-            if report_type == 'students':
-                for row in data:
-                    out_row = []
-                    if 'id' in selected_fields: out_row.append(str(row['id']))
-                    if 'username' in selected_fields: out_row.append(str(row['username']))
-                    if 'name' in selected_fields: out_row.extend([str(row['first_name']), str(row['last_name'])])
-                    if 'email' in selected_fields: out_row.append(str(row['email']))
-                    if 'program' in selected_fields: out_row.append(str(row['program']))
-                    if 'barangay' in selected_fields: out_row.append(str(row['barangay']))
-                    if 'school' in selected_fields: out_row.append(str(row['school']))
-                    if 'status' in selected_fields: out_row.append(str(row['status']))
-                    if 'date' in selected_fields: out_row.append(str(row.get('created_at', '')))
-                    rows_data.append(out_row)
-            else:
-                for row in data:
-                    out_row = []
-                    if 'id' in selected_fields: out_row.append(str(row['id']))
-                    if 'name' in selected_fields: out_row.append(str(row['student']))
-                    if 'program' in selected_fields: out_row.append(str(row['program']))
-                    if 'barangay' in selected_fields: out_row.append(str(row['barangay']))
-                    if 'school' in selected_fields: out_row.append(str(row['school']))
-                    if 'status' in selected_fields: out_row.append(str(row['status']))
-                    if 'date' in selected_fields: out_row.append(str(row.get('created_at', '')))
-                    rows_data.append(out_row)
-
-            # Table
-            table = document.add_table(rows=1, cols=len(word_header))
-            table.style = 'Table Grid'
-            
-            # Helper function for shading
-            def set_cell_background(cell, color_hex):
-                tcPr = cell._tc.get_or_add_tcPr()
-                shd = OxmlElement('w:shd')
-                shd.set(qn('w:val'), 'clear')
-                shd.set(qn('w:color'), 'auto')
-                shd.set(qn('w:fill'), color_hex)
-                tcPr.append(shd)
-
-            # Table Header
-            hdr_cells = table.rows[0].cells
-            for i, col_name in enumerate(word_header):
-                cell = hdr_cells[i]
-                set_cell_background(cell, '2E8B57') # Sea Green
-                run = cell.paragraphs[0].add_run(col_name)
-                run.bold = True
-                run.font.color.rgb = RGBColor(255, 255, 255) # White text
-                cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # Table Data Content
-            for index, row_content in enumerate(rows_data):
-                row_cells = table.add_row().cells
-                is_even = (index % 2 == 0)
-                bg_color = 'E8F5E9' if is_even else 'FFFFFF' # Light Green / White
-                
-                for i, text in enumerate(row_content):
-                    if i < len(row_cells):
-                        cell = row_cells[i]
-                        cell.text = text
-                        if is_even: 
-                             set_cell_background(cell, bg_color)
-            
-            # Footer Setup (Metadata, Page Number, Approved By)
-            footer = section.footer
-            footer.is_linked_to_previous = False
-            
-            ftable = footer.add_table(1, 3, width=Inches(7.5))
-            ftable.autofit = False
-            ftable.columns[0].width = Inches(2.5)
-            ftable.columns[1].width = Inches(2.5)
-            ftable.columns[2].width = Inches(2.5)
-            
-            # Left Footer: Generated On
-            fcell0 = ftable.cell(0, 0)
-            fp0 = fcell0.paragraphs[0]
-            fp0.alignment = WD_ALIGN_PARAGRAPH.LEFT
-            fr0 = fp0.add_run(f'Generated on: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
-            fr0.font.color.rgb = RGBColor(128, 128, 128)
-            fr0.font.size = Pt(9)
-            if start_date or end_date:
-                sd = start_date if start_date else 'Any'
-                ed = end_date if end_date else 'Any'
-                fr_dates = fp0.add_run(f'\nPeriod: {sd} to {ed}')
-                fr_dates.font.color.rgb = RGBColor(128, 128, 128)
-                fr_dates.font.size = Pt(9)
-            
-            # Middle Footer: Page Numbers
-            fcell1 = ftable.cell(0, 1)
-            fp1 = fcell1.paragraphs[0]
-            fp1.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            def add_page_number(run):
-                fldChar1 = OxmlElement('w:fldChar')
-                fldChar1.set(qn('w:fldCharType'), 'begin')
-                instrText1 = OxmlElement('w:instrText')
-                instrText1.set(qn('xml:space'), 'preserve')
-                instrText1.text = "PAGE"
-                fldChar2 = OxmlElement('w:fldChar')
-                fldChar2.set(qn('w:fldCharType'), 'separate')
-                fldChar3 = OxmlElement('w:fldChar')
-                fldChar3.set(qn('w:fldCharType'), 'end')
-                run._r.append(fldChar1)
-                run._r.append(instrText1)
-                run._r.append(fldChar2)
-                run._r.append(fldChar3)
-                
-            def add_num_pages(run):
-                fldChar1 = OxmlElement('w:fldChar')
-                fldChar1.set(qn('w:fldCharType'), 'begin')
-                instrText1 = OxmlElement('w:instrText')
-                instrText1.set(qn('xml:space'), 'preserve')
-                instrText1.text = "NUMPAGES"
-                fldChar2 = OxmlElement('w:fldChar')
-                fldChar2.set(qn('w:fldCharType'), 'separate')
-                fldChar3 = OxmlElement('w:fldChar')
-                fldChar3.set(qn('w:fldCharType'), 'end')
-                run._r.append(fldChar1)
-                run._r.append(instrText1)
-                run._r.append(fldChar2)
-                run._r.append(fldChar3)
-
-            fr1 = fp1.add_run('')
-            fr1.font.color.rgb = RGBColor(128, 128, 128)
-            fr1.font.size = Pt(9)
-            
-            add_page_number(fp1.add_run())
-            
-            fr_of = fp1.add_run(' out of ')
-            fr_of.font.color.rgb = RGBColor(128, 128, 128)
-            fr_of.font.size = Pt(9)
-            
-            add_num_pages(fp1.add_run())
 
-            # Right Footer: Approved By
-            fcell2 = ftable.cell(0, 2)
-            fp2 = fcell2.paragraphs[0]
-            fp2.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-            fr2 = fp2.add_run('Approved by: ____________________')
-            fr2.font.color.rgb = RGBColor(0, 0, 0)
-            fr2.font.size = Pt(11)
+def _serialize_report_job(job):
+    return {
+        'job_id': job.pk,
+        'report_type': job.report_type,
+        'export_format': job.export_format,
+        'status': job.status,
+        'row_count': job.row_count,
+        'error': job.error,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'download_url': f'/api/admin/reports/jobs/{job.pk}/download/' if job.status == 'done' else None,
+    }
 
-            response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
-            response['Content-Disposition'] = f'attachment; filename="{filename}.docx"'
-            document.save(response)
-            return response
-        
-        # Return JSON for table view
-        return JsonResponse({'data': data})
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def queue_report_job(request):
+    """Queue a report export to be rendered by the process_report_jobs worker"""
+    admin_id = request.session.get('user_id')
+    if not admin_id:
+        return JsonResponse({'error': 'Not authenticated'}, status=401)
+
+    try:
+        data = json.loads(request.body)
+        report_type = data.get('type')
+        export_format = data.get('export', 'csv')
+
+        if report_type not in ('students', 'applications'):
+            return JsonResponse({'success': False, 'error': 'Invalid report type'}, status=400)
+        if export_format not in ('csv', 'word'):
+            return JsonResponse({'success': False, 'error': 'Invalid export format'}, status=400)
+
+        job = ReportJob.objects.create(
+            admin_id=admin_id,
+            report_type=report_type,
+            export_format=export_format,
+            params={key: data[key] for key in REPORT_JOB_PARAMS if data.get(key)},
+        )
+
+        export_label = "Word" if export_format == 'word' else "CSV"
+        log_admin_action(admin_id, f"Queued {report_type} report in {export_label} format")
+
+        return JsonResponse({'success': True, **_serialize_report_job(job)})
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+def get_report_job(request, job_id):
+    """Poll the status of a queued report export"""
+    admin_id = request.session.get('user_id')
+    if not admin_id:
+        return JsonResponse({'error': 'Not authenticated'}, status=401)
+
+    job = get_object_or_404(ReportJob, pk=job_id)
+    return JsonResponse({'success': True, **_serialize_report_job(job)})
+
+
+def download_report_job(request, job_id):
+    """Download the rendered file of a finished report export"""
+    admin_id = request.session.get('user_id')
+    if not admin_id:
+        return JsonResponse({'error': 'Not authenticated'}, status=401)
+
+    job = get_object_or_404(ReportJob, pk=job_id)
+    if job.status != 'done' or not job.file:
+        return JsonResponse({'error': 'Report is not ready yet'}, status=409)
+
+    return FileResponse(job.file.open('rb'), as_attachment=True, filename=os.path.basename(job.file.name))
+
 
 # -------------------------------------------------------------
 # Messaging and Ticketing System Views
 # -------------------------------------------------------------
 
+def _message_inbox_queryset(user_id, user_role):
+    """Messages visible to the current user and the sender_type that counts as unread for them"""
+    if user_role == 'admin':
+        return Message.objects.all(), 'student'
+    return Message.objects.filter(student_id=user_id), 'admin'
+
+
+def _serialize_message(msg):
+    admin_name = msg.admin.admin_name if msg.admin else 'System/Unknown'
+    student_name = f"{msg.student.first_name} {msg.student.last_name} ({msg.student.username})"
+    return {
+        'id': msg.id,
+        'sender_type': msg.sender_type,
+        'sender_name': admin_name if msg.sender_type == 'admin' else student_name,
+        'target_student_id': msg.student.student_id,
+        'target_student_name': student_name,
+        'subject': msg.subject,
+        'body': msg.body,
+        'is_read': msg.is_read,
+        'created_at': msg.created_at.isoformat()
+    }
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def get_messages(request):
-    """Fetch messages for the current user (admin or student)."""
+    """Fetch a page of messages for the current user (admin or student), newest first.
+
+    Pages are keyed on message id: pass the returned next_cursor back as
+    ?cursor=. ?unread=1 limits the page to unread messages addressed to the
+    current user and ?student= (admin only) to one student's thread.
+    ?view=threads returns one entry per student thread instead, holding its
+    latest message and message/unread counts.
+
+    With ?since=<sync_token> the plain list instead returns every message
+    changed since then, unpaged, plus the ids of deleted ones.
+    """
     user_id = request.session.get('user_id')
     user_role = request.session.get('user_role')
 
@@ -1809,30 +1827,175 @@ def get_messages(request):
         return JsonResponse({'error': 'Not authenticated'}, status=401)
 
     try:
-        if user_role == 'admin':
-            messages_qs = Message.objects.all().order_by('-created_at')
-        else:
-            student = get_object_or_404(Student, pk=user_id)
-            messages_qs = Message.objects.filter(student=student).order_by('-created_at')
+        page_size = _get_page_size(request)
+        try:
+            since = _get_since(request)
+        except ValueError:
+            return JsonResponse({'error': 'Invalid since'}, status=400)
+        sync_token = timezone.now().isoformat()
+        messages_qs, unread_sender = _message_inbox_queryset(user_id, user_role)
+
+        student_id = request.GET.get('student')
+        if student_id and user_role == 'admin':
+            messages_qs = messages_qs.filter(student_id=student_id)
+
+        if since and request.GET.get('view') != 'threads':
+            # Read-state changes count as changes, so the unread filter doesn't apply here
+            changed = messages_qs.select_related('admin', 'student').filter(
+                updated_at__gte=changed_since(since)
+            ).order_by('-id')
+            return JsonResponse({
+                'success': True,
+                'messages': [_serialize_message(msg) for msg in changed],
+                'deleted': get_deleted_ids('message', since, user_id if user_role != 'admin' else student_id or None),
+                'sync_token': sync_token,
+                'full_sync': False,
+            })
 
-        messages_data = []
-        for msg in messages_qs:
-            admin_name = msg.admin.admin_name if msg.admin else 'System/Unknown'
-            student_name = f"{msg.student.first_name} {msg.student.last_name} ({msg.student.username})"
-            
-            messages_data.append({
-                'id': msg.id,
-                'sender_type': msg.sender_type,
-                'sender_name': admin_name if msg.sender_type == 'admin' else student_name,
-                'target_student_id': msg.student.student_id,
-                'target_student_name': student_name,
-                'subject': msg.subject,
-                'body': msg.body,
-                'is_read': msg.is_read,
-                'created_at': msg.created_at.isoformat()
+        if request.GET.get('unread') in ('1', 'true'):
+            messages_qs = messages_qs.filter(is_read=False, sender_type=unread_sender)
+
+        cursor = request.GET.get('cursor')
+        if cursor:
+            try:
+                cursor = int(cursor)
+            except ValueError:
+                return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+        if request.GET.get('view') == 'threads':
+            # One row per student, ordered by the thread's latest message
+            threads = messages_qs.values('student_id').annotate(
+                last_message_id=models.Max('id'),
+                message_count=Count('id'),
+                unread_count=Count('id', filter=models.Q(is_read=False, sender_type=unread_sender)),
+            ).order_by('-last_message_id')
+            if cursor:
+                threads = threads.filter(last_message_id__lt=cursor)
+
+            page = list(threads[:page_size + 1])
+            has_more = len(page) > page_size
+            page = page[:page_size]
+
+            latest = Message.objects.select_related('admin', 'student').in_bulk(
+                [thread['last_message_id'] for thread in page]
+            )
+            threads_data = [
+                {
+                    'student_id': thread['student_id'],
+                    'message_count': thread['message_count'],
+                    'unread_count': thread['unread_count'],
+                    'latest_message': _serialize_message(latest[thread['last_message_id']]),
+                }
+                for thread in page
+            ]
+            return JsonResponse({
+                'success': True,
+                'threads': threads_data,
+                'next_cursor': page[-1]['last_message_id'] if has_more else None,
+                'has_more': has_more,
             })
 
-        return JsonResponse({'success': True, 'messages': messages_data})
+        messages_qs = messages_qs.select_related('admin', 'student').order_by('-id')
+        if cursor:
+            messages_qs = messages_qs.filter(id__lt=cursor)
+
+        # Fetch one extra row to know whether another page exists
+        page = list(messages_qs[:page_size + 1])
+        has_more = len(page) > page_size
+        page = page[:page_size]
+
+        return JsonResponse({
+            'success': True,
+            'messages': [_serialize_message(msg) for msg in page],
+            'next_cursor': page[-1].id if has_more else None,
+            'has_more': has_more,
+            'sync_token': sync_token,
+            'full_sync': True,
+        })
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+def get_unread_message_count(request):
+    """Count unread messages addressed to the current user, for inbox badges"""
+    user_id = request.session.get('user_id')
+    user_role = request.session.get('user_role')
+
+    if not user_id:
+        return JsonResponse({'error': 'Not authenticated'}, status=401)
+
+    try:
+        messages_qs, unread_sender = _message_inbox_queryset(user_id, user_role)
+        unread_count = messages_qs.filter(is_read=False, sender_type=unread_sender).count()
+        return JsonResponse({'success': True, 'unread_count': unread_count})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+def _get_last_event_id(request):
+    """Where to resume an event feed: Last-Event-ID (set by EventSource on reconnect), then ?after="""
+    value = request.headers.get('Last-Event-ID') or request.GET.get('after')
+    if value in (None, ''):
+        return None
+    return int(value)
+
+
+@require_http_methods(["GET"])
+def event_stream(request):
+    """Server-Sent Events feed of message/popup events for the current user.
+
+    Needs an ASGI server; under WSGI it answers 204, which tells EventSource to
+    stop reconnecting, and clients fall back to polling /api/events/poll/.
+    """
+    user_id = request.session.get('user_id')
+    user_role = request.session.get('user_role')
+
+    if not user_id:
+        return JsonResponse({'error': 'Not authenticated'}, status=401)
+
+    # A sync worker would be tied up for the whole stream
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    try:
+        after_id = _get_last_event_id(request)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid event id'}, status=400)
+    if after_id is None:
+        after_id = latest_event_id()
+
+    response = StreamingHttpResponse(stream_events(user_role, user_id, after_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_http_methods(["GET"])
+def poll_events(request):
+    """Polling fallback for event_stream under WSGI.
+
+    Returns the events after ?after= right away, with last_event_id to pass
+    back next time; it never holds the request open. Without ?after= it
+    returns the current last_event_id.
+    """
+    user_id = request.session.get('user_id')
+    user_role = request.session.get('user_role')
+
+    if not user_id:
+        return JsonResponse({'error': 'Not authenticated'}, status=401)
+
+    try:
+        try:
+            after_id = _get_last_event_id(request)
+        except ValueError:
+            return JsonResponse({'error': 'Invalid event id'}, status=400)
+        if after_id is None:
+            return JsonResponse({'success': True, 'events': [], 'last_event_id': latest_event_id()})
+
+        events = get_events(user_role, user_id, after_id)
+        last_event_id = events[-1]['id'] if events else after_id
+        return JsonResponse({'success': True, 'events': events, 'last_event_id': last_event_id})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
@@ -1870,7 +2033,8 @@ def send_message(request):
                 body=body
             )
             
-            AdminLog.objects.create(admin=admin, action=f"Sent message to student {student.username}")
+            log_admin_action(admin.admin_id, f"Sent message to student {student.username}")
+            publish_event('message', 'student', [student.pk])
         else:
             # Student is submitting a ticket
             student = get_object_or_404(Student, pk=user_id)
@@ -1881,6 +2045,7 @@ def send_message(request):
                 subject=subject,
                 body=body
             )
+            publish_event('message', 'admin')
 
         return JsonResponse({'success': True, 'message': 'Message sent successfully.'})
     except Exception as e:
@@ -1916,7 +2081,8 @@ def admin_send_system_message(request):
             body=body
         )
 
-        AdminLog.objects.create(admin=admin, action=f"Sent direct system message to {student.username}")
+        log_admin_action(admin.admin_id, f"Sent direct system message to {student.username}")
+        publish_event('message', 'student', [student.pk])
         return JsonResponse({'success': True})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
@@ -1939,6 +2105,10 @@ def admin_send_email(request):
         body_html = request.POST.get('body')
         attachment = request.FILES.get('attachment')
 
+        upload_errors = get_upload_errors(request)
+        if upload_errors:
+            return JsonResponse({'success': False, 'error': ' '.join(upload_errors)}, status=400)
+
         if not student_id or not subject or not body_html:
             return JsonResponse({'success': False, 'error': 'Missing required fields.'}, status=400)
 
@@ -1947,23 +2117,10 @@ def admin_send_email(request):
         if not student.email:
             return JsonResponse({'success': False, 'error': 'Student does not have an email address.'}, status=400)
 
-        # Build Email
-        from_email = settings.EMAIL_HOST_USER if hasattr(settings, 'EMAIL_HOST_USER') and settings.EMAIL_HOST_USER else 'admin@scholarsync.com'
-        text_content = strip_tags(body_html)
-        
-        msg = EmailMultiAlternatives(subject, text_content, from_email, [student.email])
-        msg.attach_alternative(body_html, "text/html")
-        
-        if attachment:
-            msg.attach(attachment.name, attachment.read(), attachment.content_type)
-            
-        # Send Email
-        def send_email_thread():
-            msg.send(fail_silently=True)
-            
-        threading.Thread(target=send_email_thread).start()
+        # Queue Email for the send_outbox worker
+        queue_html_email([student.email], subject, body_html, from_email=default_from_email(), attachment=store_attachment(attachment))
 
-        AdminLog.objects.create(admin=admin, action=f"Sent direct email to {student.username}")
+        log_admin_action(admin.admin_id, f"Sent direct email to {student.username}")
         return JsonResponse({'success': True})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
@@ -1988,11 +2145,16 @@ def admin_send_batch_message(request):
         type_filter = request.POST.get('student_type', 'all')
         barangay_filter = request.POST.get('barangay', 'all')
         school_filter = request.POST.get('school', '')
+        missing_document_filter = request.POST.get('missing_document', '')
         
         subject = request.POST.get('subject')
         body_html = request.POST.get('body')
         attachment = request.FILES.get('attachment')
 
+        upload_errors = get_upload_errors(request)
+        if upload_errors:
+            return JsonResponse({'success': False, 'error': ' '.join(upload_errors)}, status=400)
+
         if not mode or not subject or not body_html:
             return JsonResponse({'success': False, 'error': 'Missing required fields.'}, status=400)
 
@@ -2015,6 +2177,9 @@ def admin_send_batch_message(request):
         if school_filter:
             students = students.filter(current_school__icontains=school_filter)
 
+        if missing_document_filter:
+            students = students_missing_document(missing_document_filter, students)
+
         student_count = students.count()
         if student_count == 0:
             return JsonResponse({'success': False, 'error': 'No students matched the selected filters.'}, status=400)
@@ -2031,40 +2196,14 @@ def admin_send_batch_message(request):
                 ) for student in students
             ]
             Message.objects.bulk_create(messages_to_create)
-            AdminLog.objects.create(admin=admin, action=f"Sent batch system message to {student_count} students")
+            log_admin_action(admin.admin_id, f"Sent batch system message to {student_count} students")
+            publish_event('message', 'student', [msg.student_id for msg in messages_to_create])
 
         elif mode == 'email':
-            # Send an email to each student
-            from_email = settings.EMAIL_HOST_USER if hasattr(settings, 'EMAIL_HOST_USER') and settings.EMAIL_HOST_USER else 'admin@scholarsync.com'
-            text_content = strip_tags(body_html)
-            
-            attachment_data = None
-            if attachment:
-                attachment_data = {
-                    'name': attachment.name,
-                    'content': attachment.read(),
-                    'type': attachment.content_type
-                }
-            
-            # Send emails in a background thread to prevent blocking
-            def send_batch_emails_thread(student_list, att_data):
-                for student in student_list:
-                    if not student.email:
-                        continue
-                    
-                    try:
-                        msg = EmailMultiAlternatives(subject, text_content, from_email, [student.email])
-                        msg.attach_alternative(body_html, "text/html")
-                        
-                        if att_data:
-                            msg.attach(att_data['name'], att_data['content'], att_data['type'])
-                            
-                        msg.send(fail_silently=True)
-                    except Exception as e:
-                        print(f"Failed to send email to {student.email}: {e}")
-
-            threading.Thread(target=send_batch_emails_thread, args=(list(students), attachment_data)).start()
-            AdminLog.objects.create(admin=admin, action=f"Sent batch email to {student_count} students")
+            # Queue an email for each student; the send_outbox worker delivers them over one SMTP connection per batch
+            recipients = students.values_list('email', flat=True).iterator(chunk_size=2000)
+            queue_html_email(recipients, subject, body_html, from_email=default_from_email(), attachment=store_attachment(attachment))
+            log_admin_action(admin.admin_id, f"Sent batch email to {student_count} students")
 
         return JsonResponse({'success': True, 'count': student_count})
         
@@ -2082,34 +2221,17 @@ def admin_get_student_documents(request, student_id):
     if not request.session.get('user_id'):
         return JsonResponse({'error': 'Not authenticated'}, status=401)
     try:
-        from home.models import Program as HomeProgram
-        student = get_object_or_404(Student, pk=student_id)
-
         # Uploaded documents
-        docs = student.documents.all().order_by('-uploaded_at')
+        docs = list(StudentDocument.objects.filter(student_id=student_id).order_by('-uploaded_at'))
+        thumbnails = get_thumbnail_urls(d.file.name for d in docs)
         uploaded = [
             {'id': d.id, 'name': d.document_name, 'url': d.file.url if d.file else None,
-             'uploaded_at': d.uploaded_at.isoformat()}
+             'uploaded_at': d.uploaded_at.isoformat(), **thumbnails.get(d.file.name, NO_THUMBNAIL)}
             for d in docs
         ]
-
-        # Standard student dashboard checklist 
-        required_set = [
-            "School ID (Current Semester)",
-            "Valid ID",
-            "TOR",
-            "Voter's Certificate",
-            "Certificate of Indigency",
-            "Letter of Application"
-        ]
-        seen = set(required_set)
-        
-        # Also collect any unique required document names from programs just in case
-        for program in HomeProgram.objects.all():
-            for req in (program.document_requirements or []):
-                if req and req not in seen:
-                    seen.add(req)
-                    required_set.append(req)
+        # Only look the student up when there is nothing to show, to tell "no uploads" from "no such student"
+        if not uploaded:
+            get_object_or_404(Student, pk=student_id)
 
         # Build uploaded names set for quick lookup
         uploaded_names = {d['name'] for d in uploaded if d['name']}
@@ -2117,7 +2239,8 @@ def admin_get_student_documents(request, student_id):
         return JsonResponse({
             'success': True,
             'documents': uploaded,
-            'required_documents': required_set,
+            'required_documents': get_required_documents(),
+            'missing_documents': get_missing_documents(student_id, uploaded_names),
             'uploaded_names': list(uploaded_names),
         })
     except Exception as e:
@@ -2139,14 +2262,16 @@ def get_student_documents(request):
         
     try:
         student = get_object_or_404(Student, pk=student_id)
-        documents = student.documents.all().order_by('-uploaded_at')
+        documents = list(student.documents.all().order_by('-uploaded_at'))
+        thumbnails = get_thumbnail_urls(doc.file.name for doc in documents)
         doc_list = []
         for doc in documents:
             doc_list.append({
                 'id': doc.id,
                 'name': doc.document_name,
                 'url': doc.file.url if doc.file else None,
-                'uploaded_at': doc.uploaded_at.isoformat()
+                'uploaded_at': doc.uploaded_at.isoformat(),
+                **thumbnails.get(doc.file.name, NO_THUMBNAIL),
             })
         return JsonResponse({'success': True, 'documents': doc_list})
     except Exception as e:
@@ -2171,13 +2296,19 @@ def upload_student_document(request):
         document_name = request.POST.get('document_name')
         file = request.FILES.get('file')
         
+        upload_errors = get_upload_errors(request, [file] if file else [])
+        if upload_errors:
+            return JsonResponse({'success': False, 'error': ' '.join(upload_errors)}, status=400)
+
         if not document_name or not file:
              return JsonResponse({'success': False, 'error': 'Document name and file are required'}, status=400)
              
+        name, digest = store_document(file)
         doc = StudentDocument.objects.create(
             student=student,
             document_name=document_name,
-            file=file
+            file=name,
+            content_hash=digest
         )
         return JsonResponse({'success': True, 'message': 'Document uploaded successfully', 'doc_id': doc.id})
     except Exception as e:
@@ -2223,6 +2354,43 @@ def mark_message_read(request, message_id):
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def mark_messages_read(request):
+    """Mark several messages as read in one UPDATE.
+
+    Body: {"message_ids": [...]}. Returns a result per id: marked, already_read or
+    not_found (which also covers messages the current user can't see).
+    """
+    user_id = request.session.get('user_id')
+    user_role = request.session.get('user_role')
+
+    if not user_id:
+        return JsonResponse({'error': 'Not authenticated'}, status=401)
+
+    try:
+        try:
+            message_ids = _get_id_list(json.loads(request.body), 'message_ids')
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+        messages_qs, _ = _message_inbox_queryset(user_id, user_role)
+        read_state = dict(messages_qs.filter(id__in=message_ids).values_list('id', 'is_read'))
+        to_mark = [message_id for message_id, is_read in read_state.items() if not is_read]
+        if to_mark:
+            # update() skips auto_now and signals: bump updated_at for ?since= sync and recount the unread badge
+            Message.objects.filter(id__in=to_mark).update(is_read=True, updated_at=timezone.now())
+            schedule_dashboard_counter_refresh(Message)
+
+        results = {
+            message_id: 'not_found' if message_id not in read_state else 'already_read' if read_state[message_id] else 'marked'
+            for message_id in message_ids
+        }
+        return JsonResponse({'success': True, 'results': results})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def student_change_password(request):
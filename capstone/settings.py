@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 import dj_database_url
 from pathlib import Path
 
@@ -83,10 +84,71 @@ WSGI_APPLICATION = 'capstone.wsgi.application'
 DATABASES = {
     'default': dj_database_url.config(
         default='sqlite:///' + str(BASE_DIR / 'db.sqlite3'),
-        conn_max_age=600
+        conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        # A persistent connection dropped by the server is replaced instead of failing the next request
+        conn_health_checks=True,
     )
 }
 
+# SQLite profile for local and single-node deployments, applied to every new
+# connection; set SQLITE_TUNING=off for stock pragmas. benchmark_sqlite_writes
+# compares the two.
+SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'on').lower() != 'off'
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3' and SQLITE_TUNING:
+    DATABASES['default'].setdefault('OPTIONS', {}).update({
+        # WAL lets readers run alongside the writer; NORMAL only syncs at checkpoints,
+        # which is still crash-safe in WAL mode
+        'init_command': (
+            'PRAGMA journal_mode=WAL;'
+            'PRAGMA synchronous=NORMAL;'
+            'PRAGMA mmap_size=134217728;'
+            'PRAGMA cache_size=-20000;'
+            'PRAGMA temp_store=MEMORY;'
+        ),
+        # Take the write lock at BEGIN, so concurrent transactions queue on the busy
+        # timeout instead of failing with "database is locked" when they upgrade
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': 20,
+    })
+
+# Postgres connection profile, chosen with DB_POOL:
+#   none      - one persistent connection per thread (CONN_MAX_AGE above)
+#   psycopg   - Django's psycopg 3 pool, DB_POOL_MAX_SIZE connections per process shared by its threads
+#   pgbouncer - connect through an external transaction pooler
+DB_POOL = os.environ.get('DB_POOL', 'none').lower()
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    if DB_POOL == 'psycopg':
+        # The pool keeps connections open itself; Django requires CONN_MAX_AGE 0 with it
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 4)),
+            # Seconds a request waits for a free connection before failing
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+        }
+    elif DB_POOL == 'pgbouncer':
+        # Server-side cursors (used by .iterator()) don't survive transaction pooling
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Per-process memory cache used for short-lived dashboard data (e.g. chart statistics).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'capstone',
+    }
+}
+
+# Serve admin dashboard stats from the signal-maintained DashboardCounters row
+# instead of counting on every poll.
+DASHBOARD_COUNTER_CACHE = os.environ.get('DASHBOARD_COUNTER_CACHE', 'True') == 'True'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -123,9 +185,14 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = '/static/'
+# Django 5.1+ only reads storage backends from STORAGES
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
 if not DEBUG:
     STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-    STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+    STORAGES['staticfiles']['BACKEND'] = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 else:
     STATIC_ROOT = BASE_DIR / 'staticfiles'
 
@@ -133,9 +200,23 @@ else:
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Uploads are hashed while they stream in so identical documents are stored once.
+# Files over MAX_UPLOAD_SIZE are dropped as soon as they cross the limit.
+FILE_UPLOAD_HANDLERS = [
+    'accounts.uploads.HashingMemoryFileUploadHandler',
+    'accounts.uploads.HashingTemporaryFileUploadHandler',
+]
+MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE', 10 * 1024 * 1024))
+ALLOWED_DOCUMENT_EXTENSIONS = ['.pdf', '.doc', '.docx', '.jpg', '.jpeg', '.png']
+
 # Cloudinary configuration (Only active if CLOUDINARY_URL is present in ENV)
 if 'CLOUDINARY_URL' in os.environ:
-    DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+    STORAGES['default']['BACKEND'] = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+
+# With remote media storage, documents are written to this local spool during the
+# request and copied to storage by the push_uploads worker
+UPLOAD_SPOOL_ENABLED = STORAGES['default']['BACKEND'] != 'django.core.files.storage.FileSystemStorage'
+UPLOAD_SPOOL_ROOT = os.environ.get('UPLOAD_SPOOL_ROOT', os.path.join(tempfile.gettempdir(), 'capstone_upload_spool'))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
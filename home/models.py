@@ -90,6 +90,17 @@ class Application(models.Model):
     is_remarks_viewed = models.BooleanField(default=False)
     notification = models.CharField(max_length=255, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True)
+    # Bumped on every save so pollers can ask for rows changed ?since= their last sync
+    updated_at = models.DateTimeField(auto_now=True, null=True, db_index=True)
+
+    class Meta:
+        # Matched to the admin application list, per-program and per-student lists and reports
+        indexes = [
+            models.Index(fields=['requirement_status', 'created_at'], name='app_status_created_idx'),
+            models.Index(fields=['program', 'created_at'], name='app_program_created_idx'),
+            models.Index(fields=['student', 'created_at'], name='app_student_created_idx'),
+            models.Index(fields=['created_at'], name='app_created_idx'),
+        ]
 
     def __str__(self):
         return f"Application {self.app_id} - {self.student}"
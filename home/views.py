@@ -1,5 +1,7 @@
 from django.shortcuts import render, redirect
 from django.http import JsonResponse
+from accounts.thumbnails import NO_THUMBNAIL, get_thumbnail_urls
+from accounts.uploads import get_upload_errors
 from .models import Program
 
 def create_program(request):
@@ -12,6 +14,10 @@ def create_program(request):
             application_end_date = request.POST.get('application_end_date') or None
             program_image = request.FILES.get('program_image')
             program_type = request.POST.get('program_type')
+
+            upload_errors = get_upload_errors(request)
+            if upload_errors:
+                return JsonResponse({'success': False, 'error': ' '.join(upload_errors)})
             
             print(f"Creating program: Name={program_name}, Type={program_type}") # Debug log
 
@@ -36,7 +42,8 @@ def create_program(request):
 
 
 def get_programs(request):
-    programs = Program.objects.all().order_by('-program_id')
+    programs = list(Program.objects.all().order_by('-program_id'))
+    thumbnails = get_thumbnail_urls(p.program_image.name for p in programs)
     data = [
         {
             'program_id': p.program_id,
@@ -46,6 +53,7 @@ def get_programs(request):
             'application_start_date': p.application_start_date,
             'application_end_date': p.application_end_date,
             'program_image': p.program_image.url if p.program_image else None,
+            'program_image_thumbnail': thumbnails.get(p.program_image.name, NO_THUMBNAIL)['thumbnail_url'],
             'program_type': p.program_type
         }
         for p in programs
@@ -57,6 +65,10 @@ def edit_program(request, program_id):
     if request.method == 'POST':
         try:
             program = Program.objects.get(program_id=program_id)
+
+            upload_errors = get_upload_errors(request)
+            if upload_errors:
+                return JsonResponse({'success': False, 'error': ' '.join(upload_errors)})
             
             program.program_name = request.POST.get('program_name', program.program_name)
             program.requirements = request.POST.get('requirements', program.requirements)
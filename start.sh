@@ -4,4 +4,12 @@ set -o errexit
 
 python manage.py migrate
 python load_initial_data.py
+# Background worker for queued report exports
+python manage.py process_report_jobs --loop &
+# Background worker that delivers queued emails
+python manage.py send_outbox --loop &
+# Background worker that copies spooled document uploads to remote storage
+python manage.py push_uploads --loop &
+# Background worker that makes thumbnails for uploaded images
+python manage.py generate_thumbnails --loop &
 gunicorn capstone.wsgi:application --bind 0.0.0.0:$PORT